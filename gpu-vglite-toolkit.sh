@@ -20,6 +20,22 @@
 #        paint-color-01-t.h as output heaader with graphics artifacts
 #        paint-color-01-t.err for path summary, and any error during SVG to header conversion
 #
+#  gpu-vglite-tests.sh --batch [-j JOBS] [-o OUTPUT_DIR] [-m MANIFEST] icons/ 'more/*.svg'
+#     Converts all SVG files from directories, glob patterns and manifests in one run
+#     using JOBS worker processes. A .h and .err pair is created per input in OUTPUT_DIR.
+#     e.g.
+#        gpu-vglite-tests.sh --batch -j 8 -o out tests
+#
+#  gpu-vglite-tests.sh paint-color-01-t.svg paint-color-01-t.h [OPTIONS]
+#     Any further arguments are passed to svg2h.py, e.g. --tight-bbox
+#
+#  Conversion cache
+#     When SVG2H_CACHE_DIR is set, conversion results are stored in that directory and
+#     reused as long as the SVG file, conversion options and toolkit sources are unchanged.
+#     SVG2H_CACHE_SIZE bounds cache size (default 256M), least recently used entries are removed.
+#     e.g.
+#        SVG2H_CACHE_DIR=~/.cache/vglite gpu-vglite-tests.sh paint-color-01-t.svg
+#
 
 INPUT_FILE=$1
 
@@ -43,7 +59,19 @@ OUT_ERR=$(echo $(basename ${INPUT_FILE}) | sed 's/\.svg/\.err/')
 # Property setup svgpathtools module path
 export PYTHONPATH=$PYTHONPATH:$PWD/svgpathtools
 
+# Batch conversion of many SVG files
+if [ "${INPUT_FILE}" == "--batch" ]; then
+        shift
+        python3 svg_batch.py "$@"
+        exit $?
+fi
+
 # Actual SVG -> header Conversion
-python3 svg2h.py ${INPUT_FILE} 1>"${OUTPUT_FILE}" 2>"${OUT_ERR}"
+python3 svg2h.py ${INPUT_FILE} --output "${OUTPUT_FILE}" "${@:3}" 2>"${OUT_ERR}"
+EXIT_CODE=$?
+if [ ${EXIT_CODE} -ne 0 ]; then
+        echo Failed to create ${OUTPUT_FILE} from ${INPUT_FILE}, see ${OUT_ERR}
+        exit ${EXIT_CODE}
+fi
 echo Created ${OUTPUT_FILE} from ${INPUT_FILE}
 
@@ -9,136 +9,153 @@
 # Read SVG into a list of path objects and list of dictionaries of attributes 
 # Update: You can now also extract the svg-attributes by setting
 # return_svg_attributes=True, or with the convenience function svg2paths2
+#
+# The conversion is available in-process through Converter / convert(),
+# so that a single interpreter can convert many SVG files:
+#
+#   import svg2h
+#   result = svg2h.convert("tests/paint-color-01-t.svg")
+#   open("paint_color_01_t.h", "w").write(result.header)
+#
 import sys
-import json
 import re
-import numpy as np
-from pathlib import Path
 import os
+import argparse
 import string
+import functools
+from collections import Counter
+import json
+from io import StringIO, BytesIO
+import tempfile
+from contextlib import redirect_stderr, ExitStack
+from pathlib import Path
 from svg_colors import *
 from svg_global_callback_context import *
+from svg_paint_object import PaintObject, LinearGradient, RadialGradient
+from svg_cache import ConversionCache, DEFAULT_CACHE_SIZE, parse_size
+from svg_blob import BlobWriter, BLOB_GRADIENT_LINEAR, BLOB_GRADIENT_RADIAL, layout_header
+import svg_data_type
+from svg_path_simplify import simplify_path, transform_scale
+from svg_path_arc import convert_arcs
+from svg_path_data import CANONICAL_COMMANDS, PATH_COMMAND_ARGCNT
+from svg_path_pool import PathPool, default_jobs
+from svg_path_pack import pack_path, unpacked_size, byte_rows, decoder_source
+from svg_occlusion import find_occluded, element_label
+from svg_visibility import invisible_reason, demote_gradients
+from svg_stage_timer import StageTimer
+from svg_profile import ConversionProfiler, profile_file_for
+from svg_stats import *
+from svg_footprint import *
+from svg_paint_table import *
+from svg_data_type import DEFAULT_TOLERANCE
 
-CB = get_global_callback_context()
-from svg_paint_object import PaintObject
-from svg_processing import BasicRect
+try:
+    import svg_processing
+    from svg_processing import BasicRect
+except ImportError:
+    svg_processing = None
 
-def check_command_line_arguments():
+def check_command_line_arguments(argv=None):
     """
     Validate input parameters
     """
+    argv = sys.argv[1:] if argv is None else argv
     # If user has not provided input file show usage instructions
-    if len(sys.argv) == 1:
+    if len(argv) == 0:
         print(f'ERROR: Please specify input svg file.', sep="---",file=sys.stderr)
         print("USAGE: svg2cKPI.py input.svg", sep="---",file=sys.stderr)
         sys.exit(1)
 
+    parser = argparse.ArgumentParser(description='Convert SVG file to VGLite header.')
+    parser.add_argument('input_file', help='input svg file')
+    parser.add_argument('-o', '--output', help='write header to this file instead of stdout')
+    parser.add_argument('--error-file', help='write errors and path summary to this file instead of stderr')
+    parser.add_argument('--blob', metavar='FILE',
+                        help='write path data and tables to binary blob FILE, header only describes its layout')
+    parser.add_argument('--cache-dir', default=os.environ.get('SVG2H_CACHE_DIR'),
+                        help='reuse conversion results stored in this directory (default: $SVG2H_CACHE_DIR)')
+    parser.add_argument('--cache-size', type=parse_size,
+                        default=os.environ.get('SVG2H_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+                        help='upper bound of cache size e.g. 512M (default: $SVG2H_CACHE_SIZE or 256M)')
+    parser.add_argument('--profile', action='store_true',
+                        help='write wall time, call counts and peak memory per stage and element type '
+                             'to <name>.profile.json next to the .err file')
+    parser.add_argument('--stats', action='store_true',
+                        help='write statistics of the asset (paths, commands, paint entries, bytes per table) '
+                             'to <name>.stats.json next to the .err file')
+    parser.add_argument('--profile-dump', metavar='FILE',
+                        help='run conversion under cProfile and dump stats to FILE, implies --profile')
+    ConversionOptions.add_arguments(parser)
+    args = parser.parse_args(argv)
+
     # If input file is not readable give user proper error.
-    input_file=sys.argv[1]
+    input_file=args.input_file
     if os.access(input_file, os.R_OK) == False:
         print(f'ERROR: {input_file} is not accessible.', sep="---",file=sys.stderr)
         print("USAGE: svg2cKPI.py input.svg", sep="---",file=sys.stderr)
         sys.exit(1)
 
-check_command_line_arguments()
+    return args
 
-try:
-    import svg_processing
-except:
-    print("ERROR: Please include \"python module\" svgpathtools in PYTHONPATH", sep="---",file=sys.stderr)
-    sys.exit(1)
-
-input_file=sys.argv[1]
-paths, attributes, svg_attributes, solid_colors, linear_gradients, radial_gradients, g_np = svg_processing.svg_transform(input_file)
-
-if svg_attributes.get('version') != "1.2" or svg_attributes.get('baseProfile') != "tiny":
-    print("Error: SVG version must be 1.2 and baseProfile must be tiny.", sep="---",file=sys.stderr)
-    sys.exit(1)
-
-# Let's print out the first path object and the color it was in the SVG
-# We'll see it is composed of two CubicBezier objects and, in the SVG file it 
-# came from, it was red
-#redpath = paths[0]
-#redpath_attribs = attributes[0]
-
-
-PATH_COMMANDS = [
-        'M',
-        'H', 'h', 'V', 'v',
-        'L', 'l', 'C', 'c',
-        'S', 's', 'A', 'a',
-        'Q', 'q', 'T', 't'
-]
-def path_split(p_cmd_arg):
-    cmd_arg_list = p_cmd_arg.split(' ')
-    arg = []
-    cmd = []
-    for el in cmd_arg_list:
-        if el in PATH_COMMANDS:
-            cmd.extend([el])
-        else:
-            arg.extend([el])
-    return (cmd,arg)
-
-VGLITE_PATH_COMMANDS = [
-    'M', 'L', 'C', 'Q', 'S', 'T', 'V', 'H', 'Z'
-]
-
-VGLITE_PATH_COMMAND_MNEMONICS = {
+VGLITE_PATH_OPCODES = {
     'M': "VLC_OP_MOVE",
-    "L": "VLC_OP_LINE",
-    "C": "VLC_OP_CUBIC",
-    "Q": "VLC_OP_QUAD",
-    "S": "VLC_OP_QUAD",
-    "T": "VLC_OP_LINE",
-    "V": "VLC_OP_LINE",
-    "H": "VLC_OP_LINE",
-    "Z": "VLC_OP_CLOSE"
+    'L': "VLC_OP_LINE",
+    'Q': "VLC_OP_QUAD",
+    'C': "VLC_OP_CUBIC",
 }
 
-VGLITE_PATH_COMMAND_ARGCNT = {
-    "M": 2,
-    "L": 2,
-    "C": 6,
-    "Q": 4,
-    "S": 4,
-    "T": 2,
-    "V": 2,
-    "H": 2,
-    "Z": 0
-}
+@functools.lru_cache(maxsize=None)
+def _path_line_templates(p_datatype):
+    # One format string per canonical command, holding opcode and all arguments
+    data_fmt = "{.data=(%s) %%.2f}," % p_datatype
+    return {cmd: "    {.cmd=" + VGLITE_PATH_OPCODES[cmd] + "}, " + data_fmt * PATH_COMMAND_ARGCNT[cmd]
+            for cmd in CANONICAL_COMMANDS}
 
-def path_convert2vglite(p_cmd_arg, p_datatype, p_x_offset, p_y_offset):
-    cmd_arg_list = p_cmd_arg.split(' ')
+def path_convert2vglite(p_path, p_datatype, p_x_offset, p_y_offset):
+    """
+    Convert normalized PathData (CANONICAL_COMMANDS only) into lines of
+    VGLite path data array
+    """
+    if not p_path.is_canonical():
+        raise ValueError("Path is not normalized, commands: " +
+                         "".join(sorted(set(p_path.commands) - set(CANONICAL_COMMANDS))))
+    templates = _path_line_templates(p_datatype)
+    coords = p_path.coords
+    if p_x_offset or p_y_offset:
+        # Canonical commands hold only points, x is even and y is odd
+        coords = [coord + (p_y_offset if (k % 2) else p_x_offset) for k, coord in enumerate(coords)]
     i = 0
     lines = []
-    while i < len(cmd_arg_list):
-        if cmd_arg_list[i] in VGLITE_PATH_COMMANDS:
-            command = cmd_arg_list[i]
-            i += 1
-            if VGLITE_PATH_COMMAND_MNEMONICS[command]  == "VLC_OP_CLOSE":
-                #ignore the close opcode. VSI VGLite does not handle it well.
-                continue
-            line = "    {.cmd=" + VGLITE_PATH_COMMAND_MNEMONICS[command] + "}, "
-            argCnt = VGLITE_PATH_COMMAND_ARGCNT[command]
-            for x in range(argCnt):
-                coord = float(cmd_arg_list[i])
-                #expect x coordinate is even and y coordinate is odd. This will fail for arc commands.
-                if (x % 2):
-                    coord += p_y_offset
-                else:
-                    coord += p_x_offset
-                #line += "{.data=(" + p_datatype +")" + str(coord) + " }, "
-                line += "{.data=(%s) %.2f}," % (p_datatype, coord)
-                i += 1
-            lines.append(line)
-        else:
-            print ("Unknown command "+cmd_arg_list[i] )
-            assert 0
-            i += 1
+    for command in p_path.commands:
+        argcnt = PATH_COMMAND_ARGCNT[command]
+        lines.append(templates[command] % tuple(coords[i:i + argcnt]))
+        i += argcnt
     return lines
 
 
+# Per-path stages, module level functions so that PathPool workers can run them
+
+def _convert_arcs(items):
+    # items are (PathData, tolerance) pairs
+    return convert_arcs([path for path, _ in items], [tolerance for _, tolerance in items])
+
+def _simplify_paths(items):
+    return [simplify_path(path, tolerance) for path, tolerance in items]
+
+def _scale_paths(paths, scale, tight_bbox):
+    # Bounding boxes are computed on the way, PathData caches them
+    if scale != 1:
+        paths = [path.scaled(scale) for path in paths]
+    for path in paths:
+        path.bounding_box(tight_bbox)
+    return paths
+
+def _format_paths(paths, data_type):
+    return [path_convert2vglite(path, data_type, 0, 0) for path in paths]
+
+def _pack_paths(paths, data_type):
+    return [pack_path(path, data_type) for path in paths]
+
 
 TAGS = {
         "evenodd"   : 'E',
@@ -149,17 +166,6 @@ TAGS = {
         "miter"     : 'R',
 }
 
-
-g_cmd = []
-g_arg = []
-i = 0
-strokePresent = False
-stroke_flag = False
-color_data = []
-
-data_type = "int32_t"
-#data_type = "float"
-
 VGLITE_DATA_TYPES = {
     "int8_t" : "VG_LITE_S8",
     "int16_t" : "VG_LITE_S16",
@@ -167,184 +173,38 @@ VGLITE_DATA_TYPES = {
     "float"  :  "VG_LITE_FP32"
 }
 
-imageName_actual = Path(input_file).stem
-# Replace special characters in file-name with underscore
-# C/C++ langulage does not support special characters in variable names.
-special_to_underscore = {c: '_' for c in string.punctuation}
-special_to_underscore[' '] = ''
-mapping_table = str.maketrans(special_to_underscore)
-imageName = imageName_actual.translate(mapping_table)
-
-
-print("#ifndef STATIC_PATH_DEFINES_H")
-print("#define STATIC_PATH_DEFINES_H")
-print("")
-print("#include \"vg_lite.h\"")
-print("")
-print("typedef union data_mnemonic {")
-
-if data_type == "float":
-    print("    uint32_t cmd;")
-else:
-    print("    %s cmd;" % data_type)
-
-print("    %s data;" % data_type)
-print("} data_mnemonic_t;")
-print("")
-print("typedef struct path_info {")
-print("    uint32_t  path_length;")
-print("    %s  *path_data;" % data_type)
-print("    float bounding_box[4];" )
-print("    uint8_t end_path_flag;" )
-print("} path_info_t;")
-print("")
-print("typedef struct stroke_info {")
-print("    uint32_t dashPatternCnt;")
-print("    float dashPhase;")
-print("    float *dashPattern;")
-print("    float strokeWidth;")
-print("    float miterlimit;")
-print("    uint32_t strokeColor;")
-print("    vg_lite_cap_style_t linecap;")
-print("    vg_lite_join_style_t linejoin;")
-print("} stroke_info_t;")
-print("")
-print("typedef struct image_info {")
-print("    char *image_name;")
-print("    int  image_size[2];")
-print("    vg_lite_format_t data_format;")
-print("    float *transform;")
-print("    int path_count;")
-print("    stroke_info_t *stroke_info;")
-print("    path_info_t paths_info[];")
-print("} image_info_t;")
-print("")
-print("typedef struct stopValue {")
-print("    float offset;")
-print("    uint32_t stop_color;")
-print("} stopValue_t;")
-print("")
-print("typedef struct linearGradient {")
-print("    uint32_t num_stop_points;")
-print("    vg_lite_linear_gradient_parameter_t linear_gradient;")
-print("    stopValue_t *stops;")
-print("} linearGradient_t;")
-print("")
-print("typedef struct radialGradient {")
-print("    uint32_t num_stop_points;")
-print("    vg_lite_radial_gradient_parameter_t radial_gradient;")
-print("    stopValue_t *stops;")
-print("} radialGradient_t;")
-print("")
-print("typedef struct hybridPath {")
-print("    fill_mode_t fillType;")
-print("    vg_lite_draw_path_type_t pathType;")
-print("} hybridPath_t;")
-print("")
-print("typedef struct gradient_mode {")
-print("    linearGradient_t **linearGrads;")
-print("    radialGradient_t **radialGrads;")
-print("    hybridPath_t *hybridPath;")
-print("    vg_lite_fill_t *fillRule;")
-print("}gradient_mode_t;")
-print("")
-print("#endif")
-print("")
-print("")
-
-g_active_node_unique_id = ''
-counter = 0
-g_grad_index = 0
-grad_found = False
-generated_ids = []
-stroke_fill = []
-used_gradients = {}  # Mapping from fill name to index
-end_path_ctrl = []
-def generate_id(name):
-    global counter, g_active_node_unique_id
-    counter += 1
-    g_active_node_unique_id = f"{name}_{counter}"
-    return g_active_node_unique_id
-
-def get_current_unique_id():
-    global g_active_node_unique_id
-    return g_active_node_unique_id
-
-def get_input_file_cname():
-    global imageName
-    # Return file name which can be used C variable name
-    return imageName
+_MAP_STROKE_LINECAP= {'butt':'VG_LITE_CAP_BUTT', 'round':'VG_LITE_CAP_ROUND', 'square':'VG_LITE_CAP_SQUARE'}
+_MAP_STROKE_LINEJOIN= {'miter':'VG_LITE_JOIN_MITER', 'round':'VG_LITE_JOIN_ROUND', 'bevel':'VG_LITE_JOIN_BEVEL'}
+
+def get_c_name(input_file):
+    # Replace special characters in file-name with underscore
+    # C/C++ langulage does not support special characters in variable names.
+    special_to_underscore = {c: '_' for c in string.punctuation}
+    special_to_underscore[' '] = ''
+    mapping_table = str.maketrans(special_to_underscore)
+    return Path(input_file).stem.translate(mapping_table)
 
 def convert_offset(offset):
     if offset.endswith('%'):
         return float(offset.strip('%')) / 100.0
     return float(offset)
 
-def parse_coordinates(line):
-    coordinates = re.findall(r'\d+\.\d+', line)
-    return [float(num) for num in coordinates]
-
-def get_min_max_coordinates(parsed_lines):
-    min_x = min(coord[0] for coord in parsed_lines)
-    max_x = max(coord[0] for coord in parsed_lines)
-    min_y = min(coord[1] for coord in parsed_lines)
-    max_y = max(coord[1] for coord in parsed_lines)
-    return min_x, max_x, min_y, max_y
-
 def is_url_prefix_present(color_str):
     return color_str.startswith("url")
 
 def get_url_id(color_str):
     return color_str.replace('url(#', '').replace(')', '')
 
-def parse_color(color_str):
-    # As per specification default color is black
-    paint_color = SVG_DEFAULT_BLACK_COLOR
-    isSolidColor = False
-
-    if color_str == None:
-        # As per the SVG specification (https://lists.w3.org/Archives/Public/www-archive/2005May/att-0005/SVGT12_Main.pdf),
-        # section 11.3 on Fill Properties, If the fill property is not specified for an element, 
-        # its initial or default value is 'black'.
-        return SVG_DEFAULT_BLACK_COLOR, isSolidColor
-
-    if color_str.startswith('#'):
-        if len(color_str) == 4:  # Shorthand hex color like #F60
-            color_str = '#' + ''.join([c*2 for c in color_str[1:]])
-        m = re.search(r'#([0-9a-fA-F]{6})', color_str)
-        if m:
-            color = m.group(1)
-            r = int(color[0:2], 16)
-            g = int(color[2:4], 16)
-            b = int(color[4:6], 16)
-            paint_color = f'0xff%02x%02x%02x' % ( r, g, b)
-    elif color_str.startswith('rgb'):
-        m = re.match(r'rgb\(\s*([\d\.]+)%?\s*,\s*([\d\.]+)%?\s*,\s*([\d\.]+)%?\s*\)', color_str)
-        if m:
-            r, g, b = m.groups()
-            # Convert percentages to 0-255 scale if necessary
-            if '%' in color_str:
-                r, g, b = [int(float(val) * 2.55) for val in (r, g, b)]
-            else:
-                r, g, b = map(int, (r, g, b))
-            paint_color = f'0xff%02x%02x%02x' % ( r, g, b)
-    elif color_str in SVG_COLOR_TABLE:
-        paint_color = SVG_COLOR_TABLE[color_str]
-    elif is_url_prefix_present(color_str):
-            fill_data = get_url_id(color_str)
-            paint_color, isSolidColor = getSolidColor(fill_data)
-    elif color_str == 'currentColor':
-        # We need to traverse parent node to find color
-        element = g_active_node
-        paint_color_str  = g_np._get_parent_attribute(element, 'color')
-        paint_color, dummy_var = parse_color(paint_color_str)
-    else:
-        print(f"Error: Fill value \"{color_str}\" not supported", sep="---",file=sys.stderr)
-
-    return paint_color, isSolidColor
+IDENTITY_TRANSFORM = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))
 
-def convert_transform(array):
-    return ', '.join(', '.join(f'{val:.1f}f' for val in row) for row in array)
+def convert_transform(array, scale=1, origin=(0, 0)):
+    if scale == 1 and origin == (0, 0):
+        return ', '.join(', '.join(f'{val:.1f}f' for val in row) for row in array)
+    # Path coordinates are relative to origin and multiplied by fixed-point
+    # scale, transform maps them back. Such values need full precision.
+    ox, oy = origin
+    rows = [(row[0] / scale, row[1] / scale, row[0] * ox + row[1] * oy + row[2]) for row in array[:2]] + [array[2]]
+    return ', '.join(', '.join(f'{float(val)!r}f' for val in row) for row in rows)
 
 def bgr_color_convert(colorCode):
     opa = (colorCode & 0xFF000000) >> 24
@@ -354,403 +214,1348 @@ def bgr_color_convert(colorCode):
     bgr_format_color = (opa << 24) | (b << 16) | (g << 8) | r
     return bgr_format_color
 
-def getSolidColor(name):
-    isSolidColor = False
-    bgr_color = SVG_DEFAULT_BLACK_COLOR
-    if name in solid_colors:
-        bgr_color, isSolidColor = parse_color(solid_colors[name])
-    return bgr_color, isSolidColor
-
 def check_for_z_cmd(path_data):
     if 'z' in path_data or 'Z' in path_data:
         return 0  # Indicates 'z' command was found
     else:
         return 1  # Indicates 'z' command was not found
 
-def _get_stop_color(stop):
-    hex_color = "0x%x" % 0xff000000
-    offset = 0.0
-    if 'offset' in stop:
-        offset = convert_offset(stop['offset'])
-    if 'stop-color' in stop:
-        name = stop['stop-color']
-        stop_color, isSolidColor2 = parse_color(name)
-        if stop_color :
-            hex_color = stop_color
-        else:
-            print("Error: stop color value not supported", sep="---",file=sys.stderr)
-    return hex_color, offset
-
-def get_used_gradient(key):
-    global g_grad_index
-    return used_gradients[key]
-
-def make_paint_object(svg_color_data):
-    # Note: svg_color_data
-    # svg_color_data can use url prefix (for gradient and solid colors)
-    # svg_color_data can be actual color value as well.
-    global g_grad_index
-
-    po = PaintObject()
-    if is_url_prefix_present(svg_color_data):
-        color_str = get_url_id(svg_color_data)
-        # This can be gradient of solid color
-        if color_str in linear_gradients:
-            grad = linear_gradients[color_str]
-            po.lg.parse(grad, parsed_lines)
-            po.paint_mode = po.lg.get_fill_mode()
-            if po.lg.is_valid():
-                po.lg.set_name(grad["id"])
-                po.lg.set_index(g_grad_index)
-                used_gradients[svg_color_data] = g_grad_index
-                g_grad_index += 1
-
-        elif color_str in radial_gradients:
-            grad = radial_gradients[color_str]
-            po.rg.parse(grad, parsed_lines)
-            po.paint_mode = po.rg.get_fill_mode()
-            if po.rg.is_valid():
-                po.rg.set_name(grad["id"])
-                po.rg.set_index(g_grad_index)
-                used_gradients[svg_color_data] = g_grad_index
-                g_grad_index += 1
-    else:
-        # fill_color is actual ARGB color string
-        fill_color, isSolidColor2 = parse_color(svg_color_data)
-        po.solid.set_color(fill_color)
-
-    return po
-
-def process_painting(color_data):
-    global lingrad_to_path_output, radgrad_to_path_output
-    global grad_found
-
-    po: PaintObject = make_paint_object(color_data)
-
-    if po.lg.is_valid():
-        print(po.lg.to_string(get_input_file_cname(), get_current_unique_id()))
-        lingrad_to_path_output += f"    &{imageName}_linear_gradients_{po.lg.grad_index},\n"
-        radgrad_to_path_output += f"    NULL,\n"
-        grad_found = True
-    elif po.rg.is_valid():
-        print(po.rg.to_string(get_input_file_cname(), get_current_unique_id()))
-        lingrad_to_path_output += f"    NULL,\n"
-        radgrad_to_path_output += f"    &{imageName}_radial_gradients_{po.rg.grad_index},\n"
-        grad_found = True
-
-    return po
-
-hybrid_path_output = f"hybridPath_t {imageName}_hybrid_path[] = {{\n"
-strokeFeature = f"static stroke_info_t {imageName}_stroke_info_data[] = {{\n"
-lingrad_to_path_output = f"static linearGradient_t *{imageName}_lingrad_to_path[] = {{\n"
-radgrad_to_path_output = f"static radialGradient_t *{imageName}_radgrad_to_path[] = {{\n"
-transform_output = f"static float {imageName}_transform_matrix[] = {{\n"
-bounding_boxes = []
-fill_rule_output = f"static vg_lite_fill_t {imageName}_fill_rule[] = {{\n"
-g_active_node = None
+def _map_with_dictionary(key, default_value, alist, const_map):
+    vglite_value = default_value
+    if key in alist and alist[key] != None:
+        svg_value = alist[key]
+        vglite_value = const_map[svg_value]
+    return vglite_value
+
+def _map_with_constant(key, default_value, alist):
+    vglite_value = default_value
+    if key in alist and alist[key] != None:
+        vglite_value = alist[key]
+    return vglite_value
+
 INVALID_PAINT_OBJECT = PaintObject()
 
-update_global_callback_context(parse_color)
-
-for redpath in paths:
-    p_cmd_arg = redpath.d()
-    if 'id' in attributes[i]:
-        print(f"/*path id={attributes[i]['id']}*/")
-    path_str = redpath.d().replace(',',' ')
-    new_id_value = generate_id(attributes[i]['name'])
-    generated_ids.append(new_id_value)
-    print("static data_mnemonic_t %s_%s_data[] = {" % (imageName, new_id_value))
-    lines = path_convert2vglite(path_str, data_type, 0, 0)
-    parsed_lines = []
-
-    for line in lines:
-        parsed_lines.append(parse_coordinates(line))
-        print(line)
-    print("    {.cmd=VLC_OP_END}")
-    print("};")
-    print("")
-
-    min_x, max_x, min_y, max_y = get_min_max_coordinates(parsed_lines)
-    bounding_boxes.append(BasicRect(min_x, min_y, max_x, max_y))
-
-    # In vg_lite_path_t, the add_end is set to zero by default, leading to an extra
-    # path being rendered between the start and end points. Setting it to '1'
-    # to avoid extra path rendering
-    if 'd' in attributes[i]:
-        end_path_ctrl.append(check_for_z_cmd(attributes[i]['d']))
-    elif 'points' in attributes[i]:
-        end_path_ctrl.append(check_for_z_cmd(attributes[i]['points']))
-    else:
-        end_path_ctrl.append(0)
-    
-    p_cmd,p_arg = path_split(p_cmd_arg)
-    if p_cmd is None and p_arg is None:
-        continue
-    g_cmd.extend(p_cmd)
-    g_arg.extend(p_arg)
-    out_cmd = []
-    out_arg = []
-    fall_back_feature = False
-
-    # Present SVG element for which we are creating drawing commands
-    g_active_node = attributes[i]['minidom-node']
-
-    fill_str = attributes[i]['fill']
-    stroke_str = attributes[i]['stroke']
-    fill_color, isSolidColor2 = parse_color(fill_str)
-    color_data.append(fill_color)
-
-    strokeFeature += f"    {{\n"
-    if 'id' in attributes[i]:
-        strokeFeature += f"/*{attributes[i]['name']} id={attributes[i]['id']}*/\n"
-    if stroke_str != None:
-        out_cmd.extend('S')
-        strokePresent = True
-        stroke_flag = True
-        stroke_dasharry_str = attributes[i]['stroke-dasharray']
-        if stroke_dasharry_str != None:
-            dashPattern = f"static float stroke_dash_pattern_path{i+1}[] = {{\n"
-            dashArray = list({attributes[i]['stroke-dasharray']})[0]
-            #if dash array length is odd then double the length of dash array and double dash array elements
-            if (len(dashArray.split(','))%2 != 0):
-                new_dashArray = attributes[i]['stroke-dasharray'] + "," + attributes[i]['stroke-dasharray']
-                dashPattern += f"        {new_dashArray}"
-                len_dashArray = 2*len(dashArray.split(','))
-            else:
-                dashPattern += f"        {attributes[i]['stroke-dasharray']}"
-                len_dashArray = len(dashArray.split(','))
-            dashPattern += "\n};\n"
-            print(dashPattern)
-            strokeFeature += f"        .dashPatternCnt = {len_dashArray},\n"
-            strokeFeature += f"        .dashPattern = (float*)stroke_dash_pattern_path{i+1},\n"
-        else:
-            strokeFeature += f"        .dashPatternCnt = 0,\n"
-            strokeFeature += f"        .dashPattern = NULL,\n"
+# Buffer size used when writing header to a file
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+
+def _temporary_file(path, binary=False):
+    # Temporary file next to 'path', with the permissions of a new file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(tmp_path, 0o666 & ~umask)
+    if binary:
+        return os.fdopen(fd, 'wb'), tmp_path
+    return os.fdopen(fd, 'w', buffering=OUTPUT_BUFFER_SIZE), tmp_path
+
+
+def convert_to_files(converter, input_file, output_file, blob_file=None):
+    """
+    Convert 'input_file' with 'converter' into header 'output_file' and
+    optional 'blob_file', return ConversionResult.
+    Output is written to temporary files which replace the outputs only when
+    conversion succeeds, a failed conversion leaves existing files untouched.
+    """
+    tmp_paths = []
+    try:
+        with ExitStack() as stack:
+            out, tmp_path = _temporary_file(output_file)
+            tmp_paths.append(tmp_path)
+            stack.enter_context(out)
+            blob = None
+            if blob_file:
+                blob, tmp_path = _temporary_file(blob_file, binary=True)
+                tmp_paths.append(tmp_path)
+                stack.enter_context(blob)
+            result = converter.convert(input_file, out, blob, blob_file)
+        if result.is_ok():
+            for tmp_path, path in zip(tmp_paths, (output_file, blob_file)):
+                os.replace(tmp_path, path)
+            tmp_paths = []
+        return result
+    finally:
+        for tmp_path in tmp_paths:
+            os.remove(tmp_path)
+
+
+class TableBuilder:
+    """
+    Text of a C array definition built row by row.
+    Rows are collected in a list and joined once when the table is written,
+    growing a string with '+=' would copy whole table for every row.
+    """
+    def __init__(self, head):
+        self.rows = [head]
 
-        def _map_with_dictionary(key, default_value, alist, const_map):
-            vglite_value = default_value
-            if key in alist and alist[key] != None:
-                svg_value = alist[key]
-                vglite_value = const_map[svg_value]
-            return vglite_value
+    def __iadd__(self, row):
+        self.rows.append(row)
+        return self
 
-        def _map_with_constant(key, default_value, alist):
-            vglite_value = default_value
-            if key in alist and alist[key] != None:
-                vglite_value = alist[key]
-            return vglite_value
+    def to_string(self, tail, strip_comma=False):
+        """
+        Return table text closed by 'tail'.
+        With 'strip_comma' the trailing ',\n' of last row is removed.
+        """
+        if strip_comma and self.rows[-1].endswith(",\n"):
+            self.rows[-1] = self.rows[-1][:-2]
+        return "".join(self.rows) + tail
 
-        _MAP_STROKE_LINECAP= {'butt':'VG_LITE_CAP_BUTT', 'round':'VG_LITE_CAP_ROUND', 'square':'VG_LITE_CAP_SQUARE'}
-        _MAP_STROKE_LINEJOIN= {'miter':'VG_LITE_JOIN_MITER', 'round':'VG_LITE_JOIN_ROUND', 'bevel':'VG_LITE_JOIN_BEVEL'}
 
-        # stroke-dashoffset defaults to zero
-        value = _map_with_constant('stroke-dashoffset', '0', attributes[i])
-        strokeFeature += f"        .dashPhase = {value},\n"
+class ConversionOptions:
+    """
+    Options which control SVG to header conversion
+    """
+    def __init__(self, data_type="int32_t", check_version=True, tight_bbox=False,
+                 tolerance=DEFAULT_TOLERANCE, rebase_paths=False, dedup_paths=True, simplify=None,
+                 arc_tolerance=DEFAULT_TOLERANCE, path_jobs=1, max_flash=None, max_ram=None,
+                 compress_paths=False, cull_occluded=False, cull_margin=0.0,
+                 optimize_paint=False):
+        if data_type != "auto" and data_type not in VGLITE_DATA_TYPES:
+            raise ValueError(f"Unsupported data type {data_type}")
+        # Path data type, "auto" selects the smallest type which fits coordinates
+        self.data_type = data_type
+        # Allowed error of stored coordinates, larger errors are reported
+        self.tolerance = tolerance
+        # Store path coordinates relative to center of path bounding box
+        self.rebase_paths = rebase_paths
+        # Emit identical path geometry once, shared by all paths_info entries
+        self.dedup_paths = dedup_paths
+        # Simplification tolerance in device pixels, None disables simplification
+        self.simplify = simplify
+        # Allowed error of Bezier curves replacing arcs, in device pixels
+        self.arc_tolerance = arc_tolerance
+        # SVGT12 conformance check on svg element (version="1.2" baseProfile="tiny")
+        self.check_version = check_version
+        # Bounding boxes enclose curve extrema instead of control points
+        self.tight_bbox = tight_bbox
+        # Worker processes for per-path stages of one file, output does not depend on it
+        self.path_jobs = path_jobs
+        # Footprint budgets in bytes, conversion fails when asset does not fit
+        self.max_flash = max_flash
+        self.max_ram = max_ram
+        # Path data as packed opcodes and varint deltas, expanded by generated decoder
+        self.compress_paths = compress_paths
+        # Drop paths hidden by opaque solid fills of later paths
+        self.cull_occluded = cull_occluded
+        # Distance in user units kept between culled paths and occluder edges
+        self.cull_margin = cull_margin
+        # Remove invisible elements, single color gradients become solid colors
+        self.optimize_paint = optimize_paint
+
+    @staticmethod
+    def add_arguments(parser):
+        """
+        Add command line options controlling conversion to argparse parser
+        """
+        parser.add_argument('--tight-bbox', action='store_true',
+                            help='compute path bounding boxes from curve extrema instead of control points')
+        parser.add_argument('--data-type', choices=['auto'] + list(VGLITE_DATA_TYPES), default='int32_t',
+                            help='path data type, auto picks the smallest type fitting the coordinates '
+                                 'with a fixed-point scale folded into the transform (default: int32_t)')
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help=f'allowed error of stored coordinates in pixels (default: {DEFAULT_TOLERANCE})')
+        parser.add_argument('--rebase-paths', action='store_true',
+                            help='store path coordinates relative to the path center, '
+                                 'the offset is moved into the path transform')
+        parser.add_argument('--no-dedup-paths', dest='dedup_paths', action='store_false',
+                            help='emit a path data array for every path even if geometry repeats')
+        parser.add_argument('--simplify', type=float, metavar='TOLERANCE',
+                            help='drop degenerate segments, merge collinear ones and reduce polylines '
+                                 'keeping the outline within TOLERANCE device pixels')
+        parser.add_argument('--arc-tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help='allowed error of Bezier curves replacing elliptical arcs, in device pixels '
+                                 f'(default: {DEFAULT_TOLERANCE})')
+        parser.add_argument('--optimize-paint', action='store_true',
+                            help='remove elements which draw nothing (hidden, zero opacity or stroke width, '
+                                 'empty, outside viewBox) and draw single color gradients as solid colors')
+        parser.add_argument('--cull-occluded', action='store_true',
+                            help='drop paths completely hidden by later opaque solid fills of axis-aligned '
+                                 'rects and polygons')
+        parser.add_argument('--cull-margin', type=float, default=0.0, metavar='MARGIN',
+                            help='with --cull-occluded keep paths closer than MARGIN user units to an '
+                                 'occluder edge (default: 0)')
+        parser.add_argument('--compress-paths', action='store_true',
+                            help='store path data as opcode nibbles and zigzag varint deltas, '
+                                 'a generated decoder expands a path into a RAM buffer on first use')
+        parser.add_argument('--max-flash', type=parse_size, metavar='SIZE',
+                            help='fail when flash footprint of emitted tables exceeds SIZE e.g. 64K')
+        parser.add_argument('--max-ram', type=parse_size, metavar='SIZE',
+                            help='fail when RAM footprint of emitted tables exceeds SIZE e.g. 16K')
+        parser.add_argument('--path-jobs', type=int, default=1, metavar='N',
+                            help='process paths of a file in N worker processes, 0 uses all CPUs '
+                                 '(default: 1)')
+
+    @staticmethod
+    def from_args(args):
+        return ConversionOptions(data_type=args.data_type, tight_bbox=args.tight_bbox,
+                                 tolerance=args.tolerance, rebase_paths=args.rebase_paths,
+                                 dedup_paths=args.dedup_paths, simplify=args.simplify,
+                                 arc_tolerance=args.arc_tolerance,
+                                 path_jobs=args.path_jobs if args.path_jobs > 0 else default_jobs(),
+                                 max_flash=args.max_flash, max_ram=args.max_ram,
+                                 compress_paths=args.compress_paths, cull_occluded=args.cull_occluded,
+                                 cull_margin=args.cull_margin,
+                                 optimize_paint=args.optimize_paint)
+
+    def cache_key(self):
+        """
+        Stable text representation of options which affect output, used by conversion cache
+        """
+        return repr(sorted((k, v) for k, v in vars(self).items() if k != 'path_jobs'))
+
+
+class ConversionResult:
+    """
+    Outcome of a conversion.
+    'header' is the generated C header (None when it was written to a stream),
+    'errors' is the text which used to be written to stderr (warnings, errors
+    and the path summary).
+    """
+    def __init__(self, input_file, header, errors, exit_code, path_count=0):
+        self.input_file = input_file
+        self.header = header
+        self.errors = errors
+        self.exit_code = exit_code
+        self.path_count = path_count
+        # True when result was served by ConversionCache
+        self.from_cache = False
+        # Wall time per conversion stage in seconds, empty for cached results
+        self.stage_times = {}
+        # ConversionProfiler report, set when Converter profiles conversions
+        self.profile = None
+        # Statistics of asset (see svg_stats.py), None when conversion failed
+        self.stats = None
+
+    def is_ok(self):
+        return self.exit_code == 0
+
+    def to_dict(self):
+        return {'header': self.header, 'errors': self.errors,
+                'exit_code': self.exit_code, 'path_count': self.path_count, 'stats': self.stats}
+
+    @staticmethod
+    def from_dict(input_file, entry):
+        result = ConversionResult(input_file, entry['header'], entry['errors'],
+                                  entry['exit_code'], entry['path_count'])
+        result.stats = entry.get('stats')
+        result.from_cache = True
+        return result
+
+
+class Converter:
+    """
+    Convert SVG files into VGLite header assets.
 
-        # stroke-width defaults to one
-        value = _map_with_constant('stroke-width', '1', attributes[i])
-        strokeFeature += f"        .strokeWidth = {value},\n"
+    A Converter can be used for any number of conversions in the same process,
+    every call to convert() starts with a fresh conversion state.
+    When 'cache' (ConversionCache) is given, unchanged SVG files are not parsed again.
+    """
 
-        # As per the SVG spec (https://lists.w3.org/Archives/Public/www-archive/2005May/att-0005/SVGT12_Main.pdf)
-        # section 11.4 on Stroke Properties, If the miterlimit property is not specified for an element,
-        # its initial or default value is '4'.
-        value = _map_with_constant('stroke-miterlimit', '4', attributes[i])
-        strokeFeature += f"        .miterlimit = {value},\n"
+    def __init__(self, options=None, cache=None, profile=False, profile_dump=None):
+        self.options = options if options is not None else ConversionOptions()
+        self.cache = cache
+        # Record ConversionProfiler report in ConversionResult.profile,
+        # 'profile_dump' is cProfile stats file of the conversion
+        self.profile = profile or profile_dump is not None
+        self.profile_dump = profile_dump
+
+    def _reset(self, input_file, out=None):
+        self.input_file = input_file
+        # Data type and fixed-point scale are selected once paths are parsed
+        self.data_type = self.options.data_type
+        self.coord_scale = 1
+        self.data_type_report = None
+        # Local origin of every path, set when paths are rebased
+        self.path_origins = None
+        self.rebase_report = None
+        # Command count before and after simplification
+        self.simplify_report = None
+        # Elements removed by occlusion culling
+        self.culled_ids = []
+        # Invisible elements removed by --optimize-paint as (label, reason)
+        self.invisible = []
+        self.demoted_paints = 0
+        self.out = out if out is not None else StringIO()
+        # Tables are collected for binary blob instead of printed as C arrays
+        self.blob = None
+        self.err = StringIO()
+
+        self.imageName_actual = Path(input_file).stem
+        self.imageName = get_c_name(input_file)
+
+        # Emitted commands per opcode
+        self.command_counts = Counter()
+        # Statistics of converted asset, see _collect_stats()
+        self.stats = None
+        self.footprint = None
+        self.blob_size = 0
+        self.strokePresent = False
+        self.stroke_flag = False
+        self.color_data = []
+
+        self.g_active_node_unique_id = ''
+        self.counter = 0
+        self.g_grad_index = 0
+        self.grad_found = False
+        self.generated_ids = []
+        # Index of path whose data array is used, per path
+        self.path_data_refs = []
+        # Formatted path data array of every unique path, by path index
+        self.path_data_lines = {}
+        # PackedPath of every unique path with --compress-paths, by path index
+        self.packed_paths = {}
+        # Elements of RAM buffers the packed paths are expanded into
+        self.path_buffer_size = 0
+        # First path of every unique geometry
+        self.unique_paths = {}
+        self.dedup_count = 0
+        self.dedup_bytes = 0
+        self.used_gradients = {}  # Mapping from fill name to index
+        # Identical gradients, stops, dash patterns and strokes are emitted once
+        self.paint_tables = PaintTableBuilder()
+        self.end_path_ctrl = []
+        self.bounding_boxes = []
+        # Bounding box of path being converted, used by gradients
+        self.active_bbox = None
+        self.active_origin = (0, 0)
+        self.g_active_node = None
+
+        imageName = self.imageName
+        self.hybrid_path_output = TableBuilder(f"hybridPath_t {imageName}_hybrid_path[] = {{\n")
+        self.strokeFeature = TableBuilder(f"static stroke_info_t {imageName}_stroke_info_data[] = {{\n")
+        self.lingrad_to_path_output = TableBuilder(f"static linearGradient_t *{imageName}_lingrad_to_path[] = {{\n")
+        self.radgrad_to_path_output = TableBuilder(f"static radialGradient_t *{imageName}_radgrad_to_path[] = {{\n")
+        self.transform_output = TableBuilder(f"static float {imageName}_transform_matrix[] = {{\n")
+        self.fill_rule_output = TableBuilder(f"static vg_lite_fill_t {imageName}_fill_rule[] = {{\n")
+
+    def convert(self, input_file, out=None, blob=None, blob_name=None):
+        """
+        Convert 'input_file' and return ConversionResult.
+        When 'out' (text stream) is given, header is written to it section by
+        section and result does not hold header text.
+        When 'blob' (binary stream) is given, tables are written to it as binary
+        blob and header only describes the blob layout. The header names the
+        blob 'blob_name', by default the file name of 'blob'. Blobs are not
+        cached, profiled conversions do not use the cache either.
+        """
+        if self.cache is None or blob is not None or self.profile:
+            return self._convert(input_file, out, blob, blob_name)
+
+        key = self.cache.make_key(input_file, self.options)
+        entry = self.cache.get(key)
+        if entry is None:
+            # Cache entry needs whole header text, failed conversions are run again
+            result = self._convert(input_file)
+            if result.is_ok():
+                self.cache.put(key, result.to_dict())
+        else:
+            result = ConversionResult.from_dict(input_file, entry)
+        if out is not None:
+            out.write(result.header)
+            result.header = None
+        return result
+
+    def _convert(self, input_file, out=None, blob=None, blob_name=None):
+        if svg_processing is None:
+            raise ImportError("python module svgpathtools is not available in PYTHONPATH")
+
+        # With footprint budgets output is held back until the asset is known
+        # to fit, a conversion over budget writes nothing
+        staged = self.options.max_flash is not None or self.options.max_ram is not None
+        self._reset(input_file, None if staged else out)
+        name = blob_name if blob_name is not None else getattr(blob, 'name', '')
+        self.blob_name = os.path.basename(name) if isinstance(name, str) else ''
+        # Paint objects resolve colors through global callback context
+        update_global_callback_context(self.parse_color)
+
+        exit_code = 0
+        timer = ConversionProfiler(self.profile_dump) if self.profile else StageTimer()
+        if self.profile:
+            timer.start()
+        stage_blob = BytesIO() if staged and blob is not None else blob
+        try:
+            exit_code = self._run_stages(input_file, stage_blob, timer)
+        finally:
+            if self.profile:
+                timer.stop()
+
+        header = self.out.getvalue() if out is None else None
+        if staged and exit_code != 0:
+            # Nothing is written for asset over budget
+            if out is None:
+                header = ''
+        elif staged:
+            if out is not None:
+                out.write(self.out.getvalue())
+            if blob is not None:
+                blob.write(stage_blob.getvalue())
+        result = ConversionResult(input_file, header, self.err.getvalue(),
+                                  exit_code, len(self.paths))
+        result.stage_times = timer.times
+        result.stats = self.stats
+        if self.profile:
+            result.profile = dict(input_file=input_file, path_count=len(self.paths), **timer.report())
+        # Release per-conversion state
+        self._reset(input_file)
+        self.paths = self.attributes = self.g_np = None
+        return result
+
+    def _run_stages(self, input_file, blob, timer):
+        exit_code = 0
+        with timer.stage('total'), redirect_stderr(self.err), PathPool(self.options.path_jobs) as pool:
+            (self.paths, self.attributes, self.svg_attributes, self.solid_colors,
+             self.linear_gradients, self.radial_gradients, self.g_np) = svg_processing.svg_transform(input_file, pool, timer)
+
+            if self.options.check_version and (self.svg_attributes.get('version') != "1.2" or self.svg_attributes.get('baseProfile') != "tiny"):
+                print("Error: SVG version must be 1.2 and baseProfile must be tiny.", sep="---",file=self.err)
+                exit_code = 1
+            else:
+                with timer.stage('arcs'):
+                    self._convert_arcs(pool)
+                if self.options.optimize_paint:
+                    with timer.stage('visibility'):
+                        self._optimize_paint()
+                if self.options.simplify is not None:
+                    with timer.stage('simplify'):
+                        self._simplify_paths(pool)
+                if self.options.cull_occluded:
+                    with timer.stage('cull'):
+                        self._cull_occluded()
+                with timer.stage('data_type'):
+                    self._select_data_type()
+                if blob is not None:
+                    if self.options.compress_paths:
+                        print("WARNING: --compress-paths is ignored with blob output", file=self.err)
+                    self.blob = BlobWriter(self.data_type, self.paint_tables)
+                    with timer.stage('format'):
+                        self._prepare_path_data(pool)
+                    with timer.stage('emit'):
+                        for i, redpath in enumerate(self.paths):
+                            self._convert_path(i, redpath)
+                        self._write_blob(blob)
+                else:
+                    with timer.stage('emit'):
+                        self._print_type_definitions()
+                    with timer.stage('format'):
+                        self._prepare_path_data(pool)
+                    with timer.stage('emit'):
+                        for i, redpath in enumerate(self.paths):
+                            self._convert_path(i, redpath)
+                        self._print_tables()
+                        self._print_image_info()
+                        if self.options.compress_paths:
+                            self._print_packed_paths()
+                        self._print_color_data()
+                self.footprint = self._footprint()
+                self._print_summary()
+                self.stats = self._collect_stats()
+                if not self._check_budget(self.footprint):
+                    exit_code = 1
+        return exit_code
+
+    def _path_tolerance(self, i, tolerance):
+        """
+        Convert tolerance in device pixels to coordinates of path i
+        """
+        if 'transform' in self.attributes[i]:
+            return tolerance / transform_scale(self.attributes[i]['path_transform'])
+        return tolerance
+
+    def _convert_arcs(self, pool):
+        """
+        Replace arcs by Bezier curves, VGLite has no arc opcode
+        """
+        tolerance = self.options.arc_tolerance
+        # Transform scale is only needed for paths with arcs
+        items = [(path, self._path_tolerance(i, tolerance) if 'A' in path.commands else tolerance)
+                 for i, path in enumerate(self.paths)]
+        self.paths = pool.map(_convert_arcs, items)
+
+    def _simplify_paths(self, pool):
+        """
+        Simplify every path with tolerance given in device pixels
+        """
+        tolerance = self.options.simplify
+        items = [(path, self._path_tolerance(i, tolerance)) for i, path in enumerate(self.paths)]
+        before = sum(len(path) for path in self.paths)
+        self.paths = pool.map(_simplify_paths, items)
+        self.simplify_report = (before, sum(len(path) for path in self.paths))
+
+    def _optimize_paint(self):
+        """
+        Demote single color gradients to solid colors and remove paths which draw nothing
+        """
+        self.demoted_paints = demote_gradients(self.attributes, {**self.linear_gradients, **self.radial_gradients})
+        vb = self.g_np.vb
+        viewbox = (vb.x, vb.y, vb.width, vb.height) if vb.width > 0 and vb.height > 0 else None
+        visible = []
+        for i, (path, alist) in enumerate(zip(self.paths, self.attributes)):
+            reason = invisible_reason(path, alist, viewbox, self.options.tight_bbox)
+            if reason is None:
+                visible.append(i)
+            else:
+                self.invisible.append((element_label(alist), reason))
+        if self.invisible:
+            self.paths = [self.paths[i] for i in visible]
+            self.attributes = [self.attributes[i] for i in visible]
+
+    def _cull_occluded(self):
+        """
+        Remove paths hidden by opaque fills of later paths
+        """
+        hidden = find_occluded(self.paths, self.attributes, self.options.tight_bbox, self.options.cull_margin)
+        self.culled_ids = [element_label(self.attributes[i]) for i in hidden]
+        if hidden:
+            hidden = set(hidden)
+            self.paths = [path for i, path in enumerate(self.paths) if i not in hidden]
+            self.attributes = [alist for i, alist in enumerate(self.attributes) if i not in hidden]
+
+    def _select_data_type(self):
+        """
+        Resolve data type and fixed-point scale, report overflow and precision loss
+        """
+        options = self.options
+        coords = svg_data_type.collect_coordinates(self.paths)
+        auto = options.data_type == "auto"
+        if options.rebase_paths:
+            original_type = self.data_type
+            if auto:
+                original_type = svg_data_type.select_data_type(coords, options.tolerance)[0]
+            original_size = svg_data_type.path_data_size(self.paths, original_type)
+            self.paths, self.path_origins = svg_data_type.rebase_paths(self.paths)
+            coords = svg_data_type.collect_coordinates(self.paths)
+        if auto:
+            self.data_type, self.coord_scale = svg_data_type.select_data_type(coords, options.tolerance)
+        if options.rebase_paths:
+            rebased = sum(1 for origin in self.path_origins if origin != (0, 0))
+            saved = original_size - svg_data_type.path_data_size(self.paths, self.data_type)
+            self.rebase_report = (rebased, original_type, saved)
+        report = svg_data_type.analyze(coords, self.data_type, self.coord_scale, options.tolerance, auto)
+        self.data_type_report = report
+
+        if report.overflow_count > 0:
+            print(f"WARNING: {report.overflow_count} coordinates do not fit in {self.data_type}, "
+                  f"range of coordinates is [{report.min_coord:g}, {report.max_coord:g}]", file=self.err)
+        if report.loss_count > 0:
+            print(f"WARNING: {report.loss_count} coordinates lose more than {options.tolerance:g} "
+                  f"in {self.data_type} (max error {report.max_error:.3f})", file=self.err)
+
+    def scale_length(self, value):
+        """
+        Apply fixed-point scale to length attribute (e.g. stroke-width)
+        """
+        if self.coord_scale == 1:
+            return value
+        return f"{float(value) * self.coord_scale:g}"
+
+    def _print_type_definitions(self):
+        out = self.out
+        data_type = self.data_type
+        print("#ifndef STATIC_PATH_DEFINES_H", file=out)
+        print("#define STATIC_PATH_DEFINES_H", file=out)
+        print("", file=out)
+        print("#include \"vg_lite.h\"", file=out)
+        print("", file=out)
+        print("typedef union data_mnemonic {", file=out)
+
+        if data_type == "float":
+            print("    uint32_t cmd;", file=out)
+        else:
+            print("    %s cmd;" % data_type, file=out)
+
+        print("    %s data;" % data_type, file=out)
+        print("} data_mnemonic_t;", file=out)
+        print("", file=out)
+        print("typedef struct path_info {", file=out)
+        print("    uint32_t  path_length;", file=out)
+        print("    %s  *path_data;" % data_type, file=out)
+        print("    float bounding_box[4];", file=out)
+        print("    uint8_t end_path_flag;", file=out)
+        print("} path_info_t;", file=out)
+        print("", file=out)
+        print("typedef struct stroke_info {", file=out)
+        print("    uint32_t dashPatternCnt;", file=out)
+        print("    float dashPhase;", file=out)
+        print("    float *dashPattern;", file=out)
+        print("    float strokeWidth;", file=out)
+        print("    float miterlimit;", file=out)
+        print("    uint32_t strokeColor;", file=out)
+        print("    vg_lite_cap_style_t linecap;", file=out)
+        print("    vg_lite_join_style_t linejoin;", file=out)
+        print("} stroke_info_t;", file=out)
+        print("", file=out)
+        print("typedef struct image_info {", file=out)
+        print("    char *image_name;", file=out)
+        print("    int  image_size[2];", file=out)
+        print("    vg_lite_format_t data_format;", file=out)
+        print("    float *transform;", file=out)
+        print("    int path_count;", file=out)
+        print("    stroke_info_t *stroke_info;", file=out)
+        print("    path_info_t paths_info[];", file=out)
+        print("} image_info_t;", file=out)
+        print("", file=out)
+        print("typedef struct stopValue {", file=out)
+        print("    float offset;", file=out)
+        print("    uint32_t stop_color;", file=out)
+        print("} stopValue_t;", file=out)
+        print("", file=out)
+        print("typedef struct linearGradient {", file=out)
+        print("    uint32_t num_stop_points;", file=out)
+        print("    vg_lite_linear_gradient_parameter_t linear_gradient;", file=out)
+        print("    stopValue_t *stops;", file=out)
+        print("} linearGradient_t;", file=out)
+        print("", file=out)
+        print("typedef struct radialGradient {", file=out)
+        print("    uint32_t num_stop_points;", file=out)
+        print("    vg_lite_radial_gradient_parameter_t radial_gradient;", file=out)
+        print("    stopValue_t *stops;", file=out)
+        print("} radialGradient_t;", file=out)
+        print("", file=out)
+        print("typedef struct hybridPath {", file=out)
+        print("    fill_mode_t fillType;", file=out)
+        print("    vg_lite_draw_path_type_t pathType;", file=out)
+        print("} hybridPath_t;", file=out)
+        print("", file=out)
+        print("typedef struct gradient_mode {", file=out)
+        print("    linearGradient_t **linearGrads;", file=out)
+        print("    radialGradient_t **radialGrads;", file=out)
+        print("    hybridPath_t *hybridPath;", file=out)
+        print("    vg_lite_fill_t *fillRule;", file=out)
+        print("}gradient_mode_t;", file=out)
+        print("", file=out)
+        print("#endif", file=out)
+        print("", file=out)
+        if self.options.compress_paths:
+            print(decoder_source(data_type), file=out)
+        print("", file=out)
+
+    def generate_id(self, name):
+        self.counter += 1
+        self.g_active_node_unique_id = f"{name}_{self.counter}"
+        return self.g_active_node_unique_id
+
+    def get_current_unique_id(self):
+        return self.g_active_node_unique_id
+
+    def get_input_file_cname(self):
+        # Return file name which can be used C variable name
+        return self.imageName
+
+    def parse_color(self, color_str):
+        # As per specification default color is black
+        paint_color = SVG_DEFAULT_BLACK_COLOR
+        isSolidColor = False
+
+        if color_str == None:
+            # As per the SVG specification (https://lists.w3.org/Archives/Public/www-archive/2005May/att-0005/SVGT12_Main.pdf),
+            # section 11.3 on Fill Properties, If the fill property is not specified for an element, 
+            # its initial or default value is 'black'.
+            return SVG_DEFAULT_BLACK_COLOR, isSolidColor
+
+        if color_str.startswith('#'):
+            if len(color_str) == 4:  # Shorthand hex color like #F60
+                color_str = '#' + ''.join([c*2 for c in color_str[1:]])
+            m = re.search(r'#([0-9a-fA-F]{6})', color_str)
+            if m:
+                color = m.group(1)
+                r = int(color[0:2], 16)
+                g = int(color[2:4], 16)
+                b = int(color[4:6], 16)
+                paint_color = f'0xff%02x%02x%02x' % ( r, g, b)
+        elif color_str.startswith('rgb'):
+            m = re.match(r'rgb\(\s*([\d\.]+)%?\s*,\s*([\d\.]+)%?\s*,\s*([\d\.]+)%?\s*\)', color_str)
+            if m:
+                r, g, b = m.groups()
+                # Convert percentages to 0-255 scale if necessary
+                if '%' in color_str:
+                    r, g, b = [int(float(val) * 2.55) for val in (r, g, b)]
+                else:
+                    r, g, b = map(int, (r, g, b))
+                paint_color = f'0xff%02x%02x%02x' % ( r, g, b)
+        elif color_str in SVG_COLOR_TABLE:
+            paint_color = SVG_COLOR_TABLE[color_str]
+        elif is_url_prefix_present(color_str):
+                fill_data = get_url_id(color_str)
+                paint_color, isSolidColor = self.getSolidColor(fill_data)
+        elif color_str == 'currentColor':
+            # We need to traverse parent node to find color
+            element = self.g_active_node
+            paint_color_str  = self.g_np._get_parent_attribute(element, 'color')
+            paint_color, dummy_var = self.parse_color(paint_color_str)
+        else:
+            print(f"Error: Fill value \"{color_str}\" not supported", sep="---",file=self.err)
+
+        return paint_color, isSolidColor
+
+    def getSolidColor(self, name):
+        isSolidColor = False
+        bgr_color = SVG_DEFAULT_BLACK_COLOR
+        if name in self.solid_colors:
+            bgr_color, isSolidColor = self.parse_color(self.solid_colors[name])
+        return bgr_color, isSolidColor
+
+    def make_paint_object(self, svg_color_data):
+        # Note: svg_color_data
+        # svg_color_data can use url prefix (for gradient and solid colors)
+        # svg_color_data can be actual color value as well.
+        po = PaintObject()
+        if is_url_prefix_present(svg_color_data):
+            color_str = get_url_id(svg_color_data)
+            # This can be gradient of solid color
+            if color_str in self.linear_gradients:
+                grad = self.linear_gradients[color_str]
+                po.lg.parse(grad, self.active_bbox, self.coord_scale, self.active_origin)
+                po.paint_mode = po.lg.get_fill_mode()
+                if po.lg.is_valid():
+                    po.lg.set_name(grad["id"])
+                    self._intern_gradient(po.lg, LINEAR_GRADIENT_SIZE, svg_color_data)
+
+            elif color_str in self.radial_gradients:
+                grad = self.radial_gradients[color_str]
+                po.rg.parse(grad, self.active_bbox, self.coord_scale, self.active_origin)
+                po.paint_mode = po.rg.get_fill_mode()
+                if po.rg.is_valid():
+                    po.rg.set_name(grad["id"])
+                    self._intern_gradient(po.rg, RADIAL_GRADIENT_SIZE, svg_color_data)
+        else:
+            # fill_color is actual ARGB color string
+            fill_color, isSolidColor2 = self.parse_color(svg_color_data)
+            po.solid.set_color(fill_color)
+
+        return po
+
+    def _intern_gradient(self, gradient, size, svg_color_data):
+        """
+        Give gradient index of identical gradient emitted before, or a new index
+        """
+        key = (gradient.STOPS_PREFIX, gradient.params(), stops_key(gradient.stops))
+        index, is_new = self.paint_tables.gradients.intern(key, self.g_grad_index, size)
+        gradient.set_index(index)
+        gradient.shared = not is_new
+        self.used_gradients[svg_color_data] = index
+        if is_new:
+            self.g_grad_index += 1
+
+    def _emit_gradient(self, gradient, kind):
+        if gradient.shared:
+            return
+        if self.blob is not None:
+            self.blob.add_gradient(kind, gradient.params(), gradient.stops)
+            return
+        unique_id = self.get_current_unique_id()
+        stops = gradient.stops
+        stops_name, is_new = self.paint_tables.stops.intern(stops_key(stops), gradient.stops_name(unique_id),
+                                                            STOP_SIZE * len(stops))
+        print(gradient.to_string(self.get_input_file_cname(), unique_id, None if is_new else stops_name),
+              file=self.out)
+
+    def process_painting(self, color_data):
+        imageName = self.imageName
+        po: PaintObject = self.make_paint_object(color_data)
+
+        if po.lg.is_valid():
+            self._emit_gradient(po.lg, BLOB_GRADIENT_LINEAR)
+            if self.blob is not None:
+                self.blob.add_gradient_ref(linear=po.lg.grad_index)
+            self.lingrad_to_path_output += f"    &{imageName}_linear_gradients_{po.lg.grad_index},\n"
+            self.radgrad_to_path_output += f"    NULL,\n"
+            self.grad_found = True
+        elif po.rg.is_valid():
+            self._emit_gradient(po.rg, BLOB_GRADIENT_RADIAL)
+            if self.blob is not None:
+                self.blob.add_gradient_ref(radial=po.rg.grad_index)
+            self.lingrad_to_path_output += f"    NULL,\n"
+            self.radgrad_to_path_output += f"    &{imageName}_radial_gradients_{po.rg.grad_index},\n"
+            self.grad_found = True
+
+        return po
+
+    def _prepare_path_data(self, pool):
+        """
+        Scale paths to the selected data type, find paths with identical
+        geometry and format path data arrays of unique paths
+        """
+        self.paths = pool.map(_scale_paths, self.paths, self.coord_scale, self.options.tight_bbox)
+        for i, path in enumerate(self.paths):
+            data_ref = i
+            if self.options.dedup_paths:
+                data_ref = self.unique_paths.setdefault(path.geometry_key(), i)
+                if data_ref != i:
+                    self.dedup_count += 1
+                    self.dedup_bytes += svg_data_type.path_data_size((path,), self.data_type)
+            self.path_data_refs.append(data_ref)
+        if self.blob is None:
+            unique = [i for i, data_ref in enumerate(self.path_data_refs) if data_ref == i]
+            unique_paths = [self.paths[i] for i in unique]
+            if self.options.compress_paths:
+                self.packed_paths = dict(zip(unique, pool.map(_pack_paths, unique_paths, self.data_type)))
+                self.path_buffer_size = sum(unpacked_size(path) for path in unique_paths)
+            else:
+                lines = pool.map(_format_paths, unique_paths, self.data_type)
+                self.path_data_lines = dict(zip(unique, lines))
+
+    def _convert_path(self, i, redpath):
+        out = self.out
+        attributes = self.attributes
+        imageName = self.imageName
+
+        # Path is already scaled, see _prepare_path_data()
+        scale = self.coord_scale
+        origin = self.path_origins[i] if self.path_origins is not None else (0, 0)
+
+        new_id_value = self.generate_id(attributes[i]['name'])
+        self.generated_ids.append(new_id_value)
+        data_ref = self.path_data_refs[i]
+        if self.blob is None and data_ref == i and self.options.compress_paths:
+            if 'id' in attributes[i]:
+                print(f"/*path id={attributes[i]['id']}*/", file=out)
+            packed = self.packed_paths[i]
+            lines = ["static const uint8_t %s_%s_opcodes[] = {" % (imageName, new_id_value)]
+            lines += byte_rows(packed.opcodes)
+            lines.append("};")
+            lines.append("static const uint8_t %s_%s_coords[] = {" % (imageName, new_id_value))
+            lines += byte_rows(packed.coords)
+            lines.append("};")
+            # Filled by <imageName>_decode_path()
+            lines.append("static data_mnemonic_t %s_%s_data[%d];\n\n" % (imageName, new_id_value, unpacked_size(redpath)))
+            out.write("\n".join(lines))
+        elif self.blob is None and data_ref == i:
+            if 'id' in attributes[i]:
+                print(f"/*path id={attributes[i]['id']}*/", file=out)
+            lines = self.path_data_lines.pop(i)
+            lines.insert(0, "static data_mnemonic_t %s_%s_data[] = {" % (imageName, new_id_value))
+            lines.append("    {.cmd=VLC_OP_END}\n};\n\n")
+            out.write("\n".join(lines))
+
+        self.active_bbox = min_x, min_y, max_x, max_y = redpath.bounding_box(self.options.tight_bbox)
+        self.bounding_boxes.append(BasicRect(min_x, min_y, max_x, max_y))
+        # Gradients are computed from box in document coordinates, then moved to path origin
+        self.active_origin = (origin[0] * scale, origin[1] * scale)
+        if origin != (0, 0):
+            ox, oy = self.active_origin
+            self.active_bbox = (min_x + ox, min_y + oy, max_x + ox, max_y + oy)
+
+        # In vg_lite_path_t, the add_end is set to zero by default, leading to an extra
+        # path being rendered between the start and end points. Setting it to '1'
+        # to avoid extra path rendering
+        if 'd' in attributes[i]:
+            self.end_path_ctrl.append(check_for_z_cmd(attributes[i]['d']))
+        elif 'points' in attributes[i]:
+            self.end_path_ctrl.append(check_for_z_cmd(attributes[i]['points']))
+        else:
+            self.end_path_ctrl.append(0)
+
+        self.command_counts.update(redpath.commands)
+
+        # Present SVG element for which we are creating drawing commands
+        self.g_active_node = attributes[i]['node']
+
+        fill_str = attributes[i]['fill']
+        stroke_str = attributes[i]['stroke']
+        fill_color, isSolidColor2 = self.parse_color(fill_str)
+        self.color_data.append(fill_color)
+
+        self._stroke_info(i, stroke_str)
+
+        if 'style' in attributes[i] and attributes[i]['style'] != None:
+            self.color_data.append(self._style_color(attributes[i]['style']))
+
+        fill_po = INVALID_PAINT_OBJECT
+        fillType_str = 'NO_FILL_MODE'
+        pathType_str = 'VG_LITE_DRAW_ZERO'
+        if fill_str != None:
+            fill_po: PaintObject = self.process_painting(fill_str)
+            if fill_po.paint_mode == None:
+                fill_po.paint_mode = 'FILL_CONSTANT'
+            fillType_str = fill_po.paint_mode
+            pathType_str = 'VG_LITE_DRAW_FILL_PATH'
+        self.hybrid_path_output += f"    {{ .fillType = {fillType_str}, .pathType = {pathType_str} }},\n"
+        if self.blob is not None:
+            self.blob.add_hybrid_path(fillType_str, pathType_str)
+
+        stroke_po = INVALID_PAINT_OBJECT
+        fillType_str = 'NO_FILL_MODE'
+        pathType_str = 'VG_LITE_DRAW_ZERO'
+        if stroke_str != None:
+            stroke_po: PaintObject = self.process_painting(stroke_str)
+            if stroke_po.paint_mode == None:
+                stroke_po.paint_mode = 'STROKE'
+            fillType_str = stroke_po.paint_mode
+            pathType_str = 'VG_LITE_DRAW_STROKE_PATH';
+        self.hybrid_path_output += f"    {{ .fillType = {fillType_str}, .pathType = {pathType_str} }},\n"
+        if self.blob is not None:
+            self.blob.add_hybrid_path(fillType_str, pathType_str)
+
+        # When fill and stroke both don't utilize gradient
+        if fill_po.has_valid_gradient() == False and stroke_po.has_valid_gradient() == False:
+             self.lingrad_to_path_output += f"    NULL,\n"
+             self.radgrad_to_path_output += f"    NULL,\n"
+             if self.blob is not None:
+                 self.blob.add_gradient_ref()
+
+        if 'transform' in attributes[i]:
+            attributes[i]['path_transform'] = convert_transform(attributes[i]['path_transform'], scale, origin)
+            transform_str = attributes[i]['path_transform']
+        else:
+            transform_str = convert_transform(IDENTITY_TRANSFORM, scale, origin)
+        self.transform_output += f"{transform_str},\n"
 
-        stroke_color, isSolidColor2 = parse_color(stroke_str)
-        strokeFeature += f"        .strokeColor = {stroke_color},\n"
+        if 'fill-rule' in attributes[i] and attributes[i]['fill-rule'] != None:
+            if (attributes[i]['fill-rule'] == "evenodd"):
+                fill_rule_str = "VG_LITE_FILL_EVEN_ODD"
+            else:
+                fill_rule_str = "VG_LITE_FILL_NON_ZERO"
+        else:
+            fill_rule_str = "VG_LITE_FILL_EVEN_ODD"
+        self.fill_rule_output += f"{fill_rule_str},\n"
+
+        if self.blob is not None:
+            self.blob.add_path(redpath, redpath.bounding_box(self.options.tight_bbox), self.end_path_ctrl[-1],
+                               None if data_ref == i else data_ref)
+            self.blob.add_transform([float(value.rstrip('f')) for value in transform_str.split(', ')])
+            self.blob.add_fill_rule(fill_rule_str)
+
+    def _stroke_info(self, i, stroke_str):
+        alist = self.attributes[i]
+
+        self.strokeFeature += f"    {{\n"
+        if 'id' in alist:
+            self.strokeFeature += f"/*{alist['name']} id={alist['id']}*/\n"
+        if stroke_str != None:
+            self.strokePresent = True
+            self.stroke_flag = True
+            stroke_dasharry_str = alist['stroke-dasharray']
+            if stroke_dasharry_str != None and self.coord_scale != 1:
+                stroke_dasharry_str = ','.join(self.scale_length(v) for v in stroke_dasharry_str.split(','))
+                alist['stroke-dasharray'] = stroke_dasharry_str
+            if stroke_dasharry_str != None:
+                dashPattern = f"static float stroke_dash_pattern_path{i+1}[] = {{\n"
+                dashArray = list({alist['stroke-dasharray']})[0]
+                #if dash array length is odd then double the length of dash array and double dash array elements
+                if (len(dashArray.split(','))%2 != 0):
+                    new_dashArray = alist['stroke-dasharray'] + "," + alist['stroke-dasharray']
+                    dashPattern += f"        {new_dashArray}"
+                    len_dashArray = 2*len(dashArray.split(','))
+                else:
+                    new_dashArray = alist['stroke-dasharray']
+                    dashPattern += f"        {new_dashArray}"
+                    len_dashArray = len(dashArray.split(','))
+                dashPattern += "\n};\n"
+                dash_name = f"stroke_dash_pattern_path{i+1}"
+                if self.blob is None:
+                    # Identical dash pattern is emitted once
+                    dash_name, is_new = self.paint_tables.dash_patterns.intern(
+                        new_dashArray.replace(' ', ''), dash_name, DASH_SIZE * len_dashArray)
+                    if is_new:
+                        print(dashPattern, file=self.out)
+                self.strokeFeature += f"        .dashPatternCnt = {len_dashArray},\n"
+                self.strokeFeature += f"        .dashPattern = (float*){dash_name},\n"
+            else:
+                self.strokeFeature += f"        .dashPatternCnt = 0,\n"
+                self.strokeFeature += f"        .dashPattern = NULL,\n"
+
+            # stroke-dashoffset defaults to zero
+            dash_phase = self.scale_length(_map_with_constant('stroke-dashoffset', '0', alist))
+            self.strokeFeature += f"        .dashPhase = {dash_phase},\n"
+
+            # stroke-width defaults to one
+            stroke_width = self.scale_length(_map_with_constant('stroke-width', '1', alist))
+            self.strokeFeature += f"        .strokeWidth = {stroke_width},\n"
+
+            # As per the SVG spec (https://lists.w3.org/Archives/Public/www-archive/2005May/att-0005/SVGT12_Main.pdf)
+            # section 11.4 on Stroke Properties, If the miterlimit property is not specified for an element,
+            # its initial or default value is '4'.
+            miterlimit = _map_with_constant('stroke-miterlimit', '4', alist)
+            self.strokeFeature += f"        .miterlimit = {miterlimit},\n"
+
+            stroke_color, isSolidColor2 = self.parse_color(stroke_str)
+            self.strokeFeature += f"        .strokeColor = {stroke_color},\n"
 
+            # Default stroke-linecap is VG_LITE_CAP_BUTT
+            linecap = _map_with_dictionary('stroke-linecap', 'VG_LITE_CAP_BUTT', alist, _MAP_STROKE_LINECAP)
+            self.strokeFeature += f"        .linecap = {linecap},\n"
 
-        # Default stroke-linecap is VG_LITE_CAP_BUTT
-        value = _map_with_dictionary('stroke-linecap', 'VG_LITE_CAP_BUTT', attributes[i], _MAP_STROKE_LINECAP)
-        strokeFeature += f"        .linecap = {value},\n"
+            # Default stroke-linejoin is VG_LITE_JOIN_MITER
+            linejoin = _map_with_dictionary('stroke-linejoin', 'VG_LITE_JOIN_MITER', alist, _MAP_STROKE_LINEJOIN)
+            self.strokeFeature += f"        .linejoin = {linejoin}\n"
 
-        # Default stroke-linejoin is VG_LITE_JOIN_MITER
-        value = _map_with_dictionary('stroke-linejoin', 'VG_LITE_JOIN_MITER', attributes[i], _MAP_STROKE_LINEJOIN)
-        strokeFeature += f"        .linejoin = {value}\n"
+            if self.blob is not None:
+                self.blob.add_stroke(stroke_dasharry_str, dash_phase, stroke_width, miterlimit,
+                                     stroke_color, linecap, linejoin)
+        elif self.blob is not None:
+            self.blob.add_empty_stroke()
 
-    strokeFeature += f"    }},\n"
+        self.strokeFeature += f"    }},\n"
 
-    if 'style' in attributes[i] and attributes[i]['style'] != None:
+    def _style_color(self, style_str):
         # fill-paint
         #m = re.match(r'rgb\((\d+),(\d+),(\d+)\)', attributes[i]['fill'])
-        m = re.search(r'fill:#(\w+)', attributes[i]['style'])
-        opacity = re.search(r'fill-opacity:(\d+);', attributes[i]['style'])
+        m = re.search(r'fill:#(\w+)', style_str)
+        opacity = re.search(r'fill-opacity:(\d+);', style_str)
         if m:
             color = int(m.group(1), 16)
             r = (color & 0xFF0000) >> 16
             g = (color & 0x00FF00) >> 8
             b = (color & 0x0000FF)
         else:
-            m = re.match(r'fill:.*rgb\((\d+),\s*(\d+),\s*(\d+)\)', attributes[i]['style'])
+            m = re.match(r'fill:.*rgb\((\d+),\s*(\d+),\s*(\d+)\)', style_str)
             if m:
                 r=int(m.group(1))
                 g=int(m.group(2))
                 b=int(m.group(3))
             else:
-                print("Error: Style value not supported", sep="---",file=sys.stderr)
+                print("Error: Style value not supported", sep="---",file=self.err)
                 assert(0)
         if opacity:
             opa = int(255*float(opacity.group(1)))
             opa = (opa & 0xFF)
         else:
             opa = 0xFF
-        color_data.append("0x%x" % ((opa << 24) | (b << 16) | (g << 8) | r))
-
-    fill_po = INVALID_PAINT_OBJECT
-    fillType_str = 'NO_FILL_MODE'
-    pathType_str = 'VG_LITE_DRAW_ZERO'
-    if fill_str != None:
-        fill_po: PaintObject = process_painting(fill_str)
-        if fill_po.paint_mode == None:
-            fill_po.paint_mode = 'FILL_CONSTANT'
-        fillType_str = fill_po.paint_mode
-        pathType_str = 'VG_LITE_DRAW_FILL_PATH'
-    hybrid_path_output += f"    {{ .fillType = {fillType_str}, .pathType = {pathType_str} }},\n"
-
-    stroke_po = INVALID_PAINT_OBJECT
-    fillType_str = 'NO_FILL_MODE'
-    pathType_str = 'VG_LITE_DRAW_ZERO'
-    if stroke_str != None:
-        stroke_po: PaintObject = process_painting(stroke_str)
-        if stroke_po.paint_mode == None:
-            stroke_po.paint_mode = 'STROKE'
-        fillType_str = stroke_po.paint_mode
-        pathType_str = 'VG_LITE_DRAW_STROKE_PATH';
-    hybrid_path_output += f"    {{ .fillType = {fillType_str}, .pathType = {pathType_str} }},\n"
-
-    # When fill and stroke both don't utilize gradient
-    if fill_po.has_valid_gradient() == False and stroke_po.has_valid_gradient() == False:
-         lingrad_to_path_output += f"    NULL,\n"
-         radgrad_to_path_output += f"    NULL,\n"
-
-    if 'transform' in attributes[i]:
-        attributes[i]['path_transform'] = convert_transform(attributes[i]['path_transform'])
-        transform_output += f"{attributes[i]['path_transform']},\n"
-    else:
-        transform_output += f"1.0f, 0.0f, 0.0f, 0.0f, 1.0f, 0.0f, 0.0f, 0.0f, 1.0f,\n"
+        return "0x%x" % ((opa << 24) | (b << 16) | (g << 8) | r)
+
+    def _print_tables(self):
+        out = self.out
+        imageName = self.imageName
+
+        # Every table is joined and written once all paths are converted
+        if self.strokePresent == True:
+            print(self.strokeFeature.to_string("\n};\n\n"), file=out)
+        print(self.hybrid_path_output.to_string("\n};\n"), file=out)
+
+        if len(self.used_gradients) > 0:
+            print(self.lingrad_to_path_output.to_string("\n};\n\n", strip_comma=True), file=out)
+            print(self.radgrad_to_path_output.to_string("\n};\n\n", strip_comma=True), file=out)
+
+        print(self.fill_rule_output.to_string("\n};\n", strip_comma=True), file=out)
+
+        print ("static gradient_mode_t %s_gradient_info = {" % imageName, file=out)
 
-    if 'fill-rule' in attributes[i] and attributes[i]['fill-rule'] != None:
-        if (attributes[i]['fill-rule'] == "evenodd"):
-            fill_rule_output += f"VG_LITE_FILL_EVEN_ODD,\n"
+        if len(self.used_gradients) > 0:
+            print(f"    .linearGrads = {imageName}_lingrad_to_path,", file=out)
+            print(f"    .radialGrads = {imageName}_radgrad_to_path,", file=out)
         else:
-            fill_rule_output += f"VG_LITE_FILL_NON_ZERO,\n"
-    else:
-        fill_rule_output += f"VG_LITE_FILL_EVEN_ODD,\n"
-
-
-    # add the Path
-    out_arg.extend([len(p_arg)])
-    out_arg.extend(p_arg)
-    out_cmd.extend(p_cmd)
-    out_cmd.extend('E')
-
-    i += 1
-
-if lingrad_to_path_output.endswith(",\n"):
-    lingrad_to_path_output = lingrad_to_path_output[:-2]
-
-if radgrad_to_path_output.endswith(",\n"):
-    radgrad_to_path_output = radgrad_to_path_output[:-2]
-
-if transform_output.endswith(",\n"):
-    transform_output = transform_output[:-2]
-
-if fill_rule_output.endswith(",\n"):
-    fill_rule_output = fill_rule_output[:-2]
-
-hybrid_path_output += "\n};\n"
-lingrad_to_path_output += "\n};\n\n"
-radgrad_to_path_output += "\n};\n\n"
-strokeFeature += "\n};\n\n"
-transform_output += "\n};\n"
-fill_rule_output += "\n};\n"
-
-if strokePresent == True:
-    print(strokeFeature)
-print(hybrid_path_output)
-
-if len(used_gradients) > 0:
-    print(lingrad_to_path_output)
-    print(radgrad_to_path_output)
-
-print(fill_rule_output)
-
-print ("static gradient_mode_t %s_gradient_info = {" % imageName)
-
-if len(used_gradients) > 0:
-    print(f"    .linearGrads = {imageName}_lingrad_to_path,")
-    print(f"    .radialGrads = {imageName}_radgrad_to_path,")
-else:
-    print(f"    .linearGrads = NULL,")
-    print(f"    .radialGrads = NULL,")
-print(f"    .hybridPath = {imageName}_hybrid_path,")
-print(f"    .fillRule = {imageName}_fill_rule")
-print("};")
-print("")
-print(transform_output)
-
-
-print("static image_info_t %s = {" % imageName)
-print("    .image_name =\"%s\"," % imageName_actual)
-print("    .image_size = {%d, %d}," % (int(float(svg_attributes['width'])), int(float(svg_attributes['height']))))
-print("    .data_format = %s," % VGLITE_DATA_TYPES[data_type])
-print("    .transform = %s_transform_matrix," % imageName)
-print("    .path_count = %d," % len(paths))
-if strokePresent == True:
-    print(f"    .stroke_info = {imageName}_stroke_info_data,")
-else:
-    print(f"    .stroke_info = NULL,")
-print("    .paths_info = {")
-for i, new_id_value in enumerate(generated_ids):
-    path_name = "%s_%s_data" % (imageName, new_id_value)
-    if i == len(paths) - 1:
-        print("        {.path_length = sizeof(%s), .path_data=(%s*)%s, .end_path_flag=%d, .bounding_box = {%0.2f, %0.2f, %0.2f, %0.2f} }" %
-              (path_name, data_type, path_name, end_path_ctrl[i],
-               bounding_boxes[i].x,
-               bounding_boxes[i].y,
-               bounding_boxes[i].width,
-               bounding_boxes[i].height))
+            print(f"    .linearGrads = NULL,", file=out)
+            print(f"    .radialGrads = NULL,", file=out)
+        print(f"    .hybridPath = {imageName}_hybrid_path,", file=out)
+        print(f"    .fillRule = {imageName}_fill_rule", file=out)
+        print("};", file=out)
+        print("", file=out)
+        print(self.transform_output.to_string("\n};\n", strip_comma=True), file=out)
+
+    def _print_packed_paths(self):
+        out = self.out
+        imageName = self.imageName
+        count = len(self.paths)
+
+        rows = ["static const packed_path_t %s_packed_paths[] = {" % imageName]
+        for i, data_ref in enumerate(self.path_data_refs):
+            path_name = "%s_%s" % (imageName, self.generated_ids[data_ref])
+            rows.append("    {.command_count = %d, .opcodes = %s_opcodes, .coords = %s_coords}," %
+                        (self.packed_paths[data_ref].command_count, path_name, path_name))
+        rows.append("};")
+        rows.append("")
+        rows.append("static uint8_t %s_decoded[%d];" % (imageName, count))
+        rows.append("")
+        rows.append("/* Expand path 'index' into its path_data on first use and return path_data */")
+        rows.append("static inline data_mnemonic_t *%s_decode_path(int index)" % imageName)
+        rows.append("{")
+        rows.append("    data_mnemonic_t *path_data = (data_mnemonic_t *)%s.paths_info[index].path_data;" % imageName)
+        rows.append("    if (!%s_decoded[index]) {" % imageName)
+        rows.append("        unpack_path_data(&%s_packed_paths[index], path_data);" % imageName)
+        rows.append("        %s_decoded[index] = 1;" % imageName)
+        rows.append("    }")
+        rows.append("    return path_data;")
+        rows.append("}")
+        rows.append("")
+        rows.append("/* Expand all paths, call once before %s is drawn */" % imageName)
+        rows.append("static inline void %s_decode_all(void)" % imageName)
+        rows.append("{")
+        rows.append("    int i;")
+        rows.append("    for (i = 0; i < %d; i++) {" % count)
+        rows.append("        %s_decode_path(i);" % imageName)
+        rows.append("    }")
+        rows.append("}")
+        rows.append("")
+        print("\n".join(rows), file=out)
+
+    def _print_image_info(self):
+        out = self.out
+        imageName = self.imageName
+        data_type = self.data_type
+        paths = self.paths
+        bounding_boxes = self.bounding_boxes
+
+        print("static image_info_t %s = {" % imageName, file=out)
+        print("    .image_name =\"%s\"," % self.imageName_actual, file=out)
+        print("    .image_size = {%d, %d}," % (int(float(self.svg_attributes['width'])), int(float(self.svg_attributes['height']))), file=out)
+        print("    .data_format = %s," % VGLITE_DATA_TYPES[data_type], file=out)
+        print("    .transform = %s_transform_matrix," % imageName, file=out)
+        print("    .path_count = %d," % len(paths), file=out)
+        if self.strokePresent == True:
+            print(f"    .stroke_info = {imageName}_stroke_info_data,", file=out)
+        else:
+            print(f"    .stroke_info = NULL,", file=out)
+        rows = ["    .paths_info = {"]
+        for i, data_ref in enumerate(self.path_data_refs):
+            # Path data of packed paths is valid after <imageName>_decode_path(i)
+            path_name = "%s_%s_data" % (imageName, self.generated_ids[data_ref])
+            path_length = "sizeof(%s)" % path_name
+            rows.append("        {.path_length = %s, .path_data=(%s*)%s, .end_path_flag=%d, .bounding_box = {%0.2f, %0.2f, %0.2f, %0.2f} }%s" %
+                        (path_length, data_type, path_name, self.end_path_ctrl[i],
+                         bounding_boxes[i].x,
+                         bounding_boxes[i].y,
+                         bounding_boxes[i].width,
+                         bounding_boxes[i].height,
+                         "" if i == len(paths) - 1 else ","))
+        rows.append("    },")
+        print("\n".join(rows), file=out)
+        print("};", file=out)
+        print("", file=out)
+
+    def _print_color_data(self):
+        out = self.out
+        color_data = self.color_data
+
+        rows = ["uint32_t %s_color_data[] = {" % self.imageName]
+        # Four colors per row
+        for i in range(0, len(color_data), 4):
+            rows.append("    " + ", ".join(["%s" % color for color in color_data[i:i + 4]]) + ("" if i + 4 >= len(color_data) else ", "))
+        if len(color_data) % 4 == 0:
+            rows.append("    ")
+        rows.append("};")
+        rows.append("")
+        print("\n".join(rows), file=out)
+
+    def _write_blob(self, f):
+        """
+        Write collected tables to binary stream 'f' and its layout header to output
+        """
+        blob = self.blob
+        blob.set_image_size(int(float(self.svg_attributes['width'])), int(float(self.svg_attributes['height'])))
+        if not self.strokePresent:
+            # Same as .stroke_info = NULL in header output
+            blob.stroke_info = []
+            blob.stroke_refs = []
+        if len(self.used_gradients) == 0:
+            blob.gradient_refs = []
+        for color in self.color_data:
+            blob.add_color(color)
+        blob_size = self.blob_size = blob.write(f)
+        self.out.write(layout_header(self.imageName, self.blob_name, blob_size, self.data_type, len(self.paths)))
+
+    def _footprint(self):
+        """
+        Footprint of emitted tables on target, blob sections only take flash
+        """
+        footprint = Footprint()
+        if self.blob is not None:
+            for name, size in self.blob.section_sizes.items():
+                footprint.add(name, size, SECTION_RODATA)
+            # Header, section table and alignment
+            footprint.add('blob_layout', self.blob_size - sum(self.blob.section_sizes.values()), SECTION_RODATA)
+            return footprint
+        count = len(self.paths)
+        paint_tables = self.paint_tables
+        unique_paths = [path for i, path in enumerate(self.paths) if self.path_data_refs[i] == i]
+        if self.options.compress_paths:
+            footprint.add('path_data', sum(packed.size() for packed in self.packed_paths.values()),
+                          SECTION_RODATA)
+            footprint.add('packed_paths', count * PACKED_PATH.size, SECTION_RODATA)
+            footprint.add('path_buffers', self.path_buffer_size * data_mnemonic(self.data_type).size,
+                          SECTION_BSS)
+            footprint.add('decode_flags', count * C_TYPES['uint8_t'][0], SECTION_BSS)
+        else:
+            elements = sum(unpacked_size(path) for path in unique_paths)
+            footprint.add('path_data', elements * data_mnemonic(self.data_type).size)
+        if self.strokePresent:
+            footprint.add('stroke_info', count * STROKE_INFO.size)
+        footprint.add('dash_patterns', paint_tables.dash_patterns.size_bytes)
+        gradient_kinds = Counter(key[0] for key in paint_tables.gradients.entries)
+        footprint.add('gradients', gradient_kinds[LinearGradient.STOPS_PREFIX] * LINEAR_GRADIENT.size +
+                      gradient_kinds[RadialGradient.STOPS_PREFIX] * RADIAL_GRADIENT.size)
+        footprint.add('gradient_stops', sum(len(key) for key in paint_tables.stops.entries) * STOP_VALUE.size)
+        if len(self.used_gradients) > 0:
+            # lingrad_to_path and radgrad_to_path
+            footprint.add('gradient_refs', 2 * count * C_TYPES['pointer'][0])
+        footprint.add('hybrid_path', 2 * count * HYBRID_PATH.size)
+        footprint.add('fill_rule', count * C_TYPES['enum'][0])
+        footprint.add('gradient_info', GRADIENT_MODE.size)
+        footprint.add('transform_matrix', count * TRANSFORM_SIZE)
+        footprint.add('image_info', IMAGE_INFO.size + count * PATH_INFO.size)
+        footprint.add('image_name', len(self.imageName_actual.encode()) + 1, SECTION_RODATA)
+        footprint.add('color_data', len(self.color_data) * C_TYPES['uint32_t'][0])
+        return footprint
+
+    def _compression(self):
+        """
+        Path data before and after --compress-paths, None when paths are not compressed
+        """
+        if not self.options.compress_paths or self.blob is not None:
+            return None
+        unique_paths = [self.paths[i] for i in self.packed_paths]
+        raw_bytes = svg_data_type.path_data_size(unique_paths, self.data_type)
+        packed_bytes = sum(packed.size() for packed in self.packed_paths.values())
+        return {
+            'raw_bytes': raw_bytes,
+            'packed_bytes': packed_bytes,
+            'ratio': round(raw_bytes / packed_bytes, 3) if packed_bytes else 0,
+            'path_buffer_bytes': self.path_buffer_size * data_mnemonic(self.data_type).size,
+        }
+
+    def _check_budget(self, footprint):
+        """
+        Report footprint exceeding --max-flash/--max-ram, return True when it fits
+        """
+        options = self.options
+        exceeded = []
+        if options.max_flash is not None and footprint.flash_bytes() > options.max_flash:
+            exceeded.append(f"flash footprint {footprint.flash_bytes()} bytes exceeds budget {options.max_flash} bytes")
+        if options.max_ram is not None and footprint.ram_bytes() > options.max_ram:
+            exceeded.append(f"RAM footprint {footprint.ram_bytes()} bytes exceeds budget {options.max_ram} bytes")
+        for message in exceeded:
+            print(f"ERROR: {self.input_file}: {message}", file=self.err)
+        if exceeded:
+            for line in footprint.breakdown():
+                print(f"    {line}", file=self.err)
+        return len(exceeded) == 0
+
+    def _collect_stats(self):
+        """
+        Statistics of converted asset as JSON compatible dictionary
+        """
+        gradient_kinds = Counter(key[0] for key in self.paint_tables.gradients.entries)
+        footprint = self.footprint
+        if self.blob is not None:
+            stroke_entries = len(self.blob.stroke_info)
+        else:
+            stroke_entries = len(self.paths) if self.strokePresent else 0
+        tables = footprint.sizes()
+        return {
+            'input_file': self.input_file,
+            'data_type': self.data_type,
+            'paths': len(self.paths),
+            'path_data_arrays': sum(1 for i, data_ref in enumerate(self.path_data_refs) if data_ref == i),
+            'commands': {cmd: self.command_counts[cmd] for cmd in CANONICAL_COMMANDS},
+            'points': sum(len(path.coords) for path in self.paths) // 2,
+            'gradients': {'linear': gradient_kinds[LinearGradient.STOPS_PREFIX],
+                          'radial': gradient_kinds[RadialGradient.STOPS_PREFIX]},
+            'stop_arrays': len(self.paint_tables.stops),
+            'dash_patterns': len(self.paint_tables.dash_patterns),
+            'unique_colors': len(set(self.color_data)),
+            'stroke_entries': stroke_entries,
+            'tables': tables,
+            'total_bytes': sum(tables.values()),
+            'flash_bytes': footprint.flash_bytes(),
+            'ram_bytes': footprint.ram_bytes(),
+            'compression': self._compression(),
+            'culled_ids': self.culled_ids,
+            'invisible': [{'id': label, 'reason': reason} for label, reason in self.invisible],
+            'demoted_paints': self.demoted_paints,
+        }
+
+    def _print_summary(self):
+        err = self.err
+        counts = self.command_counts
+        print(f"==================", file=err)
+        print(f"## {self.input_file}", file=err)
+        print(f"    Nb.Paths    : {len(self.paths)}", file=err)
+        print(f"    MoveTo      : {counts['M']}", file=err)
+        print(f"    LineTo      : {counts['L']}", file=err)
+        print(f"    Quadr Bezier: {counts['Q']}", file=err)
+        print(f"    Cubic Bezier: {counts['C']}", file=err)
+        report = self.data_type_report
+        if report is not None:
+            mode = "auto" if report.auto else "fixed"
+            print(f"    Data type   : {report.data_type} ({mode}, scale {report.scale_string()})", file=err)
+        if self.simplify_report is not None:
+            before, after = self.simplify_report
+            print(f"    Simplified  : {before} -> {after} commands "
+                  f"(tolerance {self.options.simplify:g})", file=err)
+        if self.options.optimize_paint:
+            print(f"    Invisible   : {len(self.invisible)} elements removed"
+                  + (": " + ", ".join(f"{label} ({reason})" for label, reason in self.invisible)
+                     if self.invisible else ""), file=err)
+            print(f"    Demoted     : {self.demoted_paints} gradient paints to solid colors", file=err)
+        if self.options.cull_occluded:
+            print(f"    Culled      : {len(self.culled_ids)} paths hidden by opaque fills"
+                  + (f": {', '.join(self.culled_ids)}" if self.culled_ids else ""), file=err)
+        if self.options.dedup_paths:
+            print(f"    Deduplicated: {self.dedup_count} paths, {self.dedup_bytes} bytes saved", file=err)
+        for line in self.paint_tables.report():
+            print(f"    Shared      : {line}", file=err)
+        compression = self._compression()
+        if compression is not None:
+            print(f"    Compressed  : {compression['raw_bytes']} -> {compression['packed_bytes']} bytes "
+                  f"(ratio {compression['ratio']:.2f}), RAM buffers {compression['path_buffer_bytes']} bytes",
+                  file=err)
+        if self.options.max_flash is not None or self.options.max_ram is not None:
+            print(f"    Footprint   : flash {self.footprint.flash_bytes()} bytes, "
+                  f"RAM {self.footprint.ram_bytes()} bytes", file=err)
+        if self.rebase_report is not None:
+            rebased, original_type, saved = self.rebase_report
+            print(f"    Rebased     : {rebased} paths, {original_type} -> {self.data_type}, "
+                  f"{saved} bytes saved", file=err)
+
+
+def convert(svg_path, options=None, cache=None, out=None, blob=None):
+    """
+    Convert single SVG file with given ConversionOptions and return ConversionResult.
+    Header is written to 'out' stream when given, 'blob' selects binary blob output.
+    """
+    return Converter(options, cache).convert(svg_path, out, blob)
+
+
+def main():
+    args = check_command_line_arguments()
+
+    if svg_processing is None:
+        print("ERROR: Please include \"python module\" svgpathtools in PYTHONPATH", sep="---",file=sys.stderr)
+        sys.exit(1)
+
+    cache = None
+    if args.cache_dir:
+        cache = ConversionCache(args.cache_dir, args.cache_size)
+
+    options = ConversionOptions.from_args(args)
+    converter = Converter(options, cache, args.profile, args.profile_dump)
+    if args.output:
+        result = convert_to_files(converter, args.input_file, args.output, args.blob)
+    elif args.blob:
+        # Header goes to stdout, blob is only replaced by successful conversion
+        header = StringIO()
+        with BytesIO() as blob:
+            result = converter.convert(args.input_file, header, blob, args.blob)
+            if result.is_ok():
+                with open(args.blob, 'wb') as f:
+                    f.write(blob.getvalue())
+        sys.stdout.write(header.getvalue())
     else:
-        print("        {.path_length = sizeof(%s), .path_data=(%s*)%s, .end_path_flag=%d, .bounding_box = {%0.2f, %0.2f, %0.2f, %0.2f} }," %
-              (path_name, data_type, path_name, end_path_ctrl[i],
-               bounding_boxes[i].x,
-               bounding_boxes[i].y,
-               bounding_boxes[i].width,
-               bounding_boxes[i].height))
-print("    },")
-print("};")
-print("")
-
-
-print ("uint32_t %s_color_data[] = {" % imageName)
-line = "    "
-i = 0
-for color in color_data:
-    if (i < len(color_data)-1):
-        line += "%s, " % color
+        result = converter.convert(args.input_file, sys.stdout)
+
+    if args.error_file:
+        with open(args.error_file, 'w') as err:
+            err.write(result.errors)
+            if cache is not None:
+                print(cache.stats_string(), file=err)
     else:
-        line += "%s" % color
-    i += 1
-    if (i % 4 == 0):
-        print(line)
-        line = "    "
-    
-print(line)
-
-print("};")
-print("")
-
-#print(g_cmd)
-#print(g_arg)
-#print(json.dumps(attributes, indent=4))
-print(f"==================", file=sys.stderr)
-print(f"## {input_file}", file=sys.stderr)
-print(f"    Nb.Paths    : {len(paths)}", file=sys.stderr)
-print(f"    MoveTo      : {g_cmd.count('M')+g_cmd.count('m')}", file=sys.stderr)
-print(f"    LineTo      : {g_cmd.count('L')+g_cmd.count('l')}", file=sys.stderr)
-print(f"    Quadr Bezier: {g_cmd.count('Q')+g_cmd.count('q')}", file=sys.stderr)
-print(f"    Cubic Bezier: {g_cmd.count('C')+g_cmd.count('c')}", file=sys.stderr)
+        sys.stderr.write(result.errors)
+        if cache is not None:
+            print(cache.stats_string(), file=sys.stderr)
+
+    # Reports are written next to .err file, gpu-vglite-toolkit.sh writes <name>.err to current directory
+    error_file = args.error_file if args.error_file else Path(args.input_file).stem + '.err'
+    if result.profile is not None:
+        with open(profile_file_for(error_file), 'w') as f:
+            json.dump(result.profile, f, indent=2)
+    if args.stats and result.stats is not None:
+        with open(stats_file_for(error_file), 'w') as f:
+            json.dump(result.stats, f, indent=2)
+    return result.exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
 
 
 # Commands used in Tiger
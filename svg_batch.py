@@ -0,0 +1,299 @@
+#! /usr/bin/env python3
+
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Batch conversion of SVG assets.
+#
+# Converting each SVG with a fresh 'python3 svg2h.py' launch re-imports numpy
+# and svgpathtools for every file. This application accepts directories, glob
+# patterns and manifest files, and converts all of them in one invocation
+# across a pool of worker processes. Every worker imports the heavy modules
+# once and then converts many files in-process with svg2h.Converter.
+#
+# For every input it writes <name>.h and <name>.err in the output directory,
+# exactly as gpu-vglite-toolkit.sh would for a single file, and prints a
+# consolidated summary at the end.
+#
+# Usage:
+#   svg_batch.py [-j JOBS] [-o OUTPUT_DIR] [-m MANIFEST] [--summary FILE] [INPUT ...]
+#
+#   INPUT can be a SVG file, a directory (searched recursively for *.svg and *.svgz)
+#   or a glob pattern e.g. 'icons/**/*.svg'.
+#   MANIFEST is a text file with one SVG path per line, '#' starts a comment.
+#
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import svg2h
+from svg_cache import ConversionCache, DEFAULT_CACHE_SIZE, parse_size
+from svg_profile import profile_file_for
+from svg_stats import STATS_SUFFIX, aggregate_stats, stats_file_for
+
+_GLOB_CHARS = set('*?[')
+
+# Converter of the current worker process
+_converter = None
+
+
+class BatchJob:
+    """
+    Single SVG conversion request of a batch run
+    """
+    def __init__(self, input_file, output_file, error_file, blob_file=None):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.error_file = error_file
+        # Binary blob output, header then describes the blob layout
+        self.blob_file = blob_file
+
+
+class BatchResult:
+    """
+    Outcome of a single SVG conversion
+    """
+    def __init__(self, job, exit_code, elapsed, summary, from_cache=False, stats=None):
+        self.job = job
+        self.exit_code = exit_code
+        self.elapsed = elapsed
+        # Path summary printed by converter at the end of .err file
+        self.summary = summary
+        self.from_cache = from_cache
+        # Statistics of converted asset, see svg_stats.py
+        self.stats = stats
+
+    def is_ok(self):
+        return self.exit_code == 0
+
+
+def _read_manifest(manifest_file):
+    """
+    Read SVG file names from manifest, relative names are resolved
+    against the directory of the manifest
+    """
+    base_dir = os.path.dirname(manifest_file)
+    files = []
+    with open(manifest_file, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if len(line) == 0:
+                continue
+            if not os.path.isabs(line):
+                line = os.path.join(base_dir, line)
+            files.append(line)
+    return files
+
+
+def collect_inputs(inputs, manifests=()):
+    """
+    Expand directories, glob patterns and manifests into a list of
+    (svg file, relative output stem) tuples in a stable order
+    """
+    found = []
+    for name in inputs:
+        if os.path.isdir(name):
+            svg_files = list(Path(name).rglob('*.svg')) + list(Path(name).rglob('*.svgz'))
+            for f in sorted(svg_files):
+                found.append((str(f), str(f.relative_to(name).with_suffix(''))))
+        elif _GLOB_CHARS.intersection(name):
+            for f in sorted(glob.glob(name, recursive=True)):
+                found.append((f, Path(f).stem))
+        else:
+            found.append((name, Path(name).stem))
+
+    for manifest in manifests:
+        for f in _read_manifest(manifest):
+            found.append((f, Path(f).stem))
+
+    return found
+
+
+def make_jobs(inputs, output_dir, blob=False):
+    """
+    Create conversion jobs, one .h and .err pair per input file
+    (and .bin when 'blob' is set)
+    """
+    jobs = []
+    used_stems = {}
+    for input_file, stem in inputs:
+        if stem in used_stems:
+            if os.path.abspath(used_stems[stem]) == os.path.abspath(input_file):
+                # Same file listed twice, e.g. by directory and manifest
+                continue
+            print(f'ERROR: {input_file} and {used_stems[stem]} both map to {stem}.h', file=sys.stderr)
+            sys.exit(1)
+        used_stems[stem] = input_file
+        out_base = os.path.join(output_dir, stem)
+        jobs.append(BatchJob(input_file, out_base + '.h', out_base + '.err',
+                             out_base + '.bin' if blob else None))
+    return jobs
+
+
+def _init_worker(options=None, cache_dir=None, cache_size=DEFAULT_CACHE_SIZE, profile=False):
+    """
+    Create converter once per worker process instead of once per file
+    """
+    global _converter
+    cache = ConversionCache(cache_dir, cache_size) if cache_dir else None
+    _converter = svg2h.Converter(options, cache, profile)
+
+
+def _extract_summary(err_text):
+    # Converter prints path summary after a line of '=' characters
+    marker = err_text.rfind('==================')
+    if marker < 0:
+        return ''
+    return err_text[marker:]
+
+
+def run_job(job):
+    """
+    Convert single SVG file in the current process.
+    Header and errors are stored the same way gpu-vglite-toolkit.sh does it.
+    """
+    start = time.perf_counter()
+    from_cache = False
+    profile = stats = None
+    os.makedirs(os.path.dirname(job.output_file) or '.', exist_ok=True)
+    try:
+        # Header and blob replace existing files only after successful conversion
+        result = svg2h.convert_to_files(_converter, job.input_file, job.output_file, job.blob_file)
+        err_text, exit_code = result.errors, result.exit_code
+        from_cache = result.from_cache
+        profile = result.profile
+        stats = result.stats
+    except Exception:
+        err_text, exit_code = traceback.format_exc(), 1
+    with open(job.error_file, 'w') as f:
+        f.write(err_text)
+    if profile is not None:
+        with open(profile_file_for(job.error_file), 'w') as f:
+            json.dump(profile, f, indent=2)
+
+    return BatchResult(job, exit_code, time.perf_counter() - start, _extract_summary(err_text), from_cache, stats)
+
+
+def run_batch(jobs, num_jobs, options=None, cache_dir=None, cache_size=DEFAULT_CACHE_SIZE, profile=False):
+    """
+    Convert all jobs across 'num_jobs' worker processes.
+    Results are returned in the order of jobs.
+    With 'profile' <name>.profile.json is written next to every .err file.
+    """
+    if num_jobs <= 1 or len(jobs) <= 1:
+        _init_worker(options, cache_dir, cache_size, profile)
+        return [run_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=num_jobs, initializer=_init_worker,
+                             initargs=(options, cache_dir, cache_size, profile)) as pool:
+        return list(pool.map(run_job, jobs, chunksize=max(1, len(jobs) // (num_jobs * 4))))
+
+
+def write_summary(results, elapsed, out, cache_dir=None):
+    failed = [r for r in results if not r.is_ok()]
+    print(f"==================", file=out)
+    print(f"## Batch summary", file=out)
+    print(f"    Files       : {len(results)}", file=out)
+    print(f"    Converted   : {len(results) - len(failed)}", file=out)
+    print(f"    Failed      : {len(failed)}", file=out)
+    print(f"    Time        : {elapsed:.2f}s", file=out)
+    if cache_dir:
+        hits = sum(1 for r in results if r.from_cache)
+        print(f"    Cache hits  : {hits}", file=out)
+        print(f"    Cache misses: {len(results) - hits}", file=out)
+    for r in failed:
+        print(f"    FAILED      : {r.job.input_file} (see {r.job.error_file})", file=out)
+    for r in results:
+        if r.summary:
+            out.write(r.summary)
+
+
+def write_stats(results, elapsed, output_dir):
+    """
+    Write statistics of every converted asset next to its .err file and
+    their aggregate to batch.stats.json
+    """
+    converted = [r for r in results if r.stats is not None]
+    for r in converted:
+        with open(stats_file_for(r.job.error_file), 'w') as f:
+            json.dump(r.stats, f, indent=2)
+    aggregate = aggregate_stats([r.stats for r in converted])
+    aggregate['files'] = len(results)
+    aggregate['failed'] = sum(1 for r in results if not r.is_ok())
+    aggregate['elapsed'] = round(elapsed, 3)
+    aggregate['conversion_seconds'] = {r.job.input_file: round(r.elapsed, 3) for r in results}
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'batch' + STATS_SUFFIX), 'w') as f:
+        json.dump(aggregate, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert many SVG files to VGLite headers in one run.')
+    parser.add_argument('inputs', nargs='*', help='SVG files, directories or glob patterns')
+    parser.add_argument('-m', '--manifest', action='append', default=[],
+                        help='text file listing SVG files, one per line')
+    parser.add_argument('-o', '--output-dir', default='.',
+                        help='directory for generated .h and .err files')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes')
+    parser.add_argument('--summary', help='write consolidated summary to this file instead of stdout')
+    parser.add_argument('--blob', action='store_true',
+                        help='write tables of every input to <name>.bin, <name>.h describes the blob layout')
+    parser.add_argument('--cache-dir', default=os.environ.get('SVG2H_CACHE_DIR'),
+                        help='reuse conversion results stored in this directory (default: $SVG2H_CACHE_DIR)')
+    parser.add_argument('--cache-size', type=parse_size,
+                        default=os.environ.get('SVG2H_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+                        help='upper bound of cache size e.g. 512M (default: $SVG2H_CACHE_SIZE or 256M)')
+    parser.add_argument('--stats', action='store_true',
+                        help='write statistics of every input to <name>.stats.json next to <name>.err '
+                             'and the aggregate of all inputs to batch.stats.json in the output directory')
+    parser.add_argument('--profile', action='store_true',
+                        help='write per-stage profile of every input to <name>.profile.json next to <name>.err')
+    svg2h.ConversionOptions.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if svg2h.svg_processing is None:
+        print("ERROR: Please include \"python module\" svgpathtools in PYTHONPATH", file=sys.stderr)
+        return 1
+
+    inputs = collect_inputs(args.inputs, args.manifest)
+    if len(inputs) == 0:
+        print('ERROR: No input svg files found.', file=sys.stderr)
+        return 1
+
+    for input_file, _ in inputs:
+        if os.access(input_file, os.R_OK) == False:
+            print(f'ERROR: {input_file} is not accessible.', file=sys.stderr)
+            return 1
+
+    jobs = make_jobs(inputs, args.output_dir, args.blob)
+    start = time.perf_counter()
+    options = svg2h.ConversionOptions.from_args(args)
+    results = run_batch(jobs, args.jobs, options, args.cache_dir, args.cache_size, args.profile)
+    elapsed = time.perf_counter() - start
+
+    if args.stats:
+        write_stats(results, elapsed, args.output_dir)
+
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            write_summary(results, elapsed, f, args.cache_dir)
+    else:
+        write_summary(results, elapsed, sys.stdout, args.cache_dir)
+
+    return 0 if all(r.is_ok() for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
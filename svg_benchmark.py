@@ -0,0 +1,234 @@
+#! /usr/bin/env python3
+
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Scaling benchmark of SVG to header conversion.
+#
+# Synthetic documents (svg_synth.py) are generated for a series of values of
+# every scaling dimension while the other parameters keep their base value.
+# Every document is converted in-process 'repeat' times, the fastest time of
+# every stage (parse, path_data, resolve, arcs, simplify, data_type, format,
+# emit, total) is kept.
+#
+# Results are written as JSON. For every dimension the scaling exponent of
+# every stage (slope of log(time) over log(parameter)) is reported, an
+# exponent above --max-exponent marks super-linear scaling. With --compare
+# the run is checked against an earlier JSON report.
+#
+# Usage:
+#   svg_benchmark.py [--quick] [--repeat N] [-o REPORT.json] [--compare OLD.json]
+#
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+from io import StringIO
+
+import svg2h
+from svg_synth import SyntheticSpec, generate_svg
+
+REPORT_FORMAT = 1
+
+# Values of every dimension, other parameters keep SyntheticSpec defaults
+SCALING_SERIES = {
+    'paths': [250, 500, 1000, 2000, 4000],
+    'segments': [4, 8, 16, 32, 64],
+    'depth': [1, 4, 16, 64],
+    'transform_density': [0.0, 0.25, 0.5, 1.0],
+    'gradients': [4, 16, 64, 256],
+    'refs_per_gradient': [1, 2, 4, 8],
+}
+
+QUICK_SERIES = {
+    'paths': [100, 200, 400],
+    'segments': [4, 8, 16],
+    'depth': [1, 4, 16],
+    'transform_density': [0.0, 0.5, 1.0],
+    'gradients': [4, 16, 64],
+    'refs_per_gradient': [1, 2, 4],
+}
+
+DEFAULT_MAX_EXPONENT = 1.3
+# Allowed slowdown of a stage against --compare report
+DEFAULT_MAX_SLOWDOWN = 1.25
+# Stages faster than this are too noisy to compare (seconds)
+_MIN_COMPARED_TIME = 0.005
+
+
+class BenchmarkCase:
+    """
+    Synthetic document of one point of a scaling series
+    """
+    def __init__(self, dimension, value, spec):
+        self.dimension = dimension
+        self.value = value
+        self.spec = spec
+
+    @property
+    def name(self):
+        return f"{self.dimension}={self.value}"
+
+
+def make_cases(series, base=None):
+    base = base if base is not None else SyntheticSpec()
+    cases = []
+    for dimension, values in series.items():
+        for value in values:
+            spec = SyntheticSpec(**base.to_dict())
+            setattr(spec, dimension, value)
+            cases.append(BenchmarkCase(dimension, value, spec))
+    return cases
+
+
+def run_case(case, converter, work_dir, repeat):
+    """
+    Convert synthetic document of 'case', return its JSON entry
+    """
+    svg_file = os.path.join(work_dir, case.name.replace('=', '_') + '.svg')
+    with open(svg_file, 'w') as f:
+        generate_svg(case.spec, f)
+
+    stages = {}
+    for _ in range(repeat):
+        out = StringIO()
+        result = converter.convert(svg_file, out)
+        if not result.is_ok():
+            raise RuntimeError(f"Conversion of {case.name} failed:\n{result.errors}")
+        for stage, seconds in result.stage_times.items():
+            stages[stage] = min(seconds, stages.get(stage, seconds))
+    return {
+        'name': case.name,
+        'dimension': case.dimension,
+        'value': case.value,
+        'spec': case.spec.to_dict(),
+        'input_bytes': os.path.getsize(svg_file),
+        'header_bytes': len(out.getvalue()),
+        'paths': result.path_count,
+        'stages': stages,
+    }
+
+
+def _slope(xs, ys):
+    # Least squares slope of ys over xs
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def scaling_exponents(cases):
+    """
+    Slope of log(time) over log(value) per dimension and stage. Series with
+    non-positive values and stages too fast to measure are left out.
+    """
+    exponents = {}
+    for dimension in dict.fromkeys(case['dimension'] for case in cases):
+        series = [case for case in cases if case['dimension'] == dimension]
+        if len(series) < 2 or any(case['value'] <= 0 for case in series):
+            continue
+        log_values = [math.log(case['value']) for case in series]
+        exponents[dimension] = {
+            stage: round(_slope(log_values, [math.log(case['stages'][stage]) for case in series]), 3)
+            for stage in series[-1]['stages']
+            if all(case['stages'].get(stage, 0) > 0 for case in series)
+            and series[-1]['stages'][stage] >= _MIN_COMPARED_TIME
+        }
+    return exponents
+
+
+def find_regressions(report, baseline, max_slowdown):
+    """
+    Return list of (case name, stage, baseline seconds, seconds) slower than
+    'max_slowdown' times the baseline
+    """
+    previous = {case['name']: case for case in baseline['cases']}
+    regressions = []
+    for case in report['cases']:
+        old = previous.get(case['name'])
+        if old is None:
+            continue
+        for stage, seconds in case['stages'].items():
+            old_seconds = old['stages'].get(stage)
+            if old_seconds is None or max(old_seconds, seconds) < _MIN_COMPARED_TIME:
+                continue
+            if seconds > old_seconds * max_slowdown:
+                regressions.append((case['name'], stage, old_seconds, seconds))
+    return regressions
+
+
+def run_benchmark(series, repeat=3, options=None, log=None):
+    converter = svg2h.Converter(options)
+    cases = []
+    with tempfile.TemporaryDirectory(prefix='svg_benchmark_') as work_dir:
+        for case in make_cases(series):
+            entry = run_case(case, converter, work_dir, repeat)
+            if log is not None:
+                print(f"{entry['name']:<28} paths {entry['paths']:>6}  total {entry['stages']['total']:.3f}s",
+                      file=log)
+            cases.append(entry)
+    options = converter.options
+    return {
+        'format': REPORT_FORMAT,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'options': vars(options),
+        'cases': cases,
+        'scaling': scaling_exponents(cases),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark conversion of synthetic SVG documents.')
+    parser.add_argument('--quick', action='store_true', help='run short series, e.g. in CI')
+    parser.add_argument('--repeat', type=int, default=3, help='conversions per document, fastest is kept')
+    parser.add_argument('-o', '--output', help='write JSON report to this file (default: stdout)')
+    parser.add_argument('--compare', metavar='REPORT', help='JSON report of an earlier run to compare with')
+    parser.add_argument('--max-slowdown', type=float, default=DEFAULT_MAX_SLOWDOWN,
+                        help=f'allowed stage time ratio against --compare report (default: {DEFAULT_MAX_SLOWDOWN})')
+    parser.add_argument('--max-exponent', type=float, default=DEFAULT_MAX_EXPONENT,
+                        help=f'scaling exponent reported as super-linear (default: {DEFAULT_MAX_EXPONENT})')
+    svg2h.ConversionOptions.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if svg2h.svg_processing is None:
+        print("ERROR: Please include \"python module\" svgpathtools in PYTHONPATH", file=sys.stderr)
+        return 1
+
+    options = svg2h.ConversionOptions.from_args(args)
+    report = run_benchmark(QUICK_SERIES if args.quick else SCALING_SERIES, args.repeat, options, sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    exit_code = 0
+    for dimension, stages in report['scaling'].items():
+        for stage, exponent in stages.items():
+            if exponent > args.max_exponent:
+                print(f"WARNING: {stage} scales super-linearly with {dimension} (exponent {exponent})",
+                      file=sys.stderr)
+                exit_code = 1
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        for name, stage, old_seconds, seconds in find_regressions(report, baseline, args.max_slowdown):
+            print(f"WARNING: {name} {stage} slowed down {old_seconds:.3f}s -> {seconds:.3f}s", file=sys.stderr)
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
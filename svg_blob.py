@@ -0,0 +1,466 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Binary asset blob.
+#
+# Instead of C arrays in a header, all tables of an image are stored in one
+# little-endian binary file which can be linked with incbin or placed in
+# external flash. The file starts with a fixed header and a section table:
+#
+#   svg_blob_header_t                    magic "VGLB", version, image info
+#   svg_blob_section_t[section_count]    offset, size, count, item size
+#   sections                             each aligned to 4 bytes
+#
+# Structures of every section are described by numpy dtypes below, the same
+# descriptions generate the C typedefs of the layout header.
+#
+
+import mmap
+import re
+import struct
+import numpy as np
+
+from svg_path_data import PATH_COMMAND_ARGCNT
+from svg_paint_table import *
+
+BLOB_MAGIC = b'VGLB'
+BLOB_VERSION = 2
+BLOB_ALIGNMENT = 4
+
+# Marks missing reference, e.g. path without dash pattern
+BLOB_NONE = 0xFFFFFFFF
+
+# Following values are the same as in vg_lite.h
+VGLITE_FORMATS = {'int8_t': 0, 'int16_t': 1, 'int32_t': 2, 'float': 3}   # vg_lite_format_t
+VGLITE_OPCODES = {'END': 0, 'CLOSE': 1, 'M': 2, 'L': 4, 'Q': 6, 'C': 8}
+VGLITE_CAP_STYLES = {'VG_LITE_CAP_BUTT': 0, 'VG_LITE_CAP_ROUND': 1, 'VG_LITE_CAP_SQUARE': 2}
+VGLITE_JOIN_STYLES = {'VG_LITE_JOIN_MITER': 0, 'VG_LITE_JOIN_ROUND': 1, 'VG_LITE_JOIN_BEVEL': 2}
+VGLITE_FILL_RULES = {'VG_LITE_FILL_NON_ZERO': 0, 'VG_LITE_FILL_EVEN_ODD': 1}
+VGLITE_PATH_TYPES = {'VG_LITE_DRAW_ZERO': 0, 'VG_LITE_DRAW_STROKE_PATH': 1,
+                     'VG_LITE_DRAW_FILL_PATH': 2, 'VG_LITE_DRAW_FILL_STROKE_PATH': 3}
+
+# fill_mode_t is defined by application, blob uses its own numbering
+BLOB_FILL_MODES = {'NO_FILL_MODE': 0, 'FILL_CONSTANT': 1, 'FILL_LINEAR_GRAD': 2,
+                   'FILL_RADIAL_GRAD': 3, 'STROKE': 4}
+
+BLOB_GRADIENT_LINEAR = 0
+BLOB_GRADIENT_RADIAL = 1
+
+# Element type of path data for each data type
+_PATH_DATA_DTYPES = {'int8_t': '<i1', 'int16_t': '<i2', 'int32_t': '<i4', 'float': '<f4'}
+
+# (C type name, fields), field is (name, numpy type[, array length])
+_C_TYPES = {'<u4': 'uint32_t', '<i4': 'int32_t', '<f4': 'float', '<u2': 'uint16_t'}
+
+HEADER_LAYOUT = ('svg_blob_header_t', [
+    ('magic', '<u4'),
+    ('version', '<u2'),
+    ('data_format', '<u2'),
+    ('width', '<i4'),
+    ('height', '<i4'),
+    ('path_count', '<u4'),
+    ('section_count', '<u4'),
+])
+
+SECTION_LAYOUT = ('svg_blob_section_t', [
+    ('offset', '<u4'),
+    ('size', '<u4'),
+    ('count', '<u4'),
+    ('item_size', '<u4'),
+])
+
+# Sections in the order they are stored. Layout is None for sections of
+# plain values, path data elements depend on data type.
+SECTIONS = [
+    ('path_info', ('svg_blob_path_info_t', [
+        ('data_offset', '<u4'),         # byte offset within path_data section
+        ('data_length', '<u4'),         # size of path data in bytes
+        ('bounding_box', '<f4', 4),
+        ('end_path_flag', '<u4'),
+    ])),
+    ('path_data', None),
+    ('stroke_info', ('svg_blob_stroke_info_t', [
+        ('dash_pattern_count', '<u4'),
+        ('dash_phase', '<f4'),
+        ('dash_pattern', '<u4'),        # index into dash_patterns, SVG_BLOB_NONE if none
+        ('stroke_width', '<f4'),
+        ('miterlimit', '<f4'),
+        ('stroke_color', '<u4'),
+        ('linecap', '<u4'),
+        ('linejoin', '<u4'),
+    ])),
+    ('stroke_refs', None),              # uint32_t index into stroke_info, per path
+    ('dash_patterns', None),            # float
+    ('gradients', ('svg_blob_gradient_t', [
+        ('type', '<u4'),                # SVG_BLOB_GRADIENT_LINEAR/RADIAL
+        ('stop_count', '<u4'),
+        ('stops', '<u4'),               # index into gradient_stops
+        ('params', '<f4', 5),           # x1, y1, x2, y2 or cx, cy, r, fx, fy
+    ])),
+    ('gradient_stops', ('svg_blob_stop_t', [
+        ('offset', '<f4'),
+        ('stop_color', '<u4'),
+    ])),
+    ('gradient_refs', ('svg_blob_gradient_ref_t', [
+        ('linear', '<i4'),              # gradient index or -1
+        ('radial', '<i4'),
+    ])),
+    ('hybrid_paths', ('svg_blob_hybrid_path_t', [
+        ('fill_type', '<u4'),           # SVG_BLOB_FILL_*
+        ('path_type', '<u4'),           # vg_lite_draw_path_type_t
+    ])),
+    ('transforms', ('svg_blob_transform_t', [
+        ('matrix', '<f4', 9),
+    ])),
+    ('fill_rules', None),               # vg_lite_fill_t as uint32_t
+    ('colors', None),                   # uint32_t
+]
+
+SECTION_NAMES = [name for name, layout in SECTIONS]
+
+_PLAIN_SECTION_DTYPES = {'stroke_refs': '<u4', 'dash_patterns': '<f4', 'fill_rules': '<u4', 'colors': '<u4'}
+
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+def layout_dtype(layout, align=False):
+    """
+    numpy dtype of C structure 'layout', with 'align' fields get the natural
+    alignment of C
+    """
+    return np.dtype([field if len(field) == 2 else (field[0], field[1], (field[2],))
+                     for field in layout[1]], align=align)
+
+
+def section_dtype(name, data_type='int32_t'):
+    """
+    numpy dtype of items of section 'name'
+    """
+    if name == 'path_data':
+        return np.dtype(_PATH_DATA_DTYPES[data_type])
+    if name in _PLAIN_SECTION_DTYPES:
+        return np.dtype(_PLAIN_SECTION_DTYPES[name])
+    return layout_dtype(dict(SECTIONS)[name])
+
+
+_HEADER_DTYPE = layout_dtype(HEADER_LAYOUT)
+_SECTION_DTYPE = layout_dtype(SECTION_LAYOUT)
+
+
+def _align(size):
+    return (size + BLOB_ALIGNMENT - 1) // BLOB_ALIGNMENT * BLOB_ALIGNMENT
+
+
+def _c_struct(layout):
+    name, fields = layout
+    lines = ["typedef struct {"]
+    for field in fields:
+        array = f"[{field[2]}]" if len(field) == 3 else ""
+        lines.append(f"    {_C_TYPES[field[1]]} {field[0]}{array};")
+    lines.append(f"}} {name};")
+    return "\n".join(lines)
+
+
+def _hex_color(color):
+    # Colors are strings like "0xff0000ff"
+    try:
+        return int(str(color), 16)
+    except ValueError:
+        return 0
+
+
+class BlobWriter:
+    """
+    Collect tables of one image and write them as binary blob.
+    Identical strokes, dash patterns, gradients and stops are stored once.
+    """
+    def __init__(self, data_type='int32_t', paint_tables=None):
+        self.data_type = data_type
+        self.paint_tables = paint_tables if paint_tables is not None else PaintTableBuilder()
+        self.width = 0
+        self.height = 0
+        self.path_info = []
+        self.path_data = []
+        self.path_data_size = 0
+        self.stroke_info = []
+        self.stroke_refs = []
+        self.dash_patterns = []
+        self.gradients = []
+        self.gradient_stops = []
+        self.gradient_refs = []
+        self.hybrid_paths = []
+        self.transforms = []
+        self.fill_rules = []
+        self.colors = []
+        # Bytes per section, set by to_bytes()
+        self.section_sizes = {}
+
+    def set_image_size(self, width, height):
+        self.width = width
+        self.height = height
+
+    def add_path(self, path, bbox, end_path_flag, same_as=None):
+        """
+        Add PathData. Coordinates get the same value as the C initializer
+        '(data_type) %.2f' in header output.
+        With 'same_as' the path shares data of that earlier path.
+        """
+        if same_as is not None:
+            offset, size = self.path_info[same_as][:2]
+            self.path_info.append((offset, size, bbox, end_path_flag))
+            return
+        elements = []
+        opcodes = []
+        i = 0
+        for cmd in path.commands:
+            if cmd not in VGLITE_OPCODES:
+                raise ValueError(f"Unknown command {cmd}")
+            argcnt = PATH_COMMAND_ARGCNT[cmd]
+            opcodes.append((len(elements), VGLITE_OPCODES[cmd]))
+            elements.append(0.0)
+            elements.extend([float('%.2f' % coord) for coord in path.coords[i:i + argcnt]])
+            i += argcnt
+        opcodes.append((len(elements), VGLITE_OPCODES['END']))
+        elements.append(0.0)
+
+        values = np.array(elements, dtype=np.float64)
+        if self.data_type == 'float':
+            values = values.astype('<f4')
+            # Opcode shares storage with data, for float it is uint32_t
+            commands = values.view('<u4')
+        else:
+            # C cast truncates towards zero
+            values = np.trunc(values).astype(_PATH_DATA_DTYPES[self.data_type])
+            commands = values
+        index, codes = zip(*opcodes)
+        commands[list(index)] = codes
+        data = values.tobytes()
+        self.path_info.append((self.path_data_size, len(data), bbox, end_path_flag))
+        padded = _align(len(data))
+        self.path_data.append(data + bytes(padded - len(data)))
+        self.path_data_size += padded
+
+    def add_stroke(self, dash_array=None, dash_phase=0.0, width=1.0, miterlimit=4.0,
+                   color=0, linecap='VG_LITE_CAP_BUTT', linejoin='VG_LITE_JOIN_MITER'):
+        """
+        Add stroke_info entry, 'dash_array' is SVG stroke-dasharray string
+        """
+        dash_index = BLOB_NONE
+        dash_count = 0
+        if dash_array is not None:
+            dashes = [float(v) for v in _NUMBER_RE.findall(dash_array)]
+            # Odd number of dashes is repeated to get even number
+            if len(dashes) % 2:
+                dashes = dashes + dashes
+            dash_count = len(dashes)
+            dash_index, is_new = self.paint_tables.dash_patterns.intern(
+                tuple(dashes), len(self.dash_patterns), DASH_SIZE * dash_count)
+            if is_new:
+                self.dash_patterns.extend(dashes)
+        self._add_stroke_info((dash_count, float(dash_phase), dash_index, float(width),
+                               float(miterlimit), _hex_color(color),
+                               VGLITE_CAP_STYLES[linecap], VGLITE_JOIN_STYLES[linejoin]))
+
+    def add_empty_stroke(self):
+        self._add_stroke_info((0, 0.0, BLOB_NONE, 0.0, 0.0, 0, 0, 0))
+
+    def _add_stroke_info(self, stroke):
+        index, is_new = self.paint_tables.strokes.intern(stroke, len(self.stroke_info), STROKE_INFO_SIZE)
+        if is_new:
+            self.stroke_info.append(stroke)
+        self.stroke_refs.append(index)
+
+    def add_gradient(self, kind, params, stops):
+        """
+        Add gradient, 'stops' is list of GradientStopPoints.
+        Gradients must be added in order of their index.
+        """
+        first_stop, is_new = self.paint_tables.stops.intern(
+            stops_key(stops), len(self.gradient_stops), STOP_SIZE * len(stops))
+        self.gradients.append((kind, len(stops), first_stop,
+                               tuple(params) + (0.0,) * (5 - len(params))))
+        if is_new:
+            for stop in stops:
+                self.gradient_stops.append((stop.offset, _hex_color(stop.color_str)))
+
+    def add_gradient_ref(self, linear=None, radial=None):
+        self.gradient_refs.append((-1 if linear is None else linear, -1 if radial is None else radial))
+
+    def add_hybrid_path(self, fill_type, path_type):
+        self.hybrid_paths.append((BLOB_FILL_MODES[fill_type], VGLITE_PATH_TYPES[path_type]))
+
+    def add_transform(self, matrix):
+        self.transforms.append((tuple(matrix),))
+
+    def add_fill_rule(self, fill_rule):
+        self.fill_rules.append(VGLITE_FILL_RULES[fill_rule])
+
+    def add_color(self, color):
+        self.colors.append(_hex_color(color))
+
+    def _section_bytes(self, name):
+        if name == 'path_data':
+            return b''.join(self.path_data), len(self.path_info)
+        items = getattr(self, name)
+        if name == 'path_info':
+            items = [(offset, length, tuple(bbox), flag) for offset, length, bbox, flag in items]
+        return np.array(items, dtype=section_dtype(name)).tobytes(), len(items)
+
+    def to_bytes(self):
+        """
+        Return whole blob
+        """
+        sections = [self._section_bytes(name) for name in SECTION_NAMES]
+        # Section sizes without alignment, reported in conversion statistics
+        self.section_sizes = {name: len(data) for name, (data, count) in zip(SECTION_NAMES, sections)}
+        offset = _align(_HEADER_DTYPE.itemsize + _SECTION_DTYPE.itemsize * len(sections))
+
+        table = np.zeros(len(sections), dtype=_SECTION_DTYPE)
+        for i, (name, (data, count)) in enumerate(zip(SECTION_NAMES, sections)):
+            table[i] = (offset, len(data), count, section_dtype(name, self.data_type).itemsize)
+            offset += _align(len(data))
+
+        header = np.array([(struct.unpack('<I', BLOB_MAGIC)[0], BLOB_VERSION,
+                            VGLITE_FORMATS[self.data_type], self.width, self.height,
+                            len(self.path_info), len(sections))], dtype=_HEADER_DTYPE)
+        parts = [header.tobytes(), table.tobytes()]
+        size = len(parts[0]) + len(parts[1])
+        parts.append(bytes(_align(size) - size))
+        for data, count in sections:
+            parts.append(data)
+            parts.append(bytes(_align(len(data)) - len(data)))
+        return b''.join(parts)
+
+    def write(self, f):
+        """
+        Write blob into binary stream, return its size
+        """
+        data = self.to_bytes()
+        f.write(data)
+        return len(data)
+
+
+def layout_header(c_name, blob_name, blob_size, data_type, path_count):
+    """
+    Return C header describing blob layout and the stored image
+    """
+    lines = [
+        "#ifndef SVG_BLOB_LAYOUT_H",
+        "#define SVG_BLOB_LAYOUT_H",
+        "",
+        "#include <stdint.h>",
+        "",
+        "/* All values are little-endian, sections are aligned to %d bytes. */" % BLOB_ALIGNMENT,
+        "#define SVG_BLOB_MAGIC 0x%08xu /* \"%s\" */" % (struct.unpack('<I', BLOB_MAGIC)[0], BLOB_MAGIC.decode()),
+        "#define SVG_BLOB_VERSION %d" % BLOB_VERSION,
+        "#define SVG_BLOB_NONE 0x%08xu" % BLOB_NONE,
+        "",
+    ]
+    for i, name in enumerate(SECTION_NAMES):
+        lines.append("#define SVG_BLOB_SECTION_%s %d" % (name.upper(), i))
+    lines.append("#define SVG_BLOB_SECTION_COUNT %d" % len(SECTION_NAMES))
+    lines.append("")
+    lines.append("/* Path data opcodes are VGLite VLC_OP_* values, other enums are vg_lite.h values. */")
+    for name, value in BLOB_FILL_MODES.items():
+        lines.append("#define SVG_BLOB_%s %d" % (name, value))
+    lines.append("#define SVG_BLOB_GRADIENT_LINEAR %d" % BLOB_GRADIENT_LINEAR)
+    lines.append("#define SVG_BLOB_GRADIENT_RADIAL %d" % BLOB_GRADIENT_RADIAL)
+    lines.append("")
+    lines.append(_c_struct(HEADER_LAYOUT))
+    lines.append("")
+    lines.append(_c_struct(SECTION_LAYOUT))
+    for name, layout in SECTIONS:
+        if layout is not None:
+            lines.append("")
+            lines.append(_c_struct(layout))
+    lines += [
+        "",
+        "#endif",
+        "",
+        "#ifndef %s_BLOB_H" % c_name.upper(),
+        "#define %s_BLOB_H" % c_name.upper(),
+        "",
+        "#define %s_BLOB_FILE \"%s\"" % (c_name.upper(), blob_name),
+        "#define %s_BLOB_SIZE %d" % (c_name.upper(), blob_size),
+        "#define %s_PATH_COUNT %d" % (c_name.upper(), path_count),
+        "#define %s_DATA_FORMAT %s" % (c_name.upper(),
+                                        {0: 'VG_LITE_S8', 1: 'VG_LITE_S16', 2: 'VG_LITE_S32', 3: 'VG_LITE_FP32'}[VGLITE_FORMATS[data_type]]),
+        "",
+        "#endif",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+class BlobReader:
+    """
+    Zero-copy view of a blob. Sections are numpy arrays sharing memory
+    with the given buffer (bytes, bytearray, mmap or memoryview).
+    """
+    def __init__(self, buffer):
+        self.buffer = memoryview(buffer)
+        header = np.frombuffer(self.buffer, dtype=_HEADER_DTYPE, count=1)[0]
+        if header['magic'] != struct.unpack('<I', BLOB_MAGIC)[0]:
+            raise ValueError("Not a VGLite asset blob")
+        if header['version'] != BLOB_VERSION:
+            raise ValueError(f"Unsupported blob version {header['version']}")
+        formats = {value: name for name, value in VGLITE_FORMATS.items()}
+        self.version = int(header['version'])
+        self.data_type = formats[int(header['data_format'])]
+        self.width = int(header['width'])
+        self.height = int(header['height'])
+        self.path_count = int(header['path_count'])
+        self.section_table = np.frombuffer(self.buffer, dtype=_SECTION_DTYPE,
+                                           count=int(header['section_count']),
+                                           offset=_HEADER_DTYPE.itemsize)
+
+    def section(self, name):
+        """
+        Items of section 'name' as numpy array
+        """
+        entry = self.section_table[SECTION_NAMES.index(name)]
+        if name == 'path_data':
+            return self.buffer[int(entry['offset']):int(entry['offset']) + int(entry['size'])]
+        return np.frombuffer(self.buffer, dtype=section_dtype(name, self.data_type),
+                             count=int(entry['count']), offset=int(entry['offset']))
+
+    def path_data(self, index):
+        """
+        Path data elements (opcodes and coordinates) of path 'index'
+        """
+        info = self.section('path_info')[index]
+        data = self.section('path_data')
+        return np.frombuffer(data, dtype=section_dtype('path_data', self.data_type),
+                             count=int(info['data_length']) // section_dtype('path_data', self.data_type).itemsize,
+                             offset=int(info['data_offset']))
+
+    def stroke(self, index):
+        """
+        stroke_info entry of path 'index'
+        """
+        return self.section('stroke_info')[int(self.section('stroke_refs')[index])]
+
+    def dash_pattern(self, stroke):
+        """
+        Dash pattern of stroke_info entry, None if stroke is solid
+        """
+        if stroke['dash_pattern'] == BLOB_NONE:
+            return None
+        start = int(stroke['dash_pattern'])
+        return self.section('dash_patterns')[start:start + int(stroke['dash_pattern_count'])]
+
+    def gradient_stops(self, gradient):
+        start = int(gradient['stops'])
+        return self.section('gradient_stops')[start:start + int(gradient['stop_count'])]
+
+
+def load_blob(file_name):
+    """
+    Map blob file into memory and return BlobReader
+    """
+    with open(file_name, 'rb') as f:
+        return BlobReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
@@ -0,0 +1,200 @@
+#! /usr/bin/env python3
+
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Round-trip check of binary blob output (svg2h.py --blob).
+#
+# Every SVG is converted in-process to a blob with every path data type, the
+# blob is written to a file, mapped with load_blob() and checked:
+#   - header fields agree with the layout header (<NAME>_BLOB_SIZE,
+#     <NAME>_PATH_COUNT, <NAME>_DATA_FORMAT, SVG_BLOB_SECTION_* indices)
+#   - sections are aligned, inside the blob, do not overlap and hold
+#     count * item_size bytes
+#   - C structures of the layout header have the field offsets and size of
+#     the numpy dtypes the reader uses
+#   - path data of every path is a stream of opcodes and arguments ending
+#     with END
+#   - sections read back and written again give the same bytes
+#
+# Usage:
+#   svg_blob_check.py [SVG ...]        default: all SVG files in tests/
+#
+
+import argparse
+import glob
+import os
+import re
+import sys
+import tempfile
+from io import StringIO
+
+import numpy as np
+
+import svg2h
+from svg_blob import *
+
+# Path data types of blob, 'auto' selects one of them
+DATA_TYPES = ('int8_t', 'int16_t', 'int32_t', 'float')
+
+_DEFINE_RE = re.compile(r'^#define (\w+) (\S+)', re.MULTILINE)
+
+_OPCODE_ARGCNT = {VGLITE_OPCODES[cmd]: PATH_COMMAND_ARGCNT[cmd] for cmd in VGLITE_OPCODES
+                  if cmd in PATH_COMMAND_ARGCNT}
+_OPCODE_ARGCNT[VGLITE_OPCODES['CLOSE']] = 0
+
+
+def check_layouts():
+    """
+    Return errors of C structures whose layout differs from numpy dtype
+    """
+    errors = []
+    layouts = [HEADER_LAYOUT, SECTION_LAYOUT] + [layout for name, layout in SECTIONS if layout is not None]
+    for layout in layouts:
+        packed = layout_dtype(layout)
+        aligned = layout_dtype(layout, align=True)
+        for field in packed.names:
+            if packed.fields[field][1] != aligned.fields[field][1]:
+                errors.append(f"{layout[0]}.{field} is at offset {packed.fields[field][1]} in blob, "
+                              f"{aligned.fields[field][1]} in C")
+        if packed.itemsize != aligned.itemsize:
+            errors.append(f"{layout[0]} has {packed.itemsize} bytes in blob, {aligned.itemsize} in C")
+    return errors
+
+
+def _check_header(reader, blob_size, header):
+    errors = []
+    defines = dict(_DEFINE_RE.findall(header))
+    prefix = next((name[:-len('_BLOB_SIZE')] for name in defines if name.endswith('_BLOB_SIZE')), None)
+    if prefix is None:
+        return ["layout header has no _BLOB_SIZE"]
+    formats = {'int8_t': 'VG_LITE_S8', 'int16_t': 'VG_LITE_S16', 'int32_t': 'VG_LITE_S32', 'float': 'VG_LITE_FP32'}
+    expected = {
+        f'{prefix}_BLOB_SIZE': str(blob_size),
+        f'{prefix}_PATH_COUNT': str(reader.path_count),
+        f'{prefix}_DATA_FORMAT': formats[reader.data_type],
+        'SVG_BLOB_VERSION': str(reader.version),
+        'SVG_BLOB_SECTION_COUNT': str(len(reader.section_table)),
+    }
+    expected.update({f'SVG_BLOB_SECTION_{name.upper()}': str(i) for i, name in enumerate(SECTION_NAMES)})
+    for name, value in expected.items():
+        if defines.get(name) != value:
+            errors.append(f"{name} is {defines.get(name)} in header, {value} in blob")
+    return errors
+
+
+def _check_sections(reader, blob_size):
+    errors = []
+    end = 0
+    for name, entry in zip(SECTION_NAMES, reader.section_table):
+        offset, size, count, item_size = (int(entry[field]) for field in ('offset', 'size', 'count', 'item_size'))
+        if offset % BLOB_ALIGNMENT:
+            errors.append(f"section {name} at offset {offset} is not aligned")
+        if offset < end or offset + size > blob_size:
+            errors.append(f"section {name} ({offset}, {size} bytes) overlaps or exceeds blob")
+        if item_size != section_dtype(name, reader.data_type).itemsize:
+            errors.append(f"section {name} has item size {item_size}")
+        # Path data holds path_count arrays of varying size
+        if name != 'path_data' and size != count * item_size:
+            errors.append(f"section {name} has {size} bytes for {count} items")
+        end = offset + size
+    return errors
+
+
+def _check_path_data(reader):
+    errors = []
+    info = reader.section('path_info')
+    data_size = len(reader.section('path_data'))
+    for i in range(reader.path_count):
+        if int(info[i]['data_offset']) + int(info[i]['data_length']) > data_size:
+            errors.append(f"path {i} exceeds path_data section")
+            continue
+        elements = reader.path_data(i)
+        # Opcode of float path data is uint32_t stored in the same element
+        opcodes = elements.view('<u4') if reader.data_type == 'float' else elements
+        k = 0
+        while k < len(opcodes) and opcodes[k] != VGLITE_OPCODES['END']:
+            if int(opcodes[k]) not in _OPCODE_ARGCNT:
+                errors.append(f"path {i} has unknown opcode {opcodes[k]} at element {k}")
+                break
+            k += 1 + _OPCODE_ARGCNT[int(opcodes[k])]
+        else:
+            if k != len(opcodes) - 1:
+                errors.append(f"path {i} does not end with END")
+    return errors
+
+
+def _rewrite(reader):
+    # Blob written again from sections read back
+    writer = BlobWriter(reader.data_type)
+    writer.set_image_size(reader.width, reader.height)
+    for name in SECTION_NAMES:
+        if name == 'path_data':
+            writer.path_data = [bytes(reader.section(name))]
+            writer.path_data_size = len(writer.path_data[0])
+        else:
+            setattr(writer, name, reader.section(name).tolist())
+    return writer.to_bytes()
+
+
+def check_blob(input_file, data_type, directory):
+    """
+    Convert 'input_file' to blob and return (path count, blob size, errors)
+    """
+    converter = svg2h.Converter(svg2h.ConversionOptions(data_type=data_type, check_version=False))
+    blob_file = os.path.join(directory, 'check.bin')
+    header = StringIO()
+    with open(blob_file, 'wb') as f:
+        result = converter.convert(input_file, out=header, blob=f)
+    if not result.is_ok():
+        return 0, 0, ["conversion failed: " + result.errors.strip()]
+    with open(blob_file, 'rb') as f:
+        data = f.read()
+
+    reader = load_blob(blob_file)
+    errors = []
+    if reader.data_type != data_type:
+        errors.append(f"data format is {reader.data_type}")
+    if reader.path_count != result.path_count:
+        errors.append(f"blob has {reader.path_count} paths, SVG {result.path_count}")
+    errors += _check_header(reader, len(data), header.getvalue())
+    errors += _check_sections(reader, len(data))
+    if not errors:
+        errors += _check_path_data(reader)
+        if _rewrite(reader) != data:
+            errors.append("sections read back do not write the same blob")
+    return reader.path_count, len(data), errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check round-trip of binary blob output.')
+    parser.add_argument('inputs', nargs='*', metavar='SVG', help='SVG files (default: tests/*.svg)')
+    args = parser.parse_args(argv)
+
+    if svg2h.svg_processing is None:
+        print("ERROR: python module svgpathtools is not available in PYTHONPATH", file=sys.stderr)
+        return 1
+
+    inputs = args.inputs or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', '*.svg')))
+    failed = 0
+    for error in check_layouts():
+        print(f"ERROR: {error}", file=sys.stderr)
+        failed += 1
+    with tempfile.TemporaryDirectory() as directory:
+        for input_file in inputs:
+            for data_type in DATA_TYPES:
+                path_count, size, errors = check_blob(input_file, data_type, directory)
+                for error in errors:
+                    print(f"ERROR: {input_file} {data_type}: {error}", file=sys.stderr)
+                failed += len(errors)
+                if not errors:
+                    print(f"OK: {input_file} {data_type}: {path_count} paths, {size} bytes")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
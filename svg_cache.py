@@ -0,0 +1,160 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# On-disk conversion cache.
+#
+# Conversion result of a SVG file is stored under a key made from
+#   * SVG file contents and its name (name is part of generated C identifiers)
+#   * conversion options
+#   * sources of this toolkit and of svgpathtools
+# A cache hit returns stored header and .err text without parsing the SVG.
+# Total cache size is bounded, least recently used entries are evicted first.
+#
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Default upper bound of cache size in bytes
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+
+_CACHE_ENTRY_SUFFIX = '.json'
+_SIZE_SUFFIXES = {'K': 1024, 'M': 1024 * 1024, 'G': 1024 * 1024 * 1024}
+
+_toolkit_version = None
+
+
+def parse_size(size_str):
+    """
+    Convert size string like '512K', '64M' or '1G' into bytes
+    """
+    size_str = str(size_str).strip().upper().rstrip('B')
+    if size_str and size_str[-1] in _SIZE_SUFFIXES:
+        return int(float(size_str[:-1]) * _SIZE_SUFFIXES[size_str[-1]])
+    return int(size_str)
+
+
+def _hash_sources(hasher, directory, pattern):
+    for source in sorted(Path(directory).glob(pattern)):
+        hasher.update(source.name.encode())
+        hasher.update(source.read_bytes())
+
+
+def get_toolkit_version():
+    """
+    Fingerprint of toolkit and svgpathtools sources.
+    Any change in converter code invalidates previously cached results.
+    """
+    global _toolkit_version
+    if _toolkit_version is None:
+        hasher = hashlib.sha256()
+        _hash_sources(hasher, os.path.dirname(os.path.abspath(__file__)), 'svg*.py')
+        try:
+            import svgpathtools
+            _hash_sources(hasher, os.path.dirname(svgpathtools.__file__), '*.py')
+        except ImportError:
+            pass
+        _toolkit_version = hasher.hexdigest()
+    return _toolkit_version
+
+
+class ConversionCache:
+    """
+    Size-bounded LRU cache of conversion results in 'cache_dir'.
+    Entries are files, the modification time records last use.
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, input_file, options):
+        hasher = hashlib.sha256()
+        hasher.update(get_toolkit_version().encode())
+        hasher.update(options.cache_key().encode())
+        hasher.update(str(input_file).encode())
+        with open(input_file, 'rb') as f:
+            hasher.update(f.read())
+        return hasher.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + _CACHE_ENTRY_SUFFIX)
+
+    def get(self, key):
+        """
+        Return stored entry as dictionary, None on cache miss
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r') as f:
+                entry = json.load(f)
+            # Mark entry as most recently used
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """
+        Store entry dictionary and evict old entries when cache is too large
+        """
+        # Write to temporary file and rename, so parallel conversions
+        # never observe partially written entries.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._entry_path(key))
+        except OSError as e:
+            print(f"WARNING: Unable to store cache entry: {e}", file=sys.stderr)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until cache fits in max_size
+        """
+        entries = []
+        total_size = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(_CACHE_ENTRY_SUFFIX):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                # Removed by another process
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total_size += st.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        entries.sort()
+        for mtime, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                pass
+            total_size -= size
+
+    def stats_string(self):
+        return f"Cache: {self.hits} hits, {self.misses} misses, {self.evictions} evictions ({self.cache_dir})"
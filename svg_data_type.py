@@ -0,0 +1,190 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Selection of path data type.
+#
+# Coordinates of all paths of an asset are analyzed to find the smallest
+# VGLite data type which can hold them. Integer types may use a fixed-point
+# scale 2^n: coordinates are stored multiplied by the scale and the path
+# transform is divided by it, so the image is drawn at the same place.
+#
+
+import math
+import numpy as np
+
+# Range of values of integer data types
+DATA_TYPE_RANGES = {
+    'int8_t': (-128, 127),
+    'int16_t': (-32768, 32767),
+    'int32_t': (-2147483648, 2147483647),
+}
+
+# Size of data_mnemonic_t element in bytes
+DATA_TYPE_SIZES = {
+    'int8_t': 1,
+    'int16_t': 2,
+    'int32_t': 4,
+    'float': 4,
+}
+
+# Candidates of automatic selection, smallest first.
+# When no integer type fits, coordinates are stored as float.
+AUTO_DATA_TYPES = ('int8_t', 'int16_t', 'int32_t')
+
+# Largest fixed-point scale is 2^MAX_FRACTION_BITS, unless tolerance needs more
+MAX_FRACTION_BITS = 8
+
+# Allowed difference between SVG coordinate and stored coordinate (in pixels)
+DEFAULT_TOLERANCE = 0.1
+
+
+class DataTypeReport:
+    """
+    Outcome of coordinate analysis for selected data type and scale
+    """
+    def __init__(self, data_type, scale, auto, tolerance):
+        self.data_type = data_type
+        self.scale = scale
+        self.auto = auto
+        self.tolerance = tolerance
+        self.coord_count = 0
+        self.min_coord = 0.0
+        self.max_coord = 0.0
+        # Coordinates outside range of data type
+        self.overflow_count = 0
+        # Coordinates stored with error larger than tolerance
+        self.loss_count = 0
+        self.max_error = 0.0
+
+    def scale_string(self):
+        if self.scale == 1:
+            return "none"
+        return f"1/{self.scale:g}"
+
+
+def collect_coordinates(paths):
+    """
+    Coordinates of all PathData as one array
+    """
+    if len(paths) == 0:
+        return np.empty(0)
+    return np.concatenate([np.asarray(path.coords, dtype=np.float64) for path in paths])
+
+
+def _fraction_bits(tolerance):
+    # Rounding to 1/2^n has error of at most 0.5/2^n
+    if tolerance >= 0.5:
+        return 0
+    return math.ceil(math.log2(0.5 / tolerance))
+
+
+def select_data_type(coords, tolerance=DEFAULT_TOLERANCE):
+    """
+    Return (data_type, scale) of the smallest integer type which holds all
+    coordinates with error within tolerance, ('float', 1) if none does.
+    Every scale fitting in a type is measured, scale 1 with the truncating
+    store of unscaled coordinates. The scale with the smallest error is used,
+    the smaller scale when errors are equal.
+    """
+    if tolerance <= 0:
+        return 'float', 1
+    if len(coords) == 0:
+        return AUTO_DATA_TYPES[0], 1
+
+    # Fractional scales up to the one whose rounding error is within tolerance
+    max_bits = max(MAX_FRACTION_BITS, _fraction_bits(tolerance))
+    extremes = np.array([coords.min(), coords.max()])
+    for data_type in AUTO_DATA_TYPES:
+        type_min, type_max = DATA_TYPE_RANGES[data_type]
+        best = None
+        for bits in range(max_bits + 1):
+            scale = 1 << bits
+            lowest, highest = stored_values(extremes, data_type, scale) * scale
+            if lowest < type_min or highest > type_max:
+                # Larger scales do not fit either
+                break
+            error = np.abs(stored_values(coords, data_type, scale) - coords).max()
+            if error <= tolerance and (best is None or error < best[0]):
+                best = (error, scale)
+                if error == 0:
+                    break
+        if best is not None:
+            return data_type, best[1]
+    return 'float', 1
+
+
+def stored_values(coords, data_type, scale=1):
+    """
+    Coordinates as they end up in data_mnemonic_t array, in SVG units.
+    Unscaled coordinates are written as '(data_type) %.2f', so integer
+    types truncate them. Scaled coordinates are rounded to integers.
+    """
+    if scale != 1:
+        return np.round(coords * scale) / scale
+    values = np.round(coords, 2)
+    if data_type == 'float':
+        return values.astype(np.float32).astype(np.float64)
+    return np.trunc(values)
+
+
+def analyze(coords, data_type, scale=1, tolerance=DEFAULT_TOLERANCE, auto=False):
+    """
+    Check how coordinates are stored with given data type and scale
+    """
+    report = DataTypeReport(data_type, scale, auto, tolerance)
+    report.coord_count = len(coords)
+    if len(coords) == 0:
+        return report
+
+    report.min_coord = float(coords.min())
+    report.max_coord = float(coords.max())
+    stored = stored_values(coords, data_type, scale)
+    if data_type in DATA_TYPE_RANGES:
+        type_min, type_max = DATA_TYPE_RANGES[data_type]
+        scaled = stored * scale
+        report.overflow_count = int(np.count_nonzero((scaled < type_min) | (scaled > type_max)))
+    errors = np.abs(stored - coords)
+    report.max_error = float(errors.max())
+    report.loss_count = int(np.count_nonzero(errors > tolerance))
+    return report
+
+
+def path_data_size(paths, data_type):
+    """
+    Size of data_mnemonic_t arrays of all paths, one element per command
+    and coordinate plus the terminating VLC_OP_END
+    """
+    count = sum(len(path.commands) + len(path.coords) + 1 for path in paths)
+    return count * DATA_TYPE_SIZES[data_type]
+
+
+def local_origin(path):
+    """
+    Integer point nearest to the center of path bounding box. Coordinates
+    relative to it have the smallest magnitude, so they fit narrow types.
+    """
+    if len(path) == 0:
+        return (0, 0)
+    min_x, min_y, max_x, max_y = path.bounding_box()
+    return (round((min_x + max_x) / 2), round((min_y + max_y) / 2))
+
+
+def rebase_paths(paths):
+    """
+    Move every path to its local origin.
+    Returns list of rebased paths and list of (x, y) origins; the origin
+    has to be added back by the path transform.
+    """
+    rebased = []
+    origins = []
+    for path in paths:
+        origin = local_origin(path)
+        if origin != (0, 0):
+            path = path.translated(*origin)
+        rebased.append(path)
+        origins.append(origin)
+    return rebased, origins
@@ -0,0 +1,110 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Flash and RAM footprint of generated assets.
+#
+# Sizes of the emitted tables are computed from the C layouts of the
+# structures in the generated header on a 32 bit target (natural alignment,
+# 4 byte pointers and enums), including struct padding and the selected path
+# data type. Tables defined without 'const' are placed in .data, their
+# initializer takes flash and the table itself takes RAM. String literals
+# and blobs only take flash.
+#
+
+# (size, alignment) of C types
+C_TYPES = {
+    'int8_t': (1, 1),
+    'uint8_t': (1, 1),
+    'int16_t': (2, 2),
+    'int32_t': (4, 4),
+    'uint32_t': (4, 4),
+    'int': (4, 4),
+    'float': (4, 4),
+    'pointer': (4, 4),
+    'enum': (4, 4),
+}
+
+# Placement of tables
+SECTION_DATA = 'data'           # flash (initializer) and RAM
+SECTION_RODATA = 'rodata'       # flash only
+SECTION_BSS = 'bss'             # RAM only
+
+_PLACEMENT_LABELS = {SECTION_DATA: 'flash+RAM', SECTION_RODATA: 'flash', SECTION_BSS: 'RAM'}
+
+
+class CStruct:
+    """
+    Layout of C struct or union. 'fields' is list of (type, count), type is
+    name in C_TYPES or CStruct, count 0 is a flexible array member.
+    """
+    def __init__(self, name, fields, union=False):
+        self.name = name
+        offset = 0
+        align = 1
+        for ctype, count in fields:
+            size, field_align = ctype.layout() if isinstance(ctype, CStruct) else C_TYPES[ctype]
+            align = max(align, field_align)
+            if union:
+                offset = max(offset, size * count)
+            else:
+                offset = -(-offset // field_align) * field_align + size * count
+        self.align = align
+        self.size = -(-offset // align) * align
+
+    def layout(self):
+        return self.size, self.align
+
+
+def data_mnemonic(data_type):
+    # Float path data uses uint32_t opcodes
+    cmd_type = 'uint32_t' if data_type == 'float' else data_type
+    return CStruct('data_mnemonic_t', [(cmd_type, 1), (data_type, 1)], union=True)
+
+
+PATH_INFO = CStruct('path_info_t', [('uint32_t', 1), ('pointer', 1), ('float', 4), ('uint8_t', 1)])
+STROKE_INFO = CStruct('stroke_info_t', [('uint32_t', 1), ('float', 1), ('pointer', 1), ('float', 1),
+                                        ('float', 1), ('uint32_t', 1), ('enum', 1), ('enum', 1)])
+IMAGE_INFO = CStruct('image_info_t', [('pointer', 1), ('int', 2), ('enum', 1), ('pointer', 1),
+                                      ('int', 1), ('pointer', 1), (PATH_INFO, 0)])
+STOP_VALUE = CStruct('stopValue_t', [('float', 1), ('uint32_t', 1)])
+LINEAR_GRADIENT_PARAMETER = CStruct('vg_lite_linear_gradient_parameter_t', [('float', 4)])
+RADIAL_GRADIENT_PARAMETER = CStruct('vg_lite_radial_gradient_parameter_t', [('float', 5)])
+LINEAR_GRADIENT = CStruct('linearGradient_t', [('uint32_t', 1), (LINEAR_GRADIENT_PARAMETER, 1), ('pointer', 1)])
+RADIAL_GRADIENT = CStruct('radialGradient_t', [('uint32_t', 1), (RADIAL_GRADIENT_PARAMETER, 1), ('pointer', 1)])
+HYBRID_PATH = CStruct('hybridPath_t', [('enum', 1), ('enum', 1)])
+GRADIENT_MODE = CStruct('gradient_mode_t', [('pointer', 4)])
+PACKED_PATH = CStruct('packed_path_t', [('uint32_t', 1), ('pointer', 2)])
+TRANSFORM_SIZE = 9 * C_TYPES['float'][0]
+
+
+class Footprint:
+    """
+    Bytes of every emitted table and its placement
+    """
+    def __init__(self):
+        # table name -> [bytes, section]
+        self.tables = {}
+
+    def add(self, table, size, section=SECTION_DATA):
+        entry = self.tables.setdefault(table, [0, section])
+        entry[0] += size
+
+    def sizes(self):
+        return {table: size for table, (size, section) in self.tables.items()}
+
+    def flash_bytes(self):
+        return sum(size for size, section in self.tables.values() if section != SECTION_BSS)
+
+    def ram_bytes(self):
+        return sum(size for size, section in self.tables.values() if section != SECTION_RODATA)
+
+    def breakdown(self):
+        """
+        Lines with size and placement of every table, largest first
+        """
+        rows = sorted(self.tables.items(), key=lambda item: item[1][0], reverse=True)
+        return [f"{table:<18} {size:>10} bytes  {_PLACEMENT_LABELS[section]}" for table, (size, section) in rows if size]
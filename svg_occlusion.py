@@ -0,0 +1,280 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Offline occlusion culling (--cull-occluded).
+#
+# A path is dropped when everything it can paint is covered by opaque solid
+# fills of paths drawn after it. Paths are visited from last to first:
+#   - the bounding box of the path, grown by the truncation of coordinates to
+#     integer data types and the stroke extent, is transformed, grown by
+#     'margin' and tested against the occluders seen so far
+#   - a path which is not hidden becomes an occluder when its fill is an
+#     opaque solid color and its outline is made of horizontal and vertical
+#     lines only (rects, rectilinear polygons) with integer coordinates, which
+#     every data type stores exactly, under a transform which keeps edges
+#     axis-aligned
+# Coverage is exact: the box is split into cells on all occluder edges inside
+# it and every cell must be filled by an occluder according to its fill rule.
+#
+
+import math
+from bisect import bisect_left
+
+import numpy as np
+
+from svg_path_transform import AFFINE_IDENTITY
+
+# Largest change of a non-integer coordinate stored in integer data type
+_QUANTIZATION = 1.0
+
+# Boxes split into more cells are kept rather than tested
+MAX_CELLS = 1 << 22
+
+# Default miter limit of SVG
+_DEFAULT_MITER_LIMIT = 4.0
+
+# Values of these properties hide or blend the element, occluder must not have them
+_OPACITY_PROPERTIES = ('opacity', 'fill-opacity')
+_EXCLUDING_PROPERTIES = {'display': 'none', 'visibility': 'hidden'}
+_UNSUPPORTED_PROPERTIES = ('clip-path', 'mask')
+
+
+def element_label(alist):
+    """
+    Name of element in reports, its id or tag and position in document
+    """
+    if 'id' in alist:
+        return alist['id']
+    return f"<{alist['name']}> {alist['svg_id']}"
+
+
+def render_affine(alist):
+    """
+    Affine (a, b, c, d, e, f) the path is drawn with
+    """
+    if 'transform' not in alist:
+        return AFFINE_IDENTITY
+    (a, c, e), (b, d, f), _ = alist['path_transform']
+    return (a, b, c, d, e, f)
+
+
+def element_properties(element):
+    # Attributes and style properties of element
+    properties = dict(element.attributes)
+    for item in element.attributes.get('style', '').split(';'):
+        kv = item.split(':')
+        if len(kv) == 2:
+            properties[kv[0].strip()] = kv[1].strip()
+    return properties
+
+
+def _number(value, default=None):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def is_opaque_solid(alist):
+    """
+    True when fill of element is an opaque solid color, also checking
+    properties of its ancestors
+    """
+    fill = alist['fill']
+    if fill is None or fill.startswith('url') or fill == 'currentColor':
+        return False
+    element = alist['node']
+    while element is not None:
+        properties = element_properties(element)
+        for name in _OPACITY_PROPERTIES:
+            if name in properties and _number(properties[name], 0.0) < 1.0:
+                return False
+        for name, value in _EXCLUDING_PROPERTIES.items():
+            if properties.get(name) == value:
+                return False
+        if any(name in properties for name in _UNSUPPORTED_PROPERTIES):
+            return False
+        element = element.parentNode
+    return True
+
+
+def _transform_box(affine, box):
+    if affine == AFFINE_IDENTITY:
+        return box
+    a, b, c, d, e, f = affine
+    min_x, min_y, max_x, max_y = box
+    xs = []
+    ys = []
+    for x, y in ((min_x, min_y), (max_x, min_y), (min_x, max_y), (max_x, max_y)):
+        xs.append(a * x + c * y + e)
+        ys.append(b * x + d * y + f)
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def paint_box(path, alist, tight, margin=0.0):
+    """
+    Box containing everything the path paints grown by 'margin', in drawing
+    coordinates, or None when stroke extent is unknown
+    """
+    extent = 0.0 if all(float(coord).is_integer() for coord in path.coords) else _QUANTIZATION
+    if alist['stroke'] is not None:
+        width = _number(alist['stroke-width'], None) if alist['stroke-width'] is not None else 1.0
+        miter_limit = _number(alist.get('stroke-miterlimit', _DEFAULT_MITER_LIMIT), None)
+        if width is None or miter_limit is None:
+            return None
+        # Miter joins and square caps reach furthest from the outline
+        extent += width / 2 * max(miter_limit, math.sqrt(2))
+    min_x, min_y, max_x, max_y = path.bounding_box(tight)
+    min_x, min_y, max_x, max_y = _transform_box(render_affine(alist),
+                                                (min_x - extent, min_y - extent, max_x + extent, max_y + extent))
+    return (min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+
+
+class Occluder:
+    """
+    Region filled by rectilinear path: vertical edges (x, y0, y1) and fill rule
+    """
+    def __init__(self, edges, box, nonzero):
+        self.edges = edges
+        self.box = box
+        self.nonzero = nonzero
+        # Single rectangle covers its box, no need to scan rows
+        self.is_rect = len(edges) == 2 and edges[0][0] != edges[1][0]
+        self.xs = {x for x, _, _ in edges}
+        self.ys = {y for _, y0, y1 in edges for y in (y0, y1)}
+
+    def spans(self, py):
+        """
+        Filled (x0, x1) intervals of horizontal line y=py, which never passes
+        through a vertex
+        """
+        crossings = sorted((x, 1 if y1 > y0 else -1) for x, y0, y1 in self.edges if min(y0, y1) < py < max(y0, y1))
+        spans = []
+        winding = 0
+        for k, (x, direction) in enumerate(crossings[:-1]):
+            winding += direction
+            if winding != 0 if self.nonzero else winding % 2 != 0:
+                spans.append((x, crossings[k + 1][0]))
+        return spans
+
+
+def make_occluder(path, alist):
+    """
+    Occluder of path filled with opaque solid color, None when the path does
+    not qualify
+    """
+    # Cheap tests first, opacity is looked up in all ancestors
+    if alist['fill'] is None or any(cmd not in ('M', 'L') for cmd in path.commands):
+        return None
+    if not all(float(coord).is_integer() for coord in path.coords):
+        return None
+    a, b, c, d, e, f = render_affine(alist)
+    if not ((b == 0 and c == 0) or (a == 0 and d == 0)) or not is_opaque_solid(alist):
+        return None
+
+    # Subpaths are closed by fill
+    subpaths = []
+    for cmd, args in path.segments():
+        if cmd == 'M':
+            subpaths.append([])
+        subpaths[-1].append((a * args[0] + c * args[1] + e, b * args[0] + d * args[1] + f))
+    edges = []
+    for points in subpaths:
+        for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]):
+            if x0 == x1:
+                if y0 != y1:
+                    edges.append((x0, y0, y1))
+            elif y0 != y1:
+                return None
+    if len(edges) < 2:
+        return None
+    box = (min(x for x, _, _ in edges), min(min(y0, y1) for _, y0, y1 in edges),
+           max(x for x, _, _ in edges), max(max(y0, y1) for _, y0, y1 in edges))
+    return Occluder(edges, box, alist.get('fill-rule') == 'nonzero')
+
+
+def _split(low, high, values):
+    return [low] + sorted(v for v in values if low < v < high) + [high]
+
+
+class OccluderSet:
+    """
+    Occluders seen so far, boxes are kept in array to find candidates quickly
+    """
+    def __init__(self, capacity):
+        self.occluders = []
+        self.boxes = np.empty((max(capacity, 1), 4))
+
+    def __len__(self):
+        return len(self.occluders)
+
+    def add(self, occluder):
+        self.boxes[len(self.occluders)] = occluder.box
+        self.occluders.append(occluder)
+
+    def covers(self, box):
+        """
+        True when 'box' is inside union of occluders
+        """
+        min_x, min_y, max_x, max_y = box
+        boxes = self.boxes[:len(self.occluders)]
+        overlapping = np.flatnonzero((boxes[:, 0] < max_x) & (boxes[:, 2] > min_x) &
+                                     (boxes[:, 1] < max_y) & (boxes[:, 3] > min_y))
+        if len(overlapping) == 0:
+            return False
+        candidates = [self.occluders[k] for k in overlapping]
+        for o in candidates:
+            if o.is_rect and o.box[0] <= min_x and o.box[1] <= min_y and o.box[2] >= max_x and o.box[3] >= max_y:
+                return True
+        if min_x == max_x or min_y == max_y:
+            # Rows of empty box would pass through vertices
+            return False
+        # Occluders cover at most their boxes
+        clipped = boxes[overlapping]
+        area = ((np.minimum(clipped[:, 2], max_x) - np.maximum(clipped[:, 0], min_x)) *
+                (np.minimum(clipped[:, 3], max_y) - np.maximum(clipped[:, 1], min_y))).sum()
+        if area < (max_x - min_x) * (max_y - min_y):
+            return False
+
+        xs = _split(min_x, max_x, set().union(*(o.xs for o in candidates)))
+        ys = _split(min_y, max_y, set().union(*(o.ys for o in candidates)))
+        if (len(xs) - 1) * (len(ys) - 1) > MAX_CELLS:
+            return False
+        # Filled cells, x and y values are ends of cells
+        covered = np.zeros((len(ys) - 1, len(xs) - 1), dtype=bool)
+        for o in candidates:
+            row0 = bisect_left(ys, max(o.box[1], min_y))
+            row1 = bisect_left(ys, min(o.box[3], max_y))
+            if o.is_rect:
+                covered[row0:row1, bisect_left(xs, max(o.box[0], min_x)):bisect_left(xs, min(o.box[2], max_x))] = True
+                continue
+            for row in range(row0, row1):
+                for x0, x1 in o.spans((ys[row] + ys[row + 1]) / 2):
+                    if x1 > min_x and x0 < max_x:
+                        covered[row, bisect_left(xs, max(x0, min_x)):bisect_left(xs, min(x1, max_x))] = True
+        return bool(covered.all())
+
+
+def find_occluded(paths, attributes, tight=False, margin=0.0):
+    """
+    Return indices of paths hidden by opaque fills of later paths, hidden
+    paths are at least 'margin' inside the occluders
+    """
+    occluders = OccluderSet(len(paths))
+    hidden = []
+    for i in range(len(paths) - 1, -1, -1):
+        path, alist = paths[i], attributes[i]
+        if occluders:
+            box = paint_box(path, alist, tight, margin)
+            if box is not None and occluders.covers(box):
+                hidden.append(i)
+                continue
+        occluder = make_occluder(path, alist)
+        if occluder is not None:
+            occluders.add(occluder)
+    hidden.reverse()
+    return hidden
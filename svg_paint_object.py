@@ -13,13 +13,6 @@ from svg_global_callback_context import GlobalCallbackCtx
 
 CB: GlobalCallbackCtx = get_global_callback_context()
 
-def get_min_max_coordinates(parsed_lines):
-    min_x = min(coord[0] for coord in parsed_lines)
-    max_x = max(coord[0] for coord in parsed_lines)
-    min_y = min(coord[1] for coord in parsed_lines)
-    max_y = max(coord[1] for coord in parsed_lines)
-    return min_x, max_x, min_y, max_y
-
 class SolidColor:
     def __init__(self, color_str):
         self.set_color(color_str)    
@@ -47,6 +40,9 @@ class GradientBase:
     def set_index(self, index):
         self.grad_index = index
 
+    def stops_name(self, unique_id):
+        return f"{self.STOPS_PREFIX}_{unique_id}"
+
     def convert_offset(self, offset):
         if offset.endswith('%'):
             return float(offset.strip('%')) / 100.0
@@ -101,11 +97,15 @@ class LinearGradient(GradientBase):
     A class to parse radial gradient data from SVG context
     and prepare VGLite draw commands
     """
+    STOPS_PREFIX = "linearGrad"
+
     def __init__(self):
         self._valid:bool = False
         self.name = None
         self.previous_offset = -1.0
         self.grad_index = -1
+        # Identical gradient was already emitted with grad_index
+        self.shared = False
         self.stops: list[GradientStopPoints] = []
 
     def get_fill_mode(self):
@@ -116,20 +116,22 @@ class LinearGradient(GradientBase):
             # If no stops are defined, then painting shall occur as if 'none' were specified as the paint style.
             return "STROKE"
     
-    def parse(self, alist, data_str):
+    def parse(self, alist, bbox, scale=1, origin=(0, 0)):
         self.stops = self._parse_gradient_stop_points(alist)
         if len(self.stops) == 0:
             self._valid = False
             return
 
         grad_unit_str = alist['gradientUnits']
-        min_x, max_x, min_y, max_y = get_min_max_coordinates(data_str)
+        min_x, min_y, max_x, max_y = bbox
         x1 = y1 = x2 = y2 = 0.0
         if grad_unit_str == 'userSpaceOnUse':
-            x1 = float(alist['x1'])
-            y1 = float(alist['y1'])
-            x2 = float(alist['x2'])
-            y2 = float(alist['y2'])
+            # Bounding box is already in scaled path coordinates, user space
+            # coordinates get the same fixed-point scale
+            x1 = float(alist['x1']) * scale
+            y1 = float(alist['y1']) * scale
+            x2 = float(alist['x2']) * scale
+            y2 = float(alist['y2']) * scale
         elif grad_unit_str == 'objectBoundingBox' and all(key in alist for key in ('x1', 'y1', 'x2', 'y2')):
             x1 = min_x + (((max_x - min_x) * float(alist['x1'])))
             y1 = min_y + (((max_y - min_y) * float(alist['y1'])))
@@ -142,21 +144,28 @@ class LinearGradient(GradientBase):
             # https://lists.w3.org/Archives/Public/www-archive/2005May/att-0005/SVGT12_Main.pdf
             # section: 11.16.1 Linear gradients
             y2 = min_y
-        self.x1 = x1
-        self.y1 = y1
-        self.x2 = x2
-        self.y2 = y2
+        # Path coordinates may be stored relative to a local origin
+        ox, oy = origin
+        self.x1 = x1 - ox
+        self.y1 = y1 - oy
+        self.x2 = x2 - ox
+        self.y2 = y2 - oy
         # Finally mark gradient as valid
         self._valid = True
 
-    def to_string(self, input_file_cname, unique_id):
+    def params(self):
+        return (self.x1, self.y1, self.x2, self.y2)
+
+    def to_string(self, input_file_cname, unique_id, shared_stops=None):
         # local variables
         str_buf = ''
         if len(self.stops) == 0 or self.is_valid == False:
             return str_buf
 
-        prefix = f"linearGrad_{unique_id}"
-        str_buf = self._stops_to_string(prefix,self.stops)
+        # Identical stop array may be emitted already
+        prefix = shared_stops or self.stops_name(unique_id)
+        if shared_stops is None:
+            str_buf = self._stops_to_string(prefix,self.stops)
 
         str_buf += f"static linearGradient_t {input_file_cname}_linear_gradients_{self.grad_index}[] = {{\n"
         str_buf += f"    {{\n"
@@ -174,11 +183,15 @@ class RadialGradient(GradientBase):
     A class to parse radial gradient data from SVG context
     and prepare VGLite draw commands
     """
+    STOPS_PREFIX = "radialGrad"
+
     def __init__(self):
         self._valid:bool = False
         self.name = None
         self.previous_offset = -1.0
         self.grad_index = -1
+        # Identical gradient was already emitted with grad_index
+        self.shared = False
         self.stops: list[GradientStopPoints] = []
         self.cx = 0.0
         self.cy = 0.0
@@ -193,19 +206,19 @@ class RadialGradient(GradientBase):
         else:
             return "STROKE"
     
-    def parse(self, alist, data_str):        
+    def parse(self, alist, bbox, scale=1, origin=(0, 0)):
         self.stops = self._parse_gradient_stop_points(alist)
         if len(self.stops) == 0:
             return
 
         grad_unit_str = alist['gradientUnits']
-        min_x, max_x, min_y, max_y = get_min_max_coordinates(data_str)
+        min_x, min_y, max_x, max_y = bbox
         if grad_unit_str == 'userSpaceOnUse':
-                cx = float(alist['cx'])
-                cy = float(alist['cy'])
-                r  = float(alist['r'])
-                fx = float(alist['cx'])
-                fy = float(alist['cy'])
+                cx = float(alist['cx']) * scale
+                cy = float(alist['cy']) * scale
+                r  = float(alist['r']) * scale
+                fx = float(alist['cx']) * scale
+                fy = float(alist['cy']) * scale
         elif grad_unit_str == None or grad_unit_str == 'objectBoundingBox':
             if all(key in alist for key in ('cx', 'cy', 'r', 'fx', 'fy')):
                 cx = min_x + (max_x - min_x) * self.convert_offset(alist['cx'])
@@ -230,23 +243,29 @@ class RadialGradient(GradientBase):
                 fx = min_x + (max_x - min_x) * 0.5
                 fy = min_y + (max_y - min_y) * 0.5
 
-        self.cx = cx
-        self.cy = cy
+        ox, oy = origin
+        self.cx = cx - ox
+        self.cy = cy - oy
         self.r = r
-        self.fx = fx
-        self.fy = fy
+        self.fx = fx - ox
+        self.fy = fy - oy
         # Finally mark gradient as valid
         self._valid = True
 
 
-    def to_string(self, input_file_cname, unique_id):
+    def params(self):
+        return (self.cx, self.cy, self.r, self.fx, self.fy)
+
+    def to_string(self, input_file_cname, unique_id, shared_stops=None):
         # local variables
         str_buf = ''
         if len(self.stops) == 0 or self.is_valid == False:
             return str_buf
 
-        prefix = f"radialGrad_{unique_id}"
-        str_buf = self._stops_to_string(prefix,self.stops)
+        # Identical stop array may be emitted already
+        prefix = shared_stops or self.stops_name(unique_id)
+        if shared_stops is None:
+            str_buf = self._stops_to_string(prefix,self.stops)
 
         str_buf += f"static radialGradient_t {input_file_cname}_radial_gradients_{self.grad_index}[] = {{\n"
         str_buf += f"    {{\n"
@@ -0,0 +1,82 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Interning of paint tables.
+#
+# Themes reuse a few gradients, dash patterns and stroke styles across many
+# shapes. Entries are keyed by their content, every identical entry is
+# emitted once and the per-path tables point at it.
+#
+
+from svg_footprint import C_TYPES, STOP_VALUE, LINEAR_GRADIENT, RADIAL_GRADIENT, STROKE_INFO
+
+# Size of table entries in C (32 bit target), used to report saved bytes
+STOP_SIZE = STOP_VALUE.size
+LINEAR_GRADIENT_SIZE = LINEAR_GRADIENT.size
+RADIAL_GRADIENT_SIZE = RADIAL_GRADIENT.size
+DASH_SIZE = C_TYPES['float'][0]
+STROKE_INFO_SIZE = STROKE_INFO.size
+
+
+class PaintTable:
+    """
+    Content-addressed table of one kind of paint entries
+    """
+    def __init__(self, name):
+        self.name = name
+        self.entries = {}
+        # Size of stored entries
+        self.size_bytes = 0
+        # Entries which were found in table instead of added
+        self.shared_count = 0
+        self.saved_bytes = 0
+
+    def intern(self, key, value, size):
+        """
+        Return (value, True) when 'key' is new and 'value' is stored for it,
+        or (stored value, False) when identical entry exists.
+        'size' is size of entry in bytes.
+        """
+        found = self.entries.get(key)
+        if found is None:
+            self.entries[key] = value
+            self.size_bytes += size
+            return value, True
+        self.shared_count += 1
+        self.saved_bytes += size
+        return found, False
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PaintTableBuilder:
+    """
+    Tables shared by all paths of one image
+    """
+    def __init__(self):
+        self.stops = PaintTable("stop arrays")
+        self.gradients = PaintTable("gradients")
+        self.dash_patterns = PaintTable("dash patterns")
+        self.strokes = PaintTable("stroke info")
+
+    def tables(self):
+        return (self.stops, self.gradients, self.dash_patterns, self.strokes)
+
+    def report(self):
+        """
+        Summary lines of shared entries, empty when nothing was shared
+        """
+        return [f"{table.name}: {table.shared_count} shared, {table.saved_bytes} bytes saved"
+                for table in self.tables() if table.shared_count > 0]
+
+
+def stops_key(stops):
+    """
+    Key of list of GradientStopPoints
+    """
+    return tuple((stop.offset, stop.color_str) for stop in stops)
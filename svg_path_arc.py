@@ -0,0 +1,206 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Conversion of elliptical arcs to Bezier curves.
+#
+# VGLite has no arc opcode. Every arc is split into the minimum number of
+# equal cubic or quadratic segments which stay within given tolerance of the
+# ellipse, whichever needs less path data. All arcs of an asset are
+# converted at once with numpy.
+#
+
+import math
+import numpy as np
+
+from svg_path_data import PathData
+
+# Segments never span more than a quarter of ellipse
+_MAX_SEGMENT_ANGLE = math.pi / 2
+
+# Path data elements per segment (opcode and coordinates)
+_CUBIC_ELEMENTS = 7
+_QUAD_ELEMENTS = 5
+
+_BISECTION_STEPS = 40
+
+# Smaller tolerances are raised to this value (in pixels)
+MIN_TOLERANCE = 0.001
+
+
+def _cubic_error(angle):
+    """
+    Largest distance of cubic approximation of unit circle arc from the circle
+    """
+    s = np.sin(angle / 4)
+    c = np.cos(angle / 4)
+    return 4.0 / 27.0 * s ** 6 / c ** 2
+
+
+def _quad_error(angle):
+    """
+    Largest distance of quadratic approximation of unit circle arc from the circle
+    """
+    c = np.cos(angle / 2)
+    return (c + 1.0 / c) / 2.0 - 1.0
+
+
+def _max_segment_angle(error_function, relative_tolerance):
+    """
+    Largest angle of segment with error within tolerance (relative to radius)
+    """
+    low = np.zeros_like(relative_tolerance)
+    high = np.full_like(relative_tolerance, _MAX_SEGMENT_ANGLE)
+    fits = error_function(high) <= relative_tolerance
+    for _ in range(_BISECTION_STEPS):
+        middle = (low + high) / 2
+        ok = error_function(middle) <= relative_tolerance
+        low = np.where(ok, middle, low)
+        high = np.where(ok, high, middle)
+    return np.where(fits, _MAX_SEGMENT_ANGLE, np.maximum(low, 1e-6))
+
+
+def _center_parameterization(arcs):
+    """
+    Convert arcs in endpoint parameterization to center parameterization
+    (SVG 1.1 appendix F.6.5, radii are scaled up as in F.6.6)
+    """
+    x1, y1, rx, ry, rotation, large_arc, sweep, x2, y2 = arcs.T
+    rx = np.abs(rx)
+    ry = np.abs(ry)
+    phi = np.radians(rotation)
+    cos_phi = np.cos(phi)
+    sin_phi = np.sin(phi)
+
+    dx = (x1 - x2) / 2
+    dy = (y1 - y2) / 2
+    x1p = cos_phi * dx + sin_phi * dy
+    y1p = -sin_phi * dx + cos_phi * dy
+
+    radii_scale = np.sqrt(np.maximum(x1p ** 2 / rx ** 2 + y1p ** 2 / ry ** 2, 1.0))
+    rx = rx * radii_scale
+    ry = ry * radii_scale
+
+    numerator = rx ** 2 * ry ** 2 - rx ** 2 * y1p ** 2 - ry ** 2 * x1p ** 2
+    denominator = rx ** 2 * y1p ** 2 + ry ** 2 * x1p ** 2
+    coef = np.sqrt(np.maximum(numerator / denominator, 0.0))
+    coef = np.where((large_arc != 0) == (sweep != 0), -coef, coef)
+    cxp = coef * rx * y1p / ry
+    cyp = -coef * ry * x1p / rx
+    cx = cos_phi * cxp - sin_phi * cyp + (x1 + x2) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (y1 + y2) / 2
+
+    theta1 = np.arctan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    theta2 = np.arctan2((-y1p - cyp) / ry, (-x1p - cxp) / rx)
+    delta = theta2 - theta1
+    delta = np.where((sweep == 0) & (delta > 0), delta - 2 * math.pi, delta)
+    delta = np.where((sweep != 0) & (delta < 0), delta + 2 * math.pi, delta)
+    return cx, cy, rx, ry, cos_phi, sin_phi, theta1, delta
+
+
+def _segments(arcs, tolerances):
+    """
+    Return list of (command, coords) for every arc, coords hold all
+    segments of the arc after the start point
+    """
+    cx, cy, rx, ry, cos_phi, sin_phi, theta1, delta = _center_parameterization(arcs)
+    relative_tolerance = np.maximum(tolerances, MIN_TOLERANCE) / np.maximum(rx, ry)
+    sweep_angle = np.abs(delta)
+    cubic_count = np.maximum(np.ceil(sweep_angle / _max_segment_angle(_cubic_error, relative_tolerance)), 1)
+    quad_count = np.maximum(np.ceil(sweep_angle / _max_segment_angle(_quad_error, relative_tolerance)), 1)
+    use_quad = quad_count * _QUAD_ELEMENTS < cubic_count * _CUBIC_ELEMENTS
+    count = np.where(use_quad, quad_count, cubic_count).astype(np.int64)
+
+    # One row per segment
+    arc_index = np.repeat(np.arange(len(arcs)), count)
+    first = np.cumsum(count) - count
+    k = np.arange(len(arc_index)) - first[arc_index]
+    step = (delta / count)[arc_index]
+    t0 = theta1[arc_index] + step * k
+    t1 = t0 + step
+
+    def to_user(ux, uy):
+        # Point of unit circle to user space
+        x = rx[arc_index] * ux
+        y = ry[arc_index] * uy
+        return (cos_phi[arc_index] * x - sin_phi[arc_index] * y + cx[arc_index],
+                sin_phi[arc_index] * x + cos_phi[arc_index] * y + cy[arc_index])
+
+    end_x, end_y = to_user(np.cos(t1), np.sin(t1))
+    # Last segment ends exactly at the arc end point
+    last = k == count[arc_index] - 1
+    end_x = np.where(last, arcs[arc_index, 7], end_x)
+    end_y = np.where(last, arcs[arc_index, 8], end_y)
+
+    alpha = 4.0 / 3.0 * np.tan(step / 4)
+    c1x, c1y = to_user(np.cos(t0) - alpha * np.sin(t0), np.sin(t0) + alpha * np.cos(t0))
+    c2x, c2y = to_user(np.cos(t1) + alpha * np.sin(t1), np.sin(t1) - alpha * np.cos(t1))
+    cubic = np.stack([c1x, c1y, c2x, c2y, end_x, end_y], axis=1)
+
+    middle = t0 + step / 2
+    radius = 1.0 / np.cos(step / 2)
+    qx, qy = to_user(radius * np.cos(middle), radius * np.sin(middle))
+    quad = np.stack([qx, qy, end_x, end_y], axis=1)
+
+    result = []
+    for i in range(len(arcs)):
+        rows = slice(first[i], first[i] + count[i])
+        if use_quad[i]:
+            result.append(('Q', quad[rows].ravel().tolist()))
+        else:
+            result.append(('C', cubic[rows].ravel().tolist()))
+    return result
+
+
+def _is_drawn(start, args):
+    # Arc with equal end points is omitted, arc with zero radius is a line
+    return args[-2:] != start and args[0] != 0 and args[1] != 0
+
+
+def convert_arcs(paths, tolerances):
+    """
+    Return list of PathData with every arc replaced by Bezier curves.
+    'tolerances' holds allowed error for every path.
+    Paths without arcs are returned as they are.
+    """
+    arcs = []
+    arc_tolerances = []
+    for path, tolerance in zip(paths, tolerances):
+        if 'A' not in path.commands:
+            continue
+        current = None
+        for cmd, args in path.segments():
+            if cmd == 'A' and _is_drawn(current, args):
+                arcs.append(current + args)
+                arc_tolerances.append(tolerance)
+            current = args[-2:]
+    if len(arcs) == 0:
+        return list(paths)
+
+    segments = iter(_segments(np.array(arcs, dtype=np.float64), np.array(arc_tolerances, dtype=np.float64)))
+    converted = []
+    for path in paths:
+        if 'A' not in path.commands:
+            converted.append(path)
+            continue
+        new_path = PathData()
+        current = None
+        for cmd, args in path.segments():
+            if cmd != 'A':
+                new_path.commands.append(cmd)
+                new_path.coords.extend(args)
+            elif _is_drawn(current, args):
+                curve, coords = next(segments)
+                argcnt = 6 if curve == 'C' else 4
+                new_path.commands.extend([curve] * (len(coords) // argcnt))
+                new_path.coords.extend(coords)
+            elif args[-2:] != current:
+                # Zero radius, arc is a line (SVG 1.1 F.6.2)
+                new_path.commands.append('L')
+                new_path.coords.extend(args[-2:])
+            current = args[-2:]
+        converted.append(new_path)
+    return converted
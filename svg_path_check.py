@@ -0,0 +1,215 @@
+#! /usr/bin/env python3
+
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Checks of path processing against test vectors.
+#
+# Simplification: every path of the SVG files and of generated noisy
+# polylines and curves is simplified with several tolerances. Every vertex of
+# the original path (end point of every segment) must stay within tolerance
+# of the simplified outline, curves of the simplified path are measured as
+# fine polylines.
+#
+# Normalization: tests/paths-data-normalize-t.svg draws every shape with
+# absolute commands and again with relative and shorthand commands, moved
+# right by 240. Both paths of every pair must hold only canonical commands
+# and the same path data up to the offset.
+#
+# Usage:
+#   svg_path_check.py [SVG ...]        default: all SVG files in tests/
+#
+
+import argparse
+import glob
+import os
+import random
+import sys
+
+import numpy as np
+
+import svg2h
+from svg_path_arc import convert_arcs
+from svg_path_data import parse_path_data
+from svg_path_pool import PathPool
+from svg_path_simplify import simplify_path
+from svg_stage_timer import StageTimer
+
+SIMPLIFY_TOLERANCES = (0.25, 1.0, 4.0)
+
+# Points per curve of simplified outline
+_CURVE_SAMPLES = 256
+
+# Rounding of distances computed from flattened curves
+_EPSILON = 1e-9
+
+# Normalization vectors, pairs of absolute and relative paths
+NORMALIZE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'paths-data-normalize-t.svg')
+_NORMALIZE_OFFSET = 240
+
+# Cases found in review, (path data, tolerance)
+_SIMPLIFY_CASES = [
+    ('M0,0 L10,0.9 L10,1.8 L20,0', 1.0),
+]
+
+
+def _bezier(control, t):
+    # Points of Bezier curve with 'control' points at parameters 't', de Casteljau
+    points = np.asarray(control, dtype=np.float64)[:, None, :]
+    t = t[None, :, None]
+    while len(points) > 1:
+        points = points[:-1] * (1 - t) + points[1:] * t
+    return points[0]
+
+
+def _flatten(path):
+    """
+    Line segments (a, b) arrays of outline of PathData, curves as polylines
+    """
+    starts = []
+    ends = []
+    t = np.linspace(0.0, 1.0, _CURVE_SAMPLES + 1)
+    current = (0.0, 0.0)
+    for cmd, args in path.segments():
+        if cmd == 'M':
+            current = tuple(args)
+            continue
+        if cmd == 'L':
+            points = np.array([current, args])
+        else:
+            control = [current] + [tuple(args[k:k + 2]) for k in range(0, len(args), 2)]
+            points = _bezier(control, t)
+        starts.append(points[:-1])
+        ends.append(points[1:])
+        current = tuple(args[-2:])
+    if not starts:
+        return np.empty((0, 2)), np.empty((0, 2))
+    return np.concatenate(starts), np.concatenate(ends)
+
+
+def max_deviation(original, simplified):
+    """
+    Largest distance of vertex of 'original' to outline of 'simplified'
+    """
+    vertices = np.array([args[-2:] for cmd, args in original.segments()], dtype=np.float64)
+    a, b = _flatten(simplified)
+    if len(vertices) == 0:
+        return 0.0
+    if len(a) == 0:
+        # Only moves are left, measure to their points
+        a = b = np.array([args for cmd, args in simplified.segments()], dtype=np.float64)
+    ab = b - a
+    length2 = np.maximum((ab * ab).sum(axis=1), 1e-300)
+    worst = 0.0
+    for start in range(0, len(vertices), 256):
+        p = vertices[start:start + 256, None, :]
+        t = np.clip(((p - a) * ab).sum(axis=2) / length2, 0.0, 1.0)
+        delta = p - (a + t[:, :, None] * ab)
+        worst = max(worst, float(np.hypot(delta[:, :, 0], delta[:, :, 1]).min(axis=1).max()))
+    return worst
+
+
+def _noisy_paths(seed=1, count=200):
+    """
+    Polylines and curves with many segments shorter than tolerances
+    """
+    rng = random.Random(seed)
+    paths = []
+    for k in range(count):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        parts = [f"M{x:.3f},{y:.3f}"]
+        for _ in range(rng.randrange(4, 60)):
+            step = rng.choice((0.3, 1.0, 3.0))
+            x += rng.uniform(-step, step)
+            y += rng.uniform(-step, step)
+            if k % 2 and rng.randrange(3) == 0:
+                parts.append(f"Q{x + rng.uniform(-step, step):.3f},{y + rng.uniform(-step, step):.3f} "
+                             f"{x:.3f},{y:.3f}")
+            else:
+                parts.append(f"L{x:.3f},{y:.3f}")
+        paths.append(parse_path_data("".join(parts)))
+    return paths
+
+
+def _svg_paths(input_file):
+    # Paths as converter simplifies them, arcs converted to curves
+    with PathPool() as pool:
+        paths = svg2h.svg_processing.svg_transform(input_file, pool, StageTimer())[0]
+    return convert_arcs(paths, [0.1] * len(paths))
+
+
+def check_simplify(name, paths, tolerances=SIMPLIFY_TOLERANCES):
+    """
+    Return errors of paths whose simplification moves a vertex further than tolerance
+    """
+    errors = []
+    for tolerance in tolerances:
+        for i, path in enumerate(paths):
+            deviation = max_deviation(path, simplify_path(path, tolerance))
+            if deviation > tolerance + _EPSILON:
+                errors.append(f"{name} path {i}: vertex {deviation:.4f} from simplified path "
+                              f"(tolerance {tolerance:g})")
+    return errors
+
+
+def check_normalize(input_file=NORMALIZE_FILE, offset=_NORMALIZE_OFFSET):
+    """
+    Return errors of relative paths whose path data differs from the
+    absolute path before them
+    """
+    paths = _svg_paths(input_file)
+    if not paths or len(paths) % 2:
+        return [f"{input_file}: {len(paths)} paths are not pairs of absolute and relative paths"]
+    errors = []
+    for i in range(0, len(paths), 2):
+        reference, path = paths[i], paths[i + 1].translated(offset, 0)
+        for k, p in ((i, reference), (i + 1, path)):
+            if not p.is_canonical():
+                errors.append(f"{input_file} path {k}: commands {''.join(sorted(set(p.commands)))} "
+                              f"are not canonical")
+        if path.commands != reference.commands:
+            errors.append(f"{input_file} path {i + 1}: commands {''.join(path.commands)}, "
+                          f"path {i} {''.join(reference.commands)}")
+        elif not np.allclose(path.coords, reference.coords, rtol=0.0, atol=1e-6):
+            deviation = np.abs(np.subtract(path.coords, reference.coords)).max()
+            errors.append(f"{input_file} path {i + 1}: coordinates differ by {deviation:g} from path {i}")
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check path processing against test vectors.')
+    parser.add_argument('inputs', nargs='*', metavar='SVG', help='SVG files (default: tests/*.svg)')
+    args = parser.parse_args(argv)
+
+    if svg2h.svg_processing is None:
+        print("ERROR: python module svgpathtools is not available in PYTHONPATH", file=sys.stderr)
+        return 1
+
+    inputs = args.inputs or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', '*.svg')))
+    failed = 0
+
+    def report(name, errors):
+        for error in errors:
+            print(f"ERROR: {error}", file=sys.stderr)
+        if not errors:
+            print(f"OK: {name}")
+        return len(errors)
+
+    failed += report("normalize " + os.path.relpath(NORMALIZE_FILE), check_normalize())
+
+    errors = []
+    for d, tolerance in _SIMPLIFY_CASES:
+        errors += check_simplify(d, [parse_path_data(d)], (tolerance,))
+    failed += report("simplify review cases", errors)
+    failed += report("simplify noisy paths", check_simplify("noisy", _noisy_paths()))
+    for input_file in inputs:
+        failed += report(f"simplify {input_file}", check_simplify(input_file, _svg_paths(input_file)))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,502 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Numeric path data pipeline.
+#
+# Geometry of drawable elements is tokenized straight into numbers and
+# turned into absolute drawing commands
+#     M x y
+#     L x y
+#     Q x1 y1 x y
+#     C x1 y1 x2 y2 x y
+#     A rx ry x-axis-rotation large-arc-flag sweep-flag x y
+# The result is the same as svgpathtools parse_path() followed by Path.d(),
+# but no intermediate strings are created and no path objects are built.
+#
+
+import re
+import numpy as np
+
+# Number of arguments of each SVG path command
+PATH_COMMAND_ARGCNT = {
+    'M': 2, 'L': 2, 'T': 2,
+    'H': 1, 'V': 1,
+    'C': 6, 'S': 4, 'Q': 4,
+    'A': 7,
+    'Z': 0
+}
+
+# Commands left after normalization: absolute moves, lines, quadratic and
+# cubic curves. Z becomes a line back to start of subpath, H/V/S/T are
+# expanded and arcs are converted to curves (svg_path_arc).
+CANONICAL_COMMANDS = ('M', 'L', 'Q', 'C')
+
+_PATH_COMMANDS = set('MmZzLlHhVvCcSsQqTtAa')
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_NUMBER_RE = re.compile(_NUMBER)
+_PATH_TOKEN_RE = re.compile(r'[MmZzLlHhVvCcSsQqTtAa]|' + _NUMBER)
+_ARC_FLAG_RE = re.compile(r'[\s,]*([01])')
+_ARC_TOKEN_RE = re.compile(r'[\s,]*([MmZzLlHhVvCcSsQqTtAa]|' + _NUMBER + ')')
+
+
+class PathData:
+    """
+    Absolute drawing commands of a single drawable.
+    'commands' holds one command letter per segment, 'coords' holds
+    arguments of all commands one after another.
+    """
+    __slots__ = ('commands', 'coords', '_bbox', '_tight_bbox')
+
+    def __init__(self):
+        self.commands = []
+        self.coords = []
+        self._bbox = None
+        self._tight_bbox = None
+
+    def __len__(self):
+        return len(self.commands)
+
+    def is_canonical(self):
+        """
+        True when path holds only CANONICAL_COMMANDS
+        """
+        return all(cmd in CANONICAL_COMMANDS for cmd in set(self.commands))
+
+    def segments(self):
+        """
+        Iterate over (command, arguments) pairs
+        """
+        i = 0
+        for cmd in self.commands:
+            argcnt = PATH_COMMAND_ARGCNT[cmd]
+            yield cmd, self.coords[i:i + argcnt]
+            i += argcnt
+
+    def scaled(self, scale):
+        """
+        Copy of path with coordinates multiplied by 'scale' and rounded to
+        integers, used for fixed-point path data
+        """
+        path = PathData()
+        path.commands = self.commands
+        path.coords = [float(round(coord * scale)) for coord in self.coords]
+        return path
+
+    def geometry_key(self):
+        """
+        Hashable content of path, equal for paths with identical geometry
+        """
+        return ''.join(self.commands), tuple(self.coords)
+
+    def translated(self, dx, dy):
+        """
+        Copy of path with all points moved by (-dx, -dy), i.e. with
+        coordinates relative to origin (dx, dy)
+        """
+        path = PathData()
+        path.commands = self.commands
+        if 'A' not in self.commands:
+            path.coords = [coord - (dy if k % 2 else dx) for k, coord in enumerate(self.coords)]
+        else:
+            coords = []
+            for cmd, args in self.segments():
+                if cmd == 'A':
+                    # Only end point of arc is a position
+                    coords.extend(args[:5])
+                    args = args[5:]
+                coords.extend(coord - (dy if k % 2 else dx) for k, coord in enumerate(args))
+            path.coords = coords
+        return path
+
+    def points(self):
+        """
+        All points of path as (n, 2) array, including control points.
+        Arcs contribute their end point only.
+        """
+        coords = self.coords
+        if 'A' in self.commands:
+            coords = []
+            for cmd, args in self.segments():
+                coords.extend(args[-2:] if cmd == 'A' else args)
+        return np.array(coords, dtype=np.float64).reshape(-1, 2)
+
+    def bounding_box(self, tight=False):
+        """
+        Return (min_x, min_y, max_x, max_y) of path.
+        Default box contains all control points, tight box is computed from
+        extrema of quadratic and cubic curves. Result is cached.
+        """
+        if tight:
+            if self._tight_bbox is None:
+                self._tight_bbox = self._compute_bbox(True)
+            return self._tight_bbox
+        if self._bbox is None:
+            self._bbox = self._compute_bbox(False)
+        return self._bbox
+
+    def _compute_bbox(self, tight):
+        points = self.points()
+        if len(points) == 0:
+            return (0.0, 0.0, 0.0, 0.0)
+
+        if tight and ('Q' in self.commands or 'C' in self.commands):
+            # Index of first point of each curve within 'points'
+            quads = []
+            cubics = []
+            ends = []
+            j = 0
+            for cmd in self.commands:
+                if cmd == 'Q':
+                    quads.append(j)
+                    j += 2
+                elif cmd == 'C':
+                    cubics.append(j)
+                    j += 3
+                else:
+                    j += 1
+                ends.append(j - 1)
+            points = np.concatenate((points[ends],
+                                     _quad_extrema(points, np.array(quads, dtype=np.intp)),
+                                     _cubic_extrema(points, np.array(cubics, dtype=np.intp))))
+
+        min_x, min_y = points.min(axis=0)
+        max_x, max_y = points.max(axis=0)
+        return (float(min_x), float(min_y), float(max_x), float(max_y))
+
+    def d(self):
+        """
+        Path data as string, same format as svgpathtools Path.d()
+        """
+        parts = []
+        for cmd, args in self.segments():
+            if cmd == 'A':
+                parts.append('A {},{} {} {:d},{:d} {},{}'.format(args[0], args[1], args[2],
+                             int(args[3]), int(args[4]), args[5], args[6]))
+            else:
+                parts.append(cmd + ' ' + ' '.join('{},{}'.format(args[k], args[k + 1])
+                                                  for k in range(0, len(args), 2)))
+        return ' '.join(parts)
+
+
+def _quad_extrema(points, idx):
+    """
+    Points of quadratic curves where x or y reaches its extremum.
+    'idx' is index of control point of each curve, curve starts at idx - 1.
+    """
+    if len(idx) == 0:
+        return np.empty((0, 2))
+    p0 = points[idx - 1]
+    p1 = points[idx]
+    p2 = points[idx + 1]
+    # B'(t) = 0 at t = (p0 - p1) / (p0 - 2 p1 + p2), separately for x and y
+    denom = p0 - 2 * p1 + p2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(denom != 0, (p0 - p1) / denom, 0.0)
+    t = np.where((t > 0) & (t < 1), t, 0.0)
+    mt = 1 - t
+    return mt * mt * p0 + 2 * mt * t * p1 + t * t * p2
+
+
+def _cubic_extrema(points, idx):
+    """
+    Points of cubic curves where x or y reaches its extremum.
+    'idx' is index of first control point of each curve, curve starts at idx - 1.
+    """
+    if len(idx) == 0:
+        return np.empty((0, 2))
+    p0 = points[idx - 1]
+    p1 = points[idx]
+    p2 = points[idx + 1]
+    p3 = points[idx + 2]
+    # B'(t) / 3 = a t^2 + b t + c, separately for x and y
+    a = -p0 + 3 * p1 - 3 * p2 + p3
+    b = 2 * (p0 - 2 * p1 + p2)
+    c = p1 - p0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sq = np.sqrt(np.maximum(b * b - 4 * a * c, 0.0))
+        linear = np.where(b != 0, -c / b, 0.0)
+        t1 = np.where(a != 0, (-b + sq) / (2 * a), linear)
+        t2 = np.where(a != 0, (-b - sq) / (2 * a), linear)
+
+    extrema = []
+    for t in (t1, t2):
+        t = np.where((t > 0) & (t < 1), t, 0.0)
+        mt = 1 - t
+        extrema.append(mt * mt * mt * p0 + 3 * mt * mt * t * p1 + 3 * mt * t * t * p2 + t * t * t * p3)
+    return np.concatenate(extrema)
+
+
+def tokenize_path(d):
+    """
+    Split path data string into command letters and float numbers
+    """
+    if 'A' not in d and 'a' not in d:
+        return [tok if tok in _PATH_COMMANDS else float(tok) for tok in _PATH_TOKEN_RE.findall(d)]
+
+    # Arc flags are single digits which may be written without separator,
+    # e.g. 'a25 25 0 0110 10' has large-arc-flag=0, sweep-flag=1, x=10
+    tokens = []
+    pos = 0
+    arc_field = -1
+    while True:
+        m = None
+        if arc_field in (3, 4):
+            m = _ARC_FLAG_RE.match(d, pos)
+        if m is None:
+            m = _ARC_TOKEN_RE.match(d, pos)
+            if m is None:
+                break
+        tok = m.group(1)
+        pos = m.end()
+        if tok in _PATH_COMMANDS:
+            tokens.append(tok)
+            arc_field = 0 if tok in 'Aa' else -1
+        else:
+            tokens.append(float(tok))
+            if arc_field >= 0:
+                arc_field = (arc_field + 1) % 7
+    return tokens
+
+
+class _PathBuilder:
+    """
+    Builds PathData from absolute segments. A move command is only emitted
+    when a segment does not start where the previous one ended.
+    """
+    def __init__(self):
+        self.path = PathData()
+        self.end = None
+
+    def _start(self, start):
+        if self.end != start:
+            self.path.commands.append('M')
+            self.path.coords.extend((start.real, start.imag))
+
+    def line(self, start, end):
+        self._start(start)
+        self.path.commands.append('L')
+        self.path.coords.extend((end.real, end.imag))
+        self.end = end
+
+    def quad(self, start, control, end):
+        self._start(start)
+        self.path.commands.append('Q')
+        self.path.coords.extend((control.real, control.imag, end.real, end.imag))
+        self.end = end
+
+    def cubic(self, start, control1, control2, end):
+        self._start(start)
+        self.path.commands.append('C')
+        self.path.coords.extend((control1.real, control1.imag, control2.real, control2.imag,
+                                 end.real, end.imag))
+        self.end = end
+
+    def arc(self, start, radius, rotation, large_arc, sweep, end):
+        self._start(start)
+        self.path.commands.append('A')
+        self.path.coords.extend((radius.real, radius.imag, rotation, float(bool(large_arc)),
+                                 float(bool(sweep)), end.real, end.imag))
+        self.end = end
+
+
+def build_path(tokens):
+    """
+    Convert tokenized path data into absolute PathData.
+    Positions are complex numbers, so arithmetic (including signed zeros)
+    is exactly the same as in svgpathtools.
+    """
+    builder = _PathBuilder()
+    n = len(tokens)
+    i = 0
+    current_pos = 0j
+    start_pos = None
+    command = None
+    absolute = True
+    last_control = None
+
+    while i < n:
+        tok = tokens[i]
+        if isinstance(tok, str):
+            # New command.
+            last_command = command  # Used by S and T
+            command = tok.upper()
+            absolute = tok == command
+            i += 1
+        else:
+            # Implicit command repeats previous one
+            if command is None:
+                raise ValueError(f"Unallowed implicit command in path data, position {i}")
+            last_command = command
+
+        argcnt = PATH_COMMAND_ARGCNT[command]
+        if i + argcnt > n:
+            raise ValueError(f"Path command '{command}' expects {argcnt} values")
+        args = tokens[i:i + argcnt]
+        for a in args:
+            if isinstance(a, str):
+                raise ValueError(f"Path command '{command}' expects {argcnt} values")
+        i += argcnt
+
+        if command == 'M':
+            pos = args[0] + args[1] * 1j
+            if absolute:
+                current_pos = pos
+            else:
+                current_pos += pos
+            start_pos = current_pos
+            # Implicit moveto commands are treated as lineto commands.
+            command = 'L'
+
+        elif command == 'Z':
+            if not (current_pos == start_pos):
+                builder.line(current_pos, start_pos)
+            current_pos = start_pos
+            command = None
+
+        elif command == 'L':
+            pos = args[0] + args[1] * 1j
+            if not absolute:
+                pos += current_pos
+            builder.line(current_pos, pos)
+            current_pos = pos
+
+        elif command == 'H':
+            pos = args[0] + current_pos.imag * 1j
+            if not absolute:
+                pos += current_pos.real
+            builder.line(current_pos, pos)
+            current_pos = pos
+
+        elif command == 'V':
+            pos = current_pos.real + args[0] * 1j
+            if not absolute:
+                pos += current_pos.imag * 1j
+            builder.line(current_pos, pos)
+            current_pos = pos
+
+        elif command == 'C':
+            control1 = args[0] + args[1] * 1j
+            control2 = args[2] + args[3] * 1j
+            end = args[4] + args[5] * 1j
+            if not absolute:
+                control1 += current_pos
+                control2 += current_pos
+                end += current_pos
+            builder.cubic(current_pos, control1, control2, end)
+            last_control = control2
+            current_pos = end
+
+        elif command == 'S':
+            # First control point is the reflection of the second control
+            # point of previous curve, or current point if there is none.
+            if last_command not in ('C', 'S'):
+                control1 = current_pos
+            else:
+                control1 = current_pos + current_pos - last_control
+            control2 = args[0] + args[1] * 1j
+            end = args[2] + args[3] * 1j
+            if not absolute:
+                control2 += current_pos
+                end += current_pos
+            builder.cubic(current_pos, control1, control2, end)
+            last_control = control2
+            current_pos = end
+
+        elif command == 'Q':
+            control = args[0] + args[1] * 1j
+            end = args[2] + args[3] * 1j
+            if not absolute:
+                control += current_pos
+                end += current_pos
+            builder.quad(current_pos, control, end)
+            last_control = control
+            current_pos = end
+
+        elif command == 'T':
+            if last_command not in ('Q', 'T'):
+                control = current_pos
+            else:
+                control = current_pos + current_pos - last_control
+            end = args[0] + args[1] * 1j
+            if not absolute:
+                end += current_pos
+            builder.quad(current_pos, control, end)
+            last_control = control
+            current_pos = end
+
+        elif command == 'A':
+            radius = args[0] + args[1] * 1j
+            end = args[5] + args[6] * 1j
+            if not absolute:
+                end += current_pos
+            if radius.real == 0 or radius.imag == 0:
+                # Zero radius arcs are drawn as lines
+                builder.line(current_pos, end)
+            else:
+                builder.arc(current_pos, radius, args[2], args[3], args[4], end)
+            current_pos = end
+
+    return builder.path
+
+
+def build_paths(sources):
+    """
+    Parse list of path data strings into list of PathData,
+    None for strings without any command
+    """
+    paths = []
+    for d in sources:
+        tokens = tokenize_path(d)
+        paths.append(build_path(tokens) if len(tokens) > 0 else None)
+    return paths
+
+
+def parse_path_data(d):
+    """
+    Convert path data string (e.g. 'd' attribute) into absolute PathData
+    """
+    return build_path(tokenize_path(d))
+
+
+def parse_points(points_str):
+    """
+    Convert 'points' attribute of polyline/polygon into list of (x, y)
+    """
+    values = [float(v) for v in _NUMBER_RE.findall(points_str)]
+    return list(zip(values[0::2], values[1::2]))
+
+
+def polyline_to_path(points, is_polygon):
+    """
+    Convert polyline/polygon points into PathData.
+    Polygon made from n points results in n lines, even if some of them
+    have zero length.
+    """
+    if len(points) == 0:
+        return PathData()
+
+    closed = points[0] == points[-1]
+    if is_polygon and closed:
+        points = points + [points[0]]
+
+    tokens = ['M', points[0][0], points[0][1]]
+    for x, y in points[1:]:
+        tokens.extend(('L', x, y))
+    if is_polygon or closed:
+        tokens.append('z')
+    return build_path(tokens)
+
+
+def rect_to_path(x, y, w, h):
+    """
+    Convert rectangle without rounded corners into PathData
+    """
+    return build_path(['M', x, y, 'L', x + w, y, 'L', x + w, y + h, 'L', x, y + h, 'z'])
+
+
+def line_to_path(x1, y1, x2, y2):
+    return build_path(['M', x1, y1, 'L', x2, y2])
@@ -0,0 +1,162 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Compressed path data (--compress-paths).
+#
+# Opcodes of a path are packed two per byte (low nibble first) as index into
+# CANONICAL_COMMANDS. Coordinates are stored as difference to the previous
+# coordinate of the same axis, zigzag encoded (small negative and positive
+# numbers become small unsigned numbers) and written as varint (7 bits per
+# byte, high bit set on all bytes but the last).
+#
+# Stored values are exactly the values of the uncompressed data_mnemonic_t
+# array: integer types keep the truncated (saturated) coordinate, float keeps
+# the coordinate with two decimals as integer number of hundredths. The
+# decoder emitted by decoder_source() expands a path into a data_mnemonic_t
+# buffer in RAM, differences are summed modulo 2^32.
+#
+
+from svg_path_data import CANONICAL_COMMANDS, PATH_COMMAND_ARGCNT
+from svg_data_type import DATA_TYPE_RANGES
+
+# Float coordinates are stored in hundredths, as printed to uncompressed arrays
+FLOAT_SCALE = 100
+
+_INT32_RANGE = 1 << 32
+
+
+class PackedPath:
+    """
+    Opcode nibbles and varint coordinate differences of one path
+    """
+    def __init__(self, command_count, opcodes, coords):
+        self.command_count = command_count
+        self.opcodes = opcodes
+        self.coords = coords
+
+    def size(self):
+        return len(self.opcodes) + len(self.coords)
+
+
+def stored_value(coord, data_type):
+    """
+    Integer stored for coordinate, as the C compiler converts the printed value
+    """
+    text = "%.2f" % coord
+    if data_type == 'float':
+        value = int(text.replace('.', ''))
+        if not -(1 << 31) <= value < (1 << 31):
+            raise ValueError(f"Coordinate {text} is out of range of compressed float path data")
+        return value
+    # Conversion to integer type truncates toward zero, compilers saturate
+    # constants out of range (reported as overflow when data type is selected)
+    low, high = DATA_TYPE_RANGES[data_type]
+    return min(max(int(float(text)), low), high)
+
+
+def zigzag(value):
+    return 2 * value if value >= 0 else -2 * value - 1
+
+
+def write_varint(value, out):
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def pack_path(path, data_type):
+    """
+    Pack canonical PathData into PackedPath
+    """
+    opcodes = bytearray((len(path.commands) + 1) // 2)
+    for i, command in enumerate(path.commands):
+        opcodes[i >> 1] |= CANONICAL_COMMANDS.index(command) << ((i & 1) * 4)
+
+    coords = bytearray()
+    previous = [0, 0]
+    # Canonical commands hold only points, x is even and y is odd
+    for k, coord in enumerate(path.coords):
+        value = stored_value(coord, data_type)
+        # Difference as signed 32 bit number, decoder sums modulo 2^32
+        delta = (value - previous[k & 1] + (1 << 31)) % _INT32_RANGE - (1 << 31)
+        previous[k & 1] = value
+        write_varint(zigzag(delta), coords)
+    return PackedPath(len(path.commands), bytes(opcodes), bytes(coords))
+
+
+def unpacked_size(path):
+    """
+    Number of data_mnemonic_t elements of path, including VLC_OP_END
+    """
+    return len(path.commands) + len(path.coords) + 1
+
+
+def byte_rows(data, indent="    ", per_row=16):
+    """
+    C initializer rows of byte array
+    """
+    return [indent + ", ".join("0x%02x" % byte for byte in data[i:i + per_row]) + ","
+            for i in range(0, len(data), per_row)]
+
+
+def decoder_source(data_type):
+    """
+    C source of packed_path_t and unpack_path_data(), guarded so that it is
+    defined once when headers of several assets are included
+    """
+    if data_type == 'float':
+        value = f"(float)((double)(int32_t)point[k & 1] / {FLOAT_SCALE}.0)"
+    else:
+        value = f"({data_type})(int32_t)point[k & 1]"
+    opcodes = ", ".join(f"VLC_OP_{name}" for name in ('MOVE', 'LINE', 'QUAD', 'CUBIC'))
+    argcnt = ", ".join(str(PATH_COMMAND_ARGCNT[command]) for command in CANONICAL_COMMANDS)
+    return f"""#ifndef PACKED_PATH_DECODER_H
+#define PACKED_PATH_DECODER_H
+
+typedef struct packed_path {{
+    uint32_t command_count;
+    const uint8_t *opcodes;
+    const uint8_t *coords;
+}} packed_path_t;
+
+static const uint8_t packed_path_opcodes[] = {{ {opcodes} }};
+static const uint8_t packed_path_argcnt[] = {{ {argcnt} }};
+
+static inline uint32_t packed_path_read(const uint8_t **coords)
+{{
+    uint32_t value = 0;
+    int shift = 0;
+    uint8_t byte;
+    do {{
+        byte = *(*coords)++;
+        value |= (uint32_t)(byte & 0x7f) << shift;
+        shift += 7;
+    }} while (byte & 0x80);
+    return (value >> 1) ^ (0u - (value & 1));
+}}
+
+/* Expand packed path into data_mnemonic_t array terminated by VLC_OP_END */
+static inline void unpack_path_data(const packed_path_t *packed, data_mnemonic_t *out)
+{{
+    const uint8_t *coords = packed->coords;
+    uint32_t point[2] = {{0, 0}};
+    uint32_t i;
+    int k;
+    for (i = 0; i < packed->command_count; i++) {{
+        uint8_t op = (packed->opcodes[i >> 1] >> ((i & 1) * 4)) & 0x0f;
+        (out++)->cmd = packed_path_opcodes[op];
+        for (k = 0; k < packed_path_argcnt[op]; k++) {{
+            point[k & 1] += packed_path_read(&coords);
+            (out++)->data = {value};
+        }}
+    }}
+    out->cmd = VLC_OP_END;
+}}
+
+#endif
+"""
@@ -0,0 +1,74 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Parallel per-path processing of one SVG file.
+#
+# Path data of a drawable does not depend on other drawables, so parsing of
+# path data, arc conversion, simplification and formatting of path data
+# arrays can run on chunks of paths in worker processes. Results are merged
+# in document order, the output is byte-identical to a sequential run.
+#
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Smaller stages run in the calling process, pool overhead would dominate
+MIN_PARALLEL_ITEMS = 512
+
+# Chunks per worker, balances uneven paths against pickling overhead
+_CHUNKS_PER_JOB = 4
+
+
+def default_jobs():
+    """
+    Number of CPUs the process may run on
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+class PathPool:
+    """
+    Pool of worker processes used by the per-path stages of one conversion.
+    Workers are started on first parallel map() and stopped by close().
+    More workers than CPUs only add overhead, so the number of workers is
+    limited to default_jobs() and a single CPU runs everything in-process.
+    """
+    def __init__(self, jobs=1):
+        self.jobs = max(1, min(jobs, default_jobs()))
+        self._executor = None
+
+    def map(self, function, items, *args):
+        """
+        Return function(items, *args) computed chunk by chunk.
+        'function' must be a module level function returning one result
+        per item, results are returned in the order of items.
+        """
+        if self.jobs <= 1 or len(items) < MIN_PARALLEL_ITEMS:
+            return function(items, *args)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+        size = -(-len(items) // (self.jobs * _CHUNKS_PER_JOB))
+        chunks = [items[k:k + size] for k in range(0, len(items), size)]
+        futures = [self._executor.submit(function, chunk, *args) for chunk in chunks]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,196 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Tolerance based simplification of PathData.
+#
+# Designer tools export paths with redundant geometry. Simplification keeps
+# every point of the outline within 'tolerance' of the original one:
+#   - line segments shorter than half of tolerance are dropped
+#   - curves with all control points within half of tolerance of the chord
+#     become lines
+#   - runs of line segments are reduced with Douglas-Peucker, which also
+#     merges collinear segments
+# Dropping segments moves the start of the following ones and Douglas-Peucker
+# measures the run left after that, so each of the two steps may move the
+# outline by half of tolerance.
+#
+
+import math
+import numpy as np
+
+from svg_path_data import PathData
+
+
+# Ranges with more points are reduced with numpy
+_VECTORIZE_MIN = 32
+
+
+def _segment_distances(points, a, b):
+    """
+    Distances of (n, 2) 'points' to line segment a-b
+    """
+    ab = b - a
+    length2 = float(ab @ ab)
+    if length2 == 0.0:
+        return np.hypot(points[:, 0] - a[0], points[:, 1] - a[1])
+    t = np.clip(((points - a) @ ab) / length2, 0.0, 1.0)
+    delta = points - (a + t[:, None] * ab)
+    return np.hypot(delta[:, 0], delta[:, 1])
+
+
+def douglas_peucker(points, tolerance):
+    """
+    Return list of indices of 'points' ((x, y) list) kept by Douglas-Peucker
+    reduction. First and last points are always kept.
+    """
+    n = len(points)
+    keep = [0, n - 1]
+    array = None
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        ax, ay = points[first]
+        bx, by = points[last]
+        if last - first > _VECTORIZE_MIN:
+            # Long runs, e.g. traced outlines, are measured with numpy
+            if array is None:
+                array = np.array(points)
+            distances = _segment_distances(array[first + 1:last], array[first], array[last])
+            k = int(np.argmax(distances))
+            distance = float(distances[k])
+        else:
+            distance, k = max((_point_segment_distance(x, y, ax, ay, bx, by), k)
+                              for k, (x, y) in enumerate(points[first + 1:last]))
+        if distance > tolerance:
+            k += first + 1
+            keep.append(k)
+            stack.append((first, k))
+            stack.append((k, last))
+    return sorted(keep)
+
+
+def _point_segment_distance(px, py, ax, ay, bx, by):
+    # Scalar version of _segment_distances, used for single segments
+    abx = bx - ax
+    aby = by - ay
+    length2 = abx * abx + aby * aby
+    if length2 == 0.0:
+        return math.hypot(px - ax, py - ay)
+    t = min(max(((px - ax) * abx + (py - ay) * aby) / length2, 0.0), 1.0)
+    return math.hypot(px - (ax + t * abx), py - (ay + t * aby))
+
+
+class _Simplifier:
+    """
+    Builds simplified PathData, line segments are collected into runs which
+    are reduced once a curve, move or end of path is reached
+    """
+    def __init__(self, tolerance):
+        # Half for dropped segments, half for Douglas-Peucker
+        self.tolerance = tolerance / 2
+        self.path = PathData()
+        self.current = None
+        # Polyline being collected, first point is where it starts
+        self.run = []
+
+    def _within(self, coords):
+        # True when all points are within tolerance of current point
+        cx, cy = self.current
+        tolerance = self.tolerance
+        return all(math.hypot(coords[k] - cx, coords[k + 1] - cy) <= tolerance
+                   for k in range(0, len(coords), 2))
+
+    def _flush(self):
+        run = self.run
+        if len(run) > 1:
+            if len(run) > 2:
+                run = [run[k] for k in douglas_peucker(run, self.tolerance)]
+            for x, y in run[1:]:
+                self.path.commands.append('L')
+                self.path.coords.extend((x, y))
+        self.run = [self.current]
+
+    def _drop_empty_move(self):
+        path = self.path
+        if path.commands and path.commands[-1] == 'M':
+            path.commands.pop()
+            del path.coords[-2:]
+
+    def move(self, point):
+        self._flush()
+        self._drop_empty_move()
+        self.path.commands.append('M')
+        self.path.coords.extend(point)
+        self.current = tuple(point)
+        self.run = [self.current]
+
+    def line(self, point):
+        if self._within(point):
+            # Degenerate segment
+            return
+        self.current = tuple(point)
+        self.run.append(self.current)
+
+    def curve(self, cmd, args):
+        if self._within(args):
+            return
+        ax, ay = self.current
+        bx, by = args[-2:]
+        tolerance = self.tolerance
+        if all(_point_segment_distance(args[k], args[k + 1], ax, ay, bx, by) <= tolerance
+               for k in range(0, len(args) - 2, 2)):
+            # Flat curve, its control polygon contains whole curve
+            self.line(args[-2:])
+            return
+        self._emit(cmd, args)
+
+    def _emit(self, cmd, args):
+        self._flush()
+        self.path.commands.append(cmd)
+        self.path.coords.extend(args)
+        self.current = tuple(args[-2:])
+        self.run = [self.current]
+
+    def arc(self, args):
+        self._emit('A', args)
+
+    def finish(self):
+        self._flush()
+        self._drop_empty_move()
+        return self.path
+
+
+def simplify_path(path, tolerance):
+    """
+    Return simplified copy of PathData, shape stays within 'tolerance'.
+    Path is returned unchanged when nothing would be left of it.
+    """
+    simplifier = _Simplifier(tolerance)
+    for cmd, args in path.segments():
+        if cmd == 'M':
+            simplifier.move(args)
+        elif cmd == 'L':
+            simplifier.line(args)
+        elif cmd == 'A':
+            simplifier.arc(args)
+        else:
+            simplifier.curve(cmd, args)
+    result = simplifier.finish()
+    if not any(cmd != 'M' for cmd in result.commands):
+        return path
+    return result
+
+
+def transform_scale(rows):
+    """
+    Largest scale factor of transform given as 3x3 rows, tolerance in
+    device pixels is divided by it to get tolerance in path coordinates
+    """
+    scale = float(np.linalg.norm(np.asarray(rows, dtype=np.float64)[:2, :2], 2))
+    return scale if scale > 0 else 1.0
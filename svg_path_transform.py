@@ -4,8 +4,30 @@
 # SPDX-License-Identifier: MIT
 #
 
+import functools
+import math
+import warnings
 import numpy as np
-from svgpathtools import svg2paths
+
+# Affine transforms are kept as 6 floats (a, b, c, d, e, f), same order as
+# SVG matrix(a b c d e f). They describe the 3x3 matrix
+#   | a c e |
+#   | b d f |
+#   | 0 0 1 |
+AFFINE_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+def affine_multiply(m, n):
+    """Returns affine transform m.n (n is applied first)"""
+    a, b, c, d, e, f = m
+    g, h, i, j, k, l = n
+    return (a*g + c*h, b*g + d*h,
+            a*i + c*j, b*i + d*j,
+            a*k + c*l + e, b*k + d*l + f)
+
+def affine_to_rows(m):
+    """Returns rows of 3x3 matrix of affine transform"""
+    a, b, c, d, e, f = m
+    return ((a, c, e), (b, d, f), (0.0, 0.0, 1.0))
 
 def parse_transform(transform_str):
     """Converts a valid SVG transformation string into a 3x3 matrix.
@@ -15,22 +37,34 @@ def parse_transform(transform_str):
     elif not isinstance(transform_str, str):
         raise TypeError('Must provide a string to parse')
 
-    total_transform = np.identity(3)
+    return np.array(affine_to_rows(parse_transform_affine(transform_str)))
+
+@functools.lru_cache(maxsize=4096)
+def parse_transform_affine(transform_str):
+    """Converts a valid SVG transformation string into an affine transform.
+    Results are cached, since same transform strings are used by many elements.
+    If the string is empty or null, this returns identity transform"""
+    if not transform_str:
+        return AFFINE_IDENTITY
+    elif not isinstance(transform_str, str):
+        raise TypeError('Must provide a string to parse')
+
+    total_transform = AFFINE_IDENTITY
     transform_substrs = transform_str.split(')')[:-1]  # Skip the last element, because it should be empty
     for substr in transform_substrs:
-        total_transform = total_transform.dot(_parse_transform_substr(substr))
+        total_transform = affine_multiply(total_transform, _parse_transform_substr(substr))
 
     return total_transform
 
 def _check_num_parsed_values(values, allowed):
     if not any(num == len(values) for num in allowed):
         if len(allowed) > 1:
-            svg2paths.warnings.warn('Expected one of the following number of values {0}, but found {1} values instead: {2}'
+            warnings.warn('Expected one of the following number of values {0}, but found {1} values instead: {2}'
                           .format(allowed, len(values), values))
         elif allowed[0] != 1:
-            svg2paths.warnings.warn('Expected {0} values, found {1}: {2}'.format(allowed[0], len(values), values))
+            warnings.warn('Expected {0} values, found {1}: {2}'.format(allowed[0], len(values), values))
         else:
-            svg2paths.warnings.warn('Expected 1 value, found {0}: {1}'.format(len(values), values))
+            warnings.warn('Expected 1 value, found {0}: {1}'.format(len(values), values))
         return False
     return True
 
@@ -41,20 +75,19 @@ def _parse_transform_substr(transform_substr):
     values = list(map(float, filter(None, value_str.split(' '))))
     #print(values)
 
-    transform = np.identity(3)
+    transform = AFFINE_IDENTITY
     if 'matrix' in type_str:
         if not _check_num_parsed_values(values, [6]):
             return transform
 
-        transform[0:2, 0:3] = np.array([values[0:6:2], values[1:6:2]])
+        transform = tuple(values[0:6])
 
     elif 'translate' in transform_substr:
         if not _check_num_parsed_values(values, [1, 2]):
             return transform
 
-        transform[0, 2] = values[0]
-        if len(values) > 1:
-            transform[1, 2] = values[1]
+        ty = values[1] if len(values) > 1 else 0.0
+        transform = (1.0, 0.0, 0.0, 1.0, values[0], ty)
 
     elif 'scale' in transform_substr:
         if not _check_num_parsed_values(values, [1, 2]):
@@ -62,41 +95,37 @@ def _parse_transform_substr(transform_substr):
 
         x_scale = values[0]
         y_scale = values[1] if (len(values) > 1) else x_scale
-        transform[0, 0] = x_scale
-        transform[1, 1] = y_scale
+        transform = (x_scale, 0.0, 0.0, y_scale, 0.0, 0.0)
 
     elif 'rotate' in transform_substr:
         if not _check_num_parsed_values(values, [1, 3]):
             return transform
 
-        angle = values[0] * np.pi / 180.0
+        angle = values[0] * math.pi / 180.0
         if len(values) == 3:
             offset = values[1:3]
         else:
             offset = (0, 0)
-        tf_offset = np.identity(3)
-        tf_offset[0:2, 2:3] = np.array([[offset[0]], [offset[1]]])
-        tf_rotate = np.identity(3)
-        tf_rotate[0:2, 0:2] = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
-        tf_offset_neg = np.identity(3)
-        tf_offset_neg[0:2, 2:3] = np.array([[-offset[0]], [-offset[1]]])
+        tf_offset = (1.0, 0.0, 0.0, 1.0, offset[0], offset[1])
+        tf_rotate = (math.cos(angle), math.sin(angle), -math.sin(angle), math.cos(angle), 0.0, 0.0)
+        tf_offset_neg = (1.0, 0.0, 0.0, 1.0, -offset[0], -offset[1])
 
-        transform = tf_offset.dot(tf_rotate).dot(tf_offset_neg)
+        transform = affine_multiply(affine_multiply(tf_offset, tf_rotate), tf_offset_neg)
 
     elif 'skewX' in transform_substr:
         if not _check_num_parsed_values(values, [1]):
             return transform
 
-        transform[0, 1] = np.tan(values[0] * np.pi / 180.0)
+        transform = (1.0, 0.0, math.tan(values[0] * math.pi / 180.0), 1.0, 0.0, 0.0)
 
     elif 'skewY' in transform_substr:
         if not _check_num_parsed_values(values, [1]):
             return transform
 
-        transform[1, 0] = np.tan(values[0] * np.pi / 180.0)
+        transform = (1.0, math.tan(values[0] * math.pi / 180.0), 0.0, 1.0, 0.0, 0.0)
     else:
         # Return an identity matrix if the type of transform is unknown, and warn the user
-        svg2paths.warnings.warn('Unknown SVG transform type: {0}'.format(type_str))
+        warnings.warn('Unknown SVG transform type: {0}'.format(type_str))
 
     return transform
 
@@ -24,7 +24,9 @@
 
 # External dependencies
 from __future__ import division, absolute_import, print_function
-from xml.dom.minidom import parse
+import xml.sax
+import xml.sax.handler
+import gzip
 import sys
 import numpy as np
 import os
@@ -37,12 +39,11 @@ except ImportError:
     FilePathLike = str
 
 # Internal dependencies
-from svgpathtools.parser import parse_path
-
-from io import StringIO
 from svgpathtools.svg_to_paths import *
 from svg_path_transform import *
+from svg_path_data import *
 from svg_colors import *
+from svg_stage_timer import StageTimer
 
 g_counter = 0
 
@@ -62,26 +63,76 @@ _ATTRIB_NECESSARY_FOR_DRAWING = {'fill', 'fill-rule', 'stroke', 'stroke-width',
 # Following attributes support 'currentColor' value
 _ATTRIB_SUPPORTING_CURRENT_COLOR = {'fill-rule', 'stroke', 'fill','solid-color','stop-color'}
 
-# Mapping of arguments for each VG draw commands.
-_CMD_PARAM_TABLE = {
-    'M': 2, 'm': 2,
-    'L': 2, 'l': 2,
-    'T': 2, 't': 2,
-    'H': 1, 'h': 1,
-    'V': 1, 'v': 1,
-    'C': 6, 'c': 6,
-    'S': 4, 's': 4,
-    'Q': 4, 'q': 4,
-    'Z': 0, 'z': 0
-}
+# Following attributes are inherited from parents, each element carries
+# their computed values so no lookup needs to walk towards root element
+_ATTRIB_INHERITED = _ATTRIB_NECESSARY_FOR_DRAWING | {'color'}
 
 # Enable code to configure debugging of node-traversal
 _DEBUG=0
 if _DEBUG==1:
-    g_depth = 0
     g_spaces="          "
 
 
+# First bytes of gzip compressed (.svgz) files
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+class SVGElement:
+    """
+    Element of SVG document seen while streaming.
+    It provides the subset of DOM element interface used by this application.
+    Only ancestors of elements which are still in use are kept alive.
+
+    'style' holds computed values of inherited attributes and 'matrix' the
+    accumulated affine transform of this element and its parents (None when
+    none of them has transform attribute). Both are shared with parent element
+    unless this element changes them, so a transform of a group is parsed and
+    multiplied once for all its children.
+    """
+    __slots__ = ('tagName', 'attributes', 'parentNode', 'style', 'matrix', '_own_style')
+
+    def __init__(self, tag_name, attributes, parent):
+        self.tagName = tag_name
+        self.attributes = attributes
+        self.parentNode = parent
+
+        if parent is not None:
+            self.style = parent.style
+            self.matrix = parent.matrix
+        else:
+            self.style = {}
+            self.matrix = None
+        self._own_style = parent is None
+
+        for name, value in attributes.items():
+            if name in _ATTRIB_INHERITED:
+                self._set_style(name, value)
+        if 'transform' in attributes:
+            matrix = self.matrix if self.matrix is not None else AFFINE_IDENTITY
+            self.matrix = affine_multiply(matrix, parse_transform_affine(attributes['transform']))
+
+    def _set_style(self, name, value):
+        # 'inherit' keeps value computed for parent element
+        if value == 'inherit':
+            return
+        if not self._own_style:
+            self.style = dict(self.style)
+            self._own_style = True
+        self.style[name] = value
+
+    def hasAttribute(self, name):
+        return name in self.attributes
+
+    def getAttribute(self, name):
+        # Same as DOM, missing attribute is an empty string
+        return self.attributes.get(name, '')
+
+    def setAttribute(self, name, value):
+        self.attributes[name] = value
+        if name in _ATTRIB_INHERITED:
+            self._set_style(name, value)
+
+
 class BasicRect:
     def __init__(self, x=-1, y=-1, width=-1, height=-1):
         self.x = x
@@ -104,27 +155,88 @@ class SVGViewBox(BasicRect):
         self.width = float(viewbox_value[2])
         self.height = float(viewbox_value[3])
 
-    def transform(self, alist):
-        # Transform list describes each individual transforms on path/shape
-        transform_list = alist['transform']
-        # parse_transform requires a single string of all successive transforms.
-        attributes = parse_transform(' '.join(transform_list))
+    def transform(self, matrix):
+        # 'matrix' is accumulated affine transform of path/shape and its parents.
+        # Returns rows of 3x3 transform matrix in viewbox coordinates.
+        a, b, c, d, e, f = matrix
         if self.width > 0 and self.height > 0:
-            attributes[0][2] = attributes[0][2] - self.x
-            attributes[1][2] = attributes[1][2] - self.y
-        return attributes
+            e = e - self.x
+            f = f - self.y
+        return affine_to_rows((a, b, c, d, e, f))
+
+class _SVGStreamHandler(xml.sax.handler.ContentHandler):
+    """
+    Feed SAX events of SVG document into NodeProcessor.
+    It keeps only stack of open elements, elements are visited in the
+    same depth-first order as the SVG tree would be traversed.
+    """
+
+    def __init__(self, processor):
+        super().__init__()
+        self.processor = processor
+        self.stack = []
+        # Per open element: True when its children are traversed for drawing
+        self.active = []
+        # Open gradient elements collecting their stop points
+        self.gradients = []
+        self.svg_found = False
+
+    def startElement(self, name, attrs):
+        parent = self.stack[-1] if self.stack else None
+        e = SVGElement(name, dict(attrs.items()), parent)
+        processor = self.processor
+        parent_active = self.active[-1] if self.active else False
+        is_active = False
+
+        if name == 'svg' and not self.svg_found:
+            # Root of drawing, equivalent of getElementsByTagName('svg')[0]
+            self.svg_found = True
+            processor._set_svg_node(e)
+            is_active = True
+        elif self.svg_found:
+            if name in ('linearGradient', 'radialGradient'):
+                self.gradients.append(processor._start_gradient(e))
+            elif name == 'stop':
+                stop = processor._make_attrib_dictionary(e)
+                for grad_dict in self.gradients:
+                    grad_dict['stops'].append(stop)
+            elif name == 'solidColor':
+                processor._add_solid_color(e)
+
+            if parent_active and name not in _SVG_DISCARD_LIST:
+                if _DEBUG==1:
+                    print(f'{g_spaces[:len(self.stack)*2]} {name} {e.getAttribute("id")}')
+                if name in _SVG_CONTAINER_LIST:
+                    is_active = True
+                # Is supported node
+                elif name in _SVG_DRAWABLE_LIST:
+                    if processor.timer.profile_elements:
+                        with processor.timer.element(name):
+                            processor._process_node(e)
+                    else:
+                        processor._process_node(e)
+
+        self.stack.append(e)
+        self.active.append(is_active)
+
+    def endElement(self, name):
+        self.stack.pop()
+        self.active.pop()
+        if name in ('linearGradient', 'radialGradient') and self.svg_found:
+            self.processor._end_gradient(self.gradients.pop())
+
 
 class NodeProcessor:
     """
     A class to allow traversing SVG tree in some specific order
 
+    The SVG document is streamed, it is never loaded completely in memory.
+    Gzip compressed documents (.svgz) are decompressed on the fly.
     """
 
     def update_svg_dimension(self, svg_node, vb):
 
-        keys = list(svg_node.attributes.keys())
-        values = [val.value for val in list(svg_node.attributes.values())]
-        alist = dict(list(zip(keys,values)))
+        alist = dict(svg_node.attributes)
 
         x_str = alist.get("x", None)
         y_str = alist.get("y", None)
@@ -157,29 +269,53 @@ class NodeProcessor:
         """
         self.svg_id = 0
         self.file_name = file_name
-        self.doc = parse(file_name)
-
-        self.svg_node = self.doc.getElementsByTagName('svg')[0]
-        # Get ViewBox of SVG element to find display area for vector drawing
+        self.svg_node = None
         self.vb = SVGViewBox()
         self.svg = SVGRoot()
-        self.vb.parse(self.svg_node)
-        self.update_svg_dimension(self.svg_node, self.vb)
+
+        # Paint servers, filled while streaming the document
+        self.linear_gradients = dict()
+        self.radial_gradients = dict()
+        self.solor_colors = dict()
+
+        # Drawable elements as (PathData or path data string, attribute list),
+        # paint references are resolved when whole document is read
+        self.pending_nodes = []
 
         # Arrays that will contains resultant things
-        self.d_strings = []
         self.shapeTrans = []
         self.attribute_dictionary_list = []
 
         # Finally processed paths
         self.paths = []
 
-    def line2pathd(self, alist):
-        x1 = alist.get('x1', 0)
-        y1 = alist.get('y1', 0)
-        x2 = alist.get('x2', 0)
-        y2 = alist.get('y2', 0)
-        return f'M {x1} {y1} L {x2} {y2}'
+        # Stages of traversal are timed, see depth_first()
+        self.timer = StageTimer()
+
+    def _set_svg_node(self, svg_node):
+        self.svg_node = svg_node
+        # Get ViewBox of SVG element to find display area for vector drawing
+        self.vb.parse(self.svg_node)
+        self.update_svg_dimension(self.svg_node, self.vb)
+
+    def _open(self):
+        with open(self.file_name, 'rb') as f:
+            magic = f.read(len(_GZIP_MAGIC))
+        if magic == _GZIP_MAGIC:
+            return gzip.open(self.file_name, 'rb')
+        return open(self.file_name, 'rb')
+
+    def parse(self):
+        """
+        Stream SVG document and collect drawables, gradients and solid colors
+        """
+        handler = _SVGStreamHandler(self)
+        parser = xml.sax.make_parser()
+        parser.setContentHandler(handler)
+        with self._open() as f:
+            parser.parse(f)
+        if self.svg_node is None:
+            raise ValueError(f"{self.file_name} does not contain svg element")
 
     def is_url_prefix_present(self, color_str):
         return color_str.startswith("url")
@@ -192,48 +328,48 @@ class NodeProcessor:
         e.setAttribute("svg_id",f"unique_id{self.svg_id}")
         self.svg_id = self.svg_id +1
 
-        strings = ""
+        path = None
         #print(f'{e.tagName}\n')
         
         # Get attribute list
         #alist = [self._make_attrib_dictionary(e)]
         alist = self._make_attrib_dictionary(e)
         if e.tagName == "path":
-            strings = [alist['d']]
-            strings = ' '.join(strings)
-            strings = strings.replace(',',' ')
-            # Add space between values and command
-            strings = re.sub(r'([a-zA-Z])([0-9\-])', r'\1 \2', strings)
-            strings = re.sub(r'([0-9])([a-zA-Z])', r'\1 \2', strings)
-            # Find commands and numerical values from the string
-            commands = re.findall(r'[a-zA-Z]|-?\d*\.?\d+|\.\d+', strings)
-            strings = self.insert_missing_path_commands(commands)
+            # Path data string is parsed once whole document is read, see _build_paths()
+            path = alist['d']
 
         elif e.tagName in ["polyline","polygon"]:
             if e.tagName == "polygon":
                 is_polygon = True 
             else:
                 is_polygon = False 
-            strings = polygon2pathd(alist, is_polygon)
+            points = parse_points(alist.get('points', ''))
+            if len(points) > 0:
+                path = polyline_to_path(points, is_polygon)
 
         elif e.tagName in ["circle","ellipse"]:
             if e.tagName == "ellipse":
                 if (alist['rx'] == "0") or (alist['ry'] == "0"):
                     if 'stroke' in alist:
                         alist['stroke'] = 'none'
-            strings = ellipse2pathd(alist)
+            path = parse_path_data(ellipse2pathd(alist))
 
         elif e.tagName in ["rect"]:
             if (alist['width'] == "0") or (alist['height'] == "0"):
                 if 'stroke' in alist:
                     alist['stroke'] = 'none'
-            strings = rect2pathd(alist)
+            if 'rx' in alist or 'ry' in alist:
+                # Rounded corners are made of arcs
+                path = parse_path_data(rect2pathd(alist))
+            else:
+                path = rect_to_path(float(alist.get('x', 0)), float(alist.get('y', 0)),
+                                    float(alist.get('width', 0)), float(alist.get('height', 0)))
         elif e.tagName in ['line']:
-            strings = self.line2pathd(alist)
+            path = line_to_path(float(alist.get('x1', 0)), float(alist.get('y1', 0)),
+                                float(alist.get('x2', 0)), float(alist.get('y2', 0)))
 
         if 'transform' in alist:
-            attributes = self.vb.transform(alist)
-            alist['path_transform'] = attributes
+            alist['path_transform'] = self.vb.transform(e.matrix)
 
         if alist['fill'] == 'none':
             alist['fill'] = None
@@ -241,6 +377,11 @@ class NodeProcessor:
         if alist['stroke-dasharray'] == 'none':
             alist['stroke-dasharray'] = None
 
+        # Gradients may be defined after they are referenced,
+        # so paint is validated once whole document is read.
+        self.pending_nodes.append((path, alist))
+
+    def _finish_node(self, path, alist):
         fill_str = alist['fill']
         if fill_str != None and self.is_url_prefix_present(fill_str):
             # When fill is referring to colur using URL,
@@ -266,40 +407,41 @@ class NodeProcessor:
             # it is not going to result in any rendering on screen.
             return
 
-        if len(strings) > 0:
-            self.d_strings.append(strings)
+        if path is None:
+            # Empty path data or points, attributes must not shift onto next path
+            return
 
-        if len(alist) > 0:
-            self.attribute_dictionary_list.append(alist)
+        self.paths.append(path)
+        self.attribute_dictionary_list.append(alist)
 
-    def _depth_first(self, root):
-        global g_depth
+    def _build_paths(self, pool):
         """
-        Iterate SVG elements in depth-first order
+        Parse path data strings of pending nodes, in 'pool' (PathPool) when given
         """
-        if _DEBUG==1:
-            g_depth += 1
-        for node in root.childNodes:
-            element_name=node.nodeName
-            if element_name in _SVG_DISCARD_LIST:
-                continue
-            if _DEBUG==1:
-                print(f'{g_spaces[:g_depth*2]} {element_name} {node.getAttribute("id")}')
-            if element_name in _SVG_CONTAINER_LIST:
-                self._depth_first(node)
-            # Is supported node
-            elif element_name in _SVG_DRAWABLE_LIST:
-                self._process_node(node)
-        if _DEBUG==1:
-            g_depth -= 1
+        deferred = [k for k, (path, alist) in enumerate(self.pending_nodes) if isinstance(path, str)]
+        sources = [self.pending_nodes[k][0] for k in deferred]
+        paths = pool.map(build_paths, sources) if pool is not None else build_paths(sources)
+        for k, path in zip(deferred, paths):
+            self.pending_nodes[k] = (path, self.pending_nodes[k][1])
 
-    def depth_first(self):
-        # Get ViewBox of SVG element to find display area for vector drawing
-        #vb_x, vb_y = _get_viewbox(doc.getElementsByTagName('svg')[0])
+    def depth_first(self, pool=None, timer=None):
+        """
+        Iterate SVG elements in depth-first order.
+        Stages are timed with 'timer' (StageTimer) when given.
+        """
         if _DEBUG==1:
             print(f'Processing {self.file_name}')
-        self._depth_first(self.svg_node)
-        self.paths = [parse_path(d) for d in self.d_strings]
+        if timer is not None:
+            self.timer = timer
+        timer = self.timer
+        with timer.stage('parse'):
+            self.parse()
+        with timer.stage('path_data'):
+            self._build_paths(pool)
+        with timer.stage('resolve'):
+            for path, alist in self.pending_nodes:
+                self._finish_node(path, alist)
+        self.pending_nodes = []
 
     def _get_parent_attribute(self, element, attribute):
         """
@@ -308,7 +450,11 @@ class NodeProcessor:
         If attribute is found, it returns its value
         If attribute value is 'inherit' it continue searching in parents
         """
-        while element is not None and element.nodeType == element.ELEMENT_NODE:
+        if attribute in _ATTRIB_INHERITED:
+            # Computed while streaming
+            return element.style.get(attribute)
+
+        while element is not None:
             if element.hasAttribute(attribute):
                 attr_value = element.getAttribute(attribute)
                 if attr_value != 'inherit':
@@ -316,59 +462,6 @@ class NodeProcessor:
             element = element.parentNode
         return None
         
-    def _get_transform_list(self, element):
-        # Lookup transform of current and parents nodes.
-        # Then create a sequence of transforms that needs to be applied
-        path_transforms = []
-        parent = element
-        while parent is not None and parent.nodeType == element.ELEMENT_NODE:
-            if parent.hasAttribute("transform"):
-                path_transforms.append(parent.getAttribute("transform"))
-            parent=parent.parentNode
-        
-        if len(path_transforms) > 1:
-            path_transforms.reverse()
-
-        # Return a list of transform
-        return path_transforms
-
-    def insert_missing_path_commands(self, commands):
-        path_commands = []
-        last_command = None
-
-        i = 0
-        while i < len(commands):
-            cmd = commands[i]
-            if cmd.isalpha():
-                last_command = cmd
-                i += 1
-            else:
-                cmd = last_command
-            
-            num_params:int = _CMD_PARAM_TABLE[str(cmd)]
-            
-            if num_params >= 0:
-                if num_params == 2:
-                    path_commands.append(f'{cmd} {float(commands[i])} {float(commands[i+1])}')
-                elif num_params == 1:
-                    path_commands.append(f'{cmd} {float(commands[i])}')
-                elif num_params == 6:
-                    path_commands.append(f'{cmd} {float(commands[i])} {float(commands[i+1])} {float(commands[i+2])} {float(commands[i+3])} {float(commands[i+4])} {float(commands[i+5])}')
-                elif num_params == 4:
-                    path_commands.append(f'{cmd} {float(commands[i])} {float(commands[i+1])} {float(commands[i+2])} {float(commands[i+3])}')
-                elif num_params == 0:
-                    path_commands.append(f'Z')
-                i += num_params
-            else:
-                raise ValueError(f"Unexpected token: {cmd}")
-
-            if cmd == 'm':
-                last_command = 'l'
-            elif cmd == 'M':
-                last_command = 'L'
-
-        return ' '.join(path_commands)
-
     def _parse_style(self, alist, style_str):
         if style_str == None:
             return
@@ -395,21 +488,21 @@ class NodeProcessor:
         Parse Element attributes and prepare a dictionary
         """
         keys = list(element.attributes.keys())
-        values = [val.value for val in list(element.attributes.values())]
+        values = list(element.attributes.values())
 
         # Append SVG element name into attribute name
         keys.append("name");
         values.append(element.tagName);
 
         # Special key 'node' to access SVG node object
-        keys.append("minidom-node")
+        keys.append("node")
         values.append(element)
 
-        tx_list = self._get_transform_list(element)
-        if tx_list:
-            # If transform is available add it into attribute list
+        if element.matrix is not None:
+            # If transform of current or parent nodes is available add
+            # accumulated transform into attribute list
             keys.append("transform")
-            values.append(tx_list)
+            values.append(element.matrix)
             keys.append("path_transform")
             values.append(0)
 
@@ -452,58 +545,45 @@ class NodeProcessor:
             alist["id"] = f"svg_id{g_counter}"
             return alist["id"]
 
-    def _make_gradient_list(self, parent_node):
-        glist=[]
-        keys = []
-        values = []
-        for e in self.svg_node.getElementsByTagName(parent_node):
-            grad_dict = self._make_attrib_dictionary(e)
-            stops = [self._make_attrib_dictionary(stop)
-                     for stop in e.getElementsByTagName('stop')]
-
-            # From SVGT12 Specification
-            # 11.2 Specifying paint describes currentColor interpretation
-            if 'color' in grad_dict:
-                for s in stops:
-                    if s['stop-color'] == 'currentColor':
-                        s['stop-color'] = grad_dict['color']
-
-            grad_dict['stops'] = stops
-            if "gradientUnits" not in grad_dict:
-                # Ensure we have dummy strings to simplify checks in main svg_paint_object
-                grad_dict['gradientUnits'] = None
-            # Gradients are valid if it has stop points
-            if len(stops) > 0:
-                key = self._get_element_id(grad_dict)
-                keys.append(key)
-                values.append(grad_dict)
-        if parent_node == 'linearGradient':
-            self.linear_gradients = dict(list(zip(keys,values)))
-        elif parent_node == 'radialGradient':
-            self.radial_gradients = dict(list(zip(keys,values)))
-
-    def _make_solidColor_dictionary(self):
-        solid_color = dict()
-        keys = []
-        values = []
+    def _start_gradient(self, e):
+        grad_dict = self._make_attrib_dictionary(e)
+        # Stop points are added while streaming content of gradient
+        grad_dict['stops'] = []
+        return grad_dict
+
+    def _end_gradient(self, grad_dict):
+        stops = grad_dict['stops']
+
+        # From SVGT12 Specification
+        # 11.2 Specifying paint describes currentColor interpretation
+        if 'color' in grad_dict:
+            for s in stops:
+                if s['stop-color'] == 'currentColor':
+                    s['stop-color'] = grad_dict['color']
+
+        if "gradientUnits" not in grad_dict:
+            # Ensure we have dummy strings to simplify checks in main svg_paint_object
+            grad_dict['gradientUnits'] = None
+        # Gradients are valid if it has stop points
+        if len(stops) > 0:
+            key = self._get_element_id(grad_dict)
+            if grad_dict['name'] == 'linearGradient':
+                self.linear_gradients[key] = grad_dict
+            elif grad_dict['name'] == 'radialGradient':
+                self.radial_gradients[key] = grad_dict
+
+    def _add_solid_color(self, e):
         # NOTE: This tool does not support animation feature.
         # So, only following is supported
         #  <solidColor solid-color="constant" solid-opacity="0.7"/>
         #  VGLite h/w does not support opacity
-        for e in self.svg_node.getElementsByTagName('solidColor'):
-            alist = self._make_attrib_dictionary(e)
-            key = self._get_element_id(alist)
-            value = alist["solid-color"]
-            keys.append(key)
-            values.append(value)
-        self.solor_colors = dict(list(zip(keys,values)))
-
-def svg_transform(svg_file_location):
+        alist = self._make_attrib_dictionary(e)
+        key = self._get_element_id(alist)
+        self.solor_colors[key] = alist["solid-color"]
+
+def svg_transform(svg_file_location, pool=None, timer=None):
     np = NodeProcessor(svg_file_location)
-    np._make_gradient_list('linearGradient')
-    np._make_gradient_list('radialGradient')
-    np._make_solidColor_dictionary()
-    np.depth_first()
+    np.depth_first(pool, timer)
 
     return np.paths, np.attribute_dictionary_list, np.svg_attributes, np.solor_colors, np.linear_gradients, np.radial_gradients, np
 
@@ -0,0 +1,129 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Profiling of a single conversion (--profile).
+#
+# ConversionProfiler replaces StageTimer of a conversion. Besides wall time
+# it records how often every stage ran, the peak of memory allocated during
+# the stage (tracemalloc) and time and count per SVG element type. With a
+# dump file the whole conversion also runs under cProfile, the stats are
+# dumped for pstats/snakeviz and the hottest functions are added to the
+# report.
+#
+
+import cProfile
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from svg_stage_timer import StageTimer
+
+# Functions listed in report when cProfile is used
+PROFILE_TOP_FUNCTIONS = 25
+
+PROFILE_SUFFIX = '.profile.json'
+
+
+def profile_file_for(error_file):
+    """
+    Name of profile report written next to .err file
+    """
+    return str(Path(error_file).with_suffix('')) + PROFILE_SUFFIX
+
+
+class ConversionProfiler(StageTimer):
+    """
+    StageTimer which also records call counts, memory peaks and element types
+    """
+    profile_elements = True
+
+    def __init__(self, dump_file=None):
+        super().__init__()
+        self.calls = {}
+        self.peak_memory = {}
+        self.elements = {}
+        self.dump_file = dump_file
+        self._profile = None
+        self._tracing = False
+        # [memory at stage start, peak seen so far] of open stages
+        self._memory_stack = []
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        if self.dump_file is not None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.dump_file)
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def _peak_to_parent(self, peak):
+        if self._memory_stack:
+            frame = self._memory_stack[-1]
+            frame[1] = max(frame[1], peak)
+
+    @contextmanager
+    def stage(self, name):
+        current, peak = tracemalloc.get_traced_memory()
+        self._peak_to_parent(peak)
+        tracemalloc.reset_peak()
+        self._memory_stack.append([current, current])
+        try:
+            with super().stage(name):
+                yield
+        finally:
+            frame = self._memory_stack.pop()
+            peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+            self._peak_to_parent(peak)
+            tracemalloc.reset_peak()
+            self.calls[name] = self.calls.get(name, 0) + 1
+            self.peak_memory[name] = max(self.peak_memory.get(name, 0), peak - frame[0])
+
+    @contextmanager
+    def element(self, tag):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.elements.setdefault(tag, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+    def _top_functions(self):
+        stats = pstats.Stats(self._profile)
+        rows = []
+        for (file_name, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({'function': f"{Path(file_name).name}:{line}({function})", 'calls': calls,
+                         'tottime': round(tottime, 6), 'cumtime': round(cumtime, 6)})
+        rows.sort(key=lambda row: row['cumtime'], reverse=True)
+        return rows[:PROFILE_TOP_FUNCTIONS]
+
+    def report(self):
+        """
+        Profile as JSON compatible dictionary
+        """
+        report = {
+            'stages': {name: {'seconds': round(seconds, 6), 'calls': self.calls.get(name, 0),
+                              'peak_memory': self.peak_memory.get(name, 0)}
+                       for name, seconds in self.times.items()},
+            # Elements are timed while streaming, path data of <path> is parsed in stage path_data
+            'elements': {tag: {'count': count, 'seconds': round(seconds, 6)}
+                         for tag, (count, seconds) in sorted(self.elements.items())},
+        }
+        if self._profile is not None:
+            report['cprofile_dump'] = self.dump_file
+            report['functions'] = self._top_functions()
+        return report
@@ -0,0 +1,35 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Wall time of named conversion stages.
+#
+# Converter runs every stage of the pipeline (parse, path data, arcs,
+# simplify, data type, emit) inside StageTimer.stage(), the times are
+# returned with ConversionResult and used by svg_benchmark.py.
+#
+
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Accumulated wall time per stage name, in order of first use
+    """
+    # Drawable elements are timed per element type (see svg_profile.py)
+    profile_elements = False
+
+    def __init__(self):
+        self.times = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - start
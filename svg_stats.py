@@ -0,0 +1,55 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Machine readable conversion statistics.
+#
+# Converter collects counts of paths, commands, points, paint entries and
+# the bytes of every emitted table into a JSON compatible dictionary
+# (ConversionResult.stats). svg2h.py --stats writes it to <name>.stats.json
+# next to the .err file, svg_batch.py --stats also writes an aggregate of
+# all assets.
+#
+
+from pathlib import Path
+
+STATS_SUFFIX = '.stats.json'
+
+# Assets listed in aggregate, largest first
+_LARGEST_ASSETS = 10
+
+
+def stats_file_for(error_file):
+    """
+    Name of statistics report written next to .err file
+    """
+    return str(Path(error_file).with_suffix('')) + STATS_SUFFIX
+
+
+def _add_counts(total, stats):
+    # Sum numbers of nested dictionaries, other values are skipped
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            _add_counts(total.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            total[key] = total.get(key, 0) + value
+
+
+def aggregate_stats(stats_list):
+    """
+    Aggregate statistics of many assets: totals of all counts and the
+    largest assets by table bytes
+    """
+    totals = {}
+    for stats in stats_list:
+        _add_counts(totals, stats)
+    largest = sorted(stats_list, key=lambda stats: stats['total_bytes'], reverse=True)
+    return {
+        'assets': len(stats_list),
+        'totals': totals,
+        'largest': [{'input_file': stats['input_file'], 'total_bytes': stats['total_bytes']}
+                    for stats in largest[:_LARGEST_ASSETS]],
+    }
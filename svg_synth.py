@@ -0,0 +1,186 @@
+#! /usr/bin/env python3
+
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Deterministic generator of synthetic SVG Tiny 1.2 documents.
+#
+# The documents are used by svg_benchmark.py to see how conversion scales
+# with path count, segments per path, group nesting depth, transform
+# density, gradient count and references per gradient. The same
+# SyntheticSpec always produces the same document.
+#
+# Usage:
+#   svg_synth.py [--paths N] [--segments N] [--depth N] [--transform-density F]
+#                [--gradients N] [--refs-per-gradient N] [--seed N] [-o OUTPUT]
+#
+
+import argparse
+import random
+import sys
+
+CANVAS_SIZE = 1000
+
+# Paths per top level group, every top level group holds 'depth' nested groups
+_PATHS_PER_GROUP = 16
+
+
+class SyntheticSpec:
+    """
+    Parameters of a synthetic SVG document
+    """
+    def __init__(self, paths=500, segments=8, depth=2, transform_density=0.25,
+                 gradients=8, refs_per_gradient=8, seed=1):
+        self.paths = paths
+        self.segments = segments
+        # Nesting depth of groups around paths
+        self.depth = depth
+        # Fraction of groups and paths with a transform attribute
+        self.transform_density = transform_density
+        self.gradients = gradients
+        # Paths filled with each gradient, other paths use solid colors
+        self.refs_per_gradient = refs_per_gradient
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def _fmt(value):
+    return "%.2f" % value
+
+
+def _random_transform(rng):
+    kind = rng.randrange(3)
+    if kind == 0:
+        return f"translate({_fmt(rng.uniform(-50, 50))},{_fmt(rng.uniform(-50, 50))})"
+    if kind == 1:
+        return f"rotate({_fmt(rng.uniform(-30, 30))} {_fmt(rng.uniform(0, CANVAS_SIZE))} {_fmt(rng.uniform(0, CANVAS_SIZE))})"
+    return f"matrix({_fmt(rng.uniform(0.5, 1.5))} 0 0 {_fmt(rng.uniform(0.5, 1.5))} {_fmt(rng.uniform(-20, 20))} {_fmt(rng.uniform(-20, 20))})"
+
+
+def _random_color(rng):
+    return "#%06x" % rng.randrange(0x1000000)
+
+
+def _path_data(rng, segments):
+    """
+    Path data mixing absolute, relative and shorthand commands and arcs
+    """
+    x = rng.uniform(0, CANVAS_SIZE)
+    y = rng.uniform(0, CANVAS_SIZE)
+    parts = [f"M{_fmt(x)} {_fmt(y)}"]
+
+    def step():
+        return _fmt(rng.uniform(-20, 20))
+
+    for _ in range(segments):
+        kind = rng.randrange(8)
+        if kind == 0:
+            parts.append(f"L{_fmt(rng.uniform(0, CANVAS_SIZE))} {_fmt(rng.uniform(0, CANVAS_SIZE))}")
+        elif kind == 1:
+            parts.append(f"l{step()} {step()}")
+        elif kind == 2:
+            parts.append(f"h{step()}v{step()}")
+        elif kind == 3:
+            parts.append(f"c{step()} {step()} {step()} {step()} {step()} {step()}")
+        elif kind == 4:
+            parts.append(f"s{step()} {step()} {step()} {step()}")
+        elif kind == 5:
+            parts.append(f"q{step()} {step()} {step()} {step()}")
+        elif kind == 6:
+            parts.append(f"t{step()} {step()}")
+        else:
+            radius = _fmt(rng.uniform(5, 20))
+            parts.append(f"a{radius} {radius} 0 0 {rng.randrange(2)} {step()} {step()}")
+    if rng.randrange(2):
+        parts.append("z")
+    return "".join(parts)
+
+
+def _gradient(rng, index):
+    stops = []
+    count = rng.randrange(2, 5)
+    for k in range(count):
+        stops.append(f'      <stop offset="{_fmt(k / (count - 1))}" stop-color="{_random_color(rng)}"/>')
+    if index % 2 == 0:
+        head = (f'    <linearGradient id="grad{index}" x1="0" y1="0" x2="1" y2="{_fmt(rng.uniform(0, 1))}">')
+        tail = '    </linearGradient>'
+    else:
+        head = (f'    <radialGradient id="grad{index}" cx="0.5" cy="0.5" r="{_fmt(rng.uniform(0.3, 0.7))}">')
+        tail = '    </radialGradient>'
+    return [head] + stops + [tail]
+
+
+def generate_svg(spec, out):
+    """
+    Write SVG document described by SyntheticSpec to text stream 'out'
+    """
+    rng = random.Random(spec.seed)
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             f'<svg version="1.2" baseProfile="tiny" width="{CANVAS_SIZE}" height="{CANVAS_SIZE}" '
+             f'viewBox="0 0 {CANVAS_SIZE} {CANVAS_SIZE}" xmlns="http://www.w3.org/2000/svg">']
+    if spec.gradients > 0:
+        lines.append('  <defs>')
+        for index in range(spec.gradients):
+            lines.extend(_gradient(rng, index))
+        lines.append('  </defs>')
+
+    def transform_attribute():
+        if rng.random() < spec.transform_density:
+            return f' transform="{_random_transform(rng)}"'
+        return ''
+
+    gradient_refs = spec.gradients * spec.refs_per_gradient
+    for first in range(0, spec.paths, _PATHS_PER_GROUP):
+        for level in range(spec.depth):
+            lines.append('  ' * (level + 1) + f'<g{transform_attribute()}>')
+        indent = '  ' * (spec.depth + 1)
+        for i in range(first, min(first + _PATHS_PER_GROUP, spec.paths)):
+            if i < gradient_refs:
+                fill = f"url(#grad{i // spec.refs_per_gradient})"
+            else:
+                fill = _random_color(rng)
+            stroke = ''
+            if i % 3 == 0:
+                stroke = f' stroke="{_random_color(rng)}" stroke-width="{_fmt(rng.uniform(0.5, 4))}"'
+            lines.append(f'{indent}<path id="p{i}" fill="{fill}"{stroke}{transform_attribute()} '
+                         f'd="{_path_data(rng, spec.segments)}"/>')
+        for level in reversed(range(spec.depth)):
+            lines.append('  ' * (level + 1) + '</g>')
+    lines.append('</svg>')
+    out.write("\n".join(lines))
+    out.write("\n")
+
+
+def main(argv=None):
+    defaults = SyntheticSpec()
+    parser = argparse.ArgumentParser(description='Generate a deterministic synthetic SVG Tiny 1.2 document.')
+    parser.add_argument('--paths', type=int, default=defaults.paths)
+    parser.add_argument('--segments', type=int, default=defaults.segments, help='segments per path')
+    parser.add_argument('--depth', type=int, default=defaults.depth, help='group nesting depth')
+    parser.add_argument('--transform-density', type=float, default=defaults.transform_density,
+                        help='fraction of groups and paths with a transform')
+    parser.add_argument('--gradients', type=int, default=defaults.gradients)
+    parser.add_argument('--refs-per-gradient', type=int, default=defaults.refs_per_gradient,
+                        help='paths filled with each gradient')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    spec = SyntheticSpec(args.paths, args.segments, args.depth, args.transform_density,
+                         args.gradients, args.refs_per_gradient, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            generate_svg(spec, f)
+    else:
+        generate_svg(spec, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
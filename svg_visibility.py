@@ -0,0 +1,135 @@
+#
+# Copyright 2024 NXP
+#
+# SPDX-License-Identifier: MIT
+#
+
+#
+# Invisible element elimination and paint simplification (--optimize-paint).
+#
+# Elements which draw nothing are removed before path data is emitted:
+#   - display="none" on the element or an ancestor, computed visibility
+#     "hidden" or "collapse", opacity="0" on the element or an ancestor
+#   - fill and stroke both removed: fill-opacity="0" removes fill,
+#     stroke-opacity="0" or stroke-width="0" removes stroke
+#   - paths without drawing segments (only moveto)
+#   - paint box (bounding box grown by stroke extent) entirely outside the
+#     viewBox
+# Gradients with a single stop or with all stops of the same color and
+# opacity paint one color, references to them are replaced by the color so
+# that the path is drawn with FILL_CONSTANT and the gradient is not emitted.
+#
+
+from svg_occlusion import element_properties, paint_box
+
+# Reasons of removal, in order of checks
+REASON_DISPLAY = 'display'
+REASON_HIDDEN = 'hidden'
+REASON_OPACITY = 'opacity'
+REASON_NO_PAINT = 'no-paint'
+REASON_EMPTY = 'empty'
+REASON_OUTSIDE = 'outside'
+
+
+def _is_zero(value):
+    try:
+        return float(value) == 0.0
+    except (TypeError, ValueError):
+        return False
+
+
+def _computed(chain, name):
+    # Value of inherited property, nearest element which sets it
+    for properties in chain:
+        value = properties.get(name)
+        if value is not None and value != 'inherit':
+            return value
+    return None
+
+
+def hidden_reason(alist):
+    """
+    Reason why element is not rendered because of its or its ancestors
+    properties, None when it is rendered. Fill and stroke which are not
+    painted are set to None.
+    """
+    chain = []
+    element = alist['node']
+    while element is not None:
+        chain.append(element_properties(element))
+        element = element.parentNode
+    if any(properties.get('display') == 'none' for properties in chain):
+        return REASON_DISPLAY
+    if _computed(chain, 'visibility') in ('hidden', 'collapse'):
+        return REASON_HIDDEN
+    if any(_is_zero(properties.get('opacity')) for properties in chain):
+        return REASON_OPACITY
+    if _is_zero(_computed(chain, 'fill-opacity')):
+        alist['fill'] = None
+    if _is_zero(_computed(chain, 'stroke-opacity')) or _is_zero(alist['stroke-width']):
+        alist['stroke'] = None
+    if alist['fill'] is None and alist['stroke'] is None:
+        return REASON_NO_PAINT
+    return None
+
+
+def _outside(box, area):
+    min_x, min_y, max_x, max_y = box
+    return max_x < area[0] or min_x > area[2] or max_y < area[1] or min_y > area[3]
+
+
+def invisible_reason(path, alist, viewbox, tight=False):
+    """
+    Reason why path draws nothing, None when it may be visible. 'viewbox' is
+    (x, y, width, height) or None.
+    """
+    reason = hidden_reason(alist)
+    if reason is not None:
+        return reason
+    if all(cmd == 'M' for cmd in path.commands):
+        return REASON_EMPTY
+    if viewbox is not None:
+        x, y, width, height = viewbox
+        # Transformed paths are drawn relative to viewBox origin
+        area = (0, 0, width, height) if 'transform' in alist else (x, y, x + width, y + height)
+        box = paint_box(path, alist, tight)
+        if box is not None and _outside(box, area):
+            return REASON_OUTSIDE
+    return None
+
+
+def single_color(gradient):
+    """
+    Color of every stop of gradient dictionary, None when stops differ
+    """
+    stops = gradient['stops']
+    colors = {(stop['stop-color'].strip().lower(), stop.get('stop-opacity', '1').strip()) for stop in stops}
+    if len(colors) != 1:
+        return None
+    color = stops[0]['stop-color'].strip()
+    # currentColor of stop would resolve against the painted element
+    return None if color == 'currentColor' else color
+
+
+def demote_gradients(attributes, gradients):
+    """
+    Replace fill and stroke referring to single color gradients by the color,
+    'gradients' maps gradient id to its dictionary. Return number of replaced
+    paints.
+    """
+    colors = {}
+    demoted = 0
+    for alist in attributes:
+        for name in ('fill', 'stroke'):
+            value = alist[name]
+            if value is None or not value.startswith('url'):
+                continue
+            grad_id = value.replace('url(#', '').replace(')', '')
+            if grad_id not in gradients:
+                continue
+            if grad_id not in colors:
+                colors[grad_id] = single_color(gradients[grad_id])
+            if colors[grad_id] is not None:
+                alist[name] = colors[grad_id]
+                demoted += 1
+    return demoted